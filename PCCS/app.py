@@ -1,259 +1,412 @@
-import os
-import sys
+import threading
+import time
 from pathlib import Path
 import numpy as np
-import cv2
-from contextlib import redirect_stdout, redirect_stderr
 
 
 # ============================================================
-# 0) Mediapipe 및 mediapipe 내부 호출 가능성이 있는 모듈 전체 무음 import
-# ============================================================
-with open(os.devnull, "w") as fnull, redirect_stdout(fnull), redirect_stderr(fnull):
-    import mediapipe as mp
-    from modules.face_mesh_utils import init_face_mesh
-    from modules.face_visualize import visualize_facemesh, FaceNotFoundError as MeshNotFoundError
-    from modules.eye_extractor import extract_eye_roi, compute_eye_color
-
-# mediapipe 오브젝트 정상 사용
-mp_face_mesh = mp.solutions.face_mesh
-
-
-# ============================================================
-# 1) 기본 파이썬 경고/로그 제거 (stderr와 무관)
-# ============================================================
-os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
-
-import warnings
-warnings.filterwarnings("ignore")
-
-import absl.logging
-absl.logging.set_verbosity(absl.logging.ERROR)
-
-import logging
-logging.getLogger('tensorflow').setLevel(logging.ERROR)
-logging.getLogger('absl').setLevel(logging.ERROR)
-
-
-# ============================================================
-# 2) mediapipe 사용 모듈들 import (여긴 일반 import로 OK)
+# 모듈 import
+#   mediapipe / matplotlib 같은 무거운 라이브러리는 각 모듈 안에서
+#   처음 쓸 때 불러온다. (import app 만으로는 로딩되지 않음 → CLI/도구 시작이 빠름)
+#   서버는 시작할 때 AnalysisEngine.warmup()으로 미리 불러 두면 첫 요청이 느리지 않음.
+#   import 시간 측정: python benchmarks/import_report.py
 # ============================================================
+from modules.face_context import FaceMeshRunner
+from modules.face_visualize import draw_facemesh
+from modules.eye_extractor import extract_eye_roi, compute_eye_color
 from modules.palette_processor import load_all_palettes
 from modules.face_detector import detect_face, FaceNotFoundError
 from modules.skin_extractor import process_skin, SkinNotFoundError
 from modules.season_classifier import SeasonKNNClassifier
-from modules.face_box import save_face_box
-from modules.visualize_palette import append_palette_to_face
-from modules.season_visualizer import visualize_skin_position
+from modules.face_box import draw_face_box
+from modules.visualize_palette import compose_palette_image
+from modules.image_io import load_bgr, save_image, fit_max_side, load_bgr_reduced, ANALYSIS_MAX_SIDE
+from modules.analysis_result import AnalysisResult, LipRecommendation, float_list
+from modules.seasons import SEASONS
+from modules.season_visualizer import visualize_skin_position, get_skin_chart_background, SKIN_CHART_SIZE
+from modules.season_map import skin_season_map, render_season_map
+from modules.palette_cache import load_season_grid
+from modules.tracing import (
+    AnalysisTrace, StageMetrics, TRACE_MEMORY, enable_memory_tracing, open_default_trace_log,
+)
 
 # 립 관련
-from modules.lip_recommender.lip_preprocess import load_and_preprocess_lip_csv
-from modules.lip_recommender.lip_recommender import recommend_lip_colors
-from modules.lip_recommender.lip_simulator import simulate_lip_color
+from modules.lip_recommender.lip_catalog import load_lip_catalog
+from modules.lip_recommender.lip_recommender import recommend_lip_colors, attach_season_labels
+from modules.lip_recommender.lip_simulator import LipRenderContext
 
 
 # # ============================================================
 # # hex → LAB 변환 (lip_position())
+# #   → modules.color_science.hex_to_lab 사용
 # # ============================================================
-# from skimage import color
-# def hex_to_lab(hex_code):
-#     hex_code = hex_code.lstrip("#")
-#     r = int(hex_code[0:2], 16) / 255
-#     g = int(hex_code[2:4], 16) / 255
-#     b = int(hex_code[4:6], 16) / 255
-#     rgb = np.array([[[r, g, b]]], dtype=np.float32)
-#     lab = color.rgb2lab(rgb)[0][0]
-#     return lab.tolist()
 
 
 # ============================================================
-# 메인 함수
+# 분석 엔진 (서버 시작 시 한 번만 생성해서 재사용)
 # ============================================================
-def main():
-    #print("팔레트 로딩 중...")
-    BASE_DIR = Path(__file__).resolve().parent
-    palettes_dir = BASE_DIR / "palettes"
-    palettes = load_all_palettes(palettes_dir)
+BASE_DIR = Path(__file__).resolve().parent
+PALETTES_DIR = BASE_DIR / "palettes"
+LIP_CSV_PATH = BASE_DIR / "modules" / "lip_data" / "colorchips_data.csv"
+
+
+class AnalysisEngine:
+    """
+    팔레트 / 시즌 분류기 / 립 CSV를 한 번만 로딩해 두고
+    analyze(image) 호출마다 재사용하는 상주형 분석 엔진.
+    (Gradio 서버에서는 프로세스당 하나만 만들어서 사용)
+    """
+
+    def __init__(self, palettes_dir=PALETTES_DIR, lip_csv_path=LIP_CSV_PATH, lip_metric="cie76",
+                 analysis_max_side=ANALYSIS_MAX_SIDE, skin_chart_size=SKIN_CHART_SIZE,
+                 trace_log=None, trace_memory=TRACE_MEMORY):
+        # 립 추천 ΔE 방식: "cie76"(기존) / "ciede2000"(지각적으로 더 정확)
+        self.lip_metric = lip_metric
+
+        # 분석 해상도: 색 통계/랜드마크는 긴 변 이 크기 이하에서 계산 (None이면 원본)
+        self.analysis_max_side = analysis_max_side
+
+        # 피부 위치 차트 한 변(px)
+        self.skin_chart_size = skin_chart_size
+
+        # 단계별 추적: 결과(result.trace)에 항상 담고, 지표는 누적,
+        #   trace_log(없으면 TRACE_LOG 환경변수)가 있으면 JSON 한 줄씩 기록
+        #   trace_memory(TRACE_MEMORY=1)는 tracemalloc을 켜서 분석이 느려지므로 프로파일링할 때만
+        self.trace_memory = trace_memory
+        if trace_memory:
+            enable_memory_tracing()
+        self.trace_log = trace_log if trace_log is not None else open_default_trace_log()
+        self.stage_metrics = StageMetrics()
+
+        #print("팔레트 로딩 중...")
+        self.palettes = load_all_palettes(palettes_dir)
+        self.season_clf = SeasonKNNClassifier(self.palettes)
+
+        # 픽셀 단위 시즌 지도용 Lab 조회 격자 (팔레트 캐시에 함께 저장됨, 없으면 지도 생략)
+        self.season_clf.attach_grid(load_season_grid(palettes_dir))
+
+        #print("립 데이터 로딩 중...")
+        # 컴파일된 카탈로그(컬럼별 .npy, memmap)를 읽고, 시즌 라벨은 사용자와 무관 →
+        # 로딩 시 일괄 계산해서 같이 보관
+        self.lip_df = attach_season_labels(load_lip_catalog(lip_csv_path), self.season_clf)
+
+        # FaceMesh 그래프도 한 번만 생성 (이미지당 추론 1회)
+        #   mediapipe 로딩이 오래 걸려서 첫 분석(또는 warmup) 때 생성
+        self._face_mesh = None
+        self._face_mesh_lock = threading.Lock()
+
+    @property
+    def face_mesh(self):
+        if self._face_mesh is None:
+            with self._face_mesh_lock:
+                if self._face_mesh is None:
+                    self._face_mesh = FaceMeshRunner()
+        return self._face_mesh
+
+    def warmup(self):
+        """
+        첫 요청 전에 무거운 초기화를 미리 끝내 둠 (서버/배치 워커 시작 시 호출)
+          - mediapipe import + FaceMesh 그래프 생성 + 빈 이미지 1회 추론
+          - 피부 위치 차트 배경 래스터 생성 (matplotlib 로딩 포함)
+        걸린 시간(초)을 단계별 dict로 반환.
+        """
+        timings = {}
+        start = time.perf_counter()
+        self.face_mesh.process(np.zeros((64, 64, 3), dtype=np.uint8))
+        timings["face_mesh"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        get_skin_chart_background(self.palettes, self.skin_chart_size)
+        timings["skin_chart"] = time.perf_counter() - start
+        return timings
+
+    def analyze(self, image, out_dir=None, job_id=None, render=True):
+        """
+        이미지 한 장 분석 → AnalysisResult
+        image  : 이미지 경로 / PIL 이미지 / BGR ndarray (한 번만 디코딩해서 모든 단계가 공유)
+        out_dir: 결과 이미지 저장 폴더.
+                 None이면 경로 입력은 같은 폴더(기존 동작), 메모리 입력은 저장하지 않음.
+        render : False면 합성 이미지(박스/메쉬/팔레트/립)와 피부 픽셀 시즌 지도를 만들지 않고 수치만 계산
+                 (원본 해상도 디코딩도 생략 → 경로 입력은 축소 디코딩만)
+        결과 이미지는 result.images(메모리)와 result.artifacts(저장 경로)에 담긴다.
+        실패하면 result.error에 사유가 들어간다. (단계별 print 없음)
+        단계별 시간/메모리는 result.trace에 담긴다. (modules.tracing)
+
+        해상도: 얼굴 랜드마크 / 피부·눈 색 통계는 분석용 축소 이미지(work)에서,
+               사용자에게 보여줄 합성 이미지는 원본(img)에서 만든다.
+        """
+        result = AnalysisResult(job_id=job_id)
+        trace = AnalysisTrace(job_id, memory=self.trace_memory)
+        try:
+            self._analyze(image, result, trace, out_dir, render)
+        except Exception as e:
+            self._finish_trace(result, trace, f"{type(e).__name__}: {e}")
+            raise
+        self._finish_trace(result, trace, result.error)
+        return result
+
+    def _finish_trace(self, result, trace, error):
+        result.trace = trace.finish(error).to_dict()
+        self.stage_metrics.observe(result.trace)
+        if self.trace_log is not None:
+            try:
+                self.trace_log.write(result.trace)
+            except OSError:
+                # 추적 기록 실패는 분석 결과에 영향 없음
+                pass
+
+    def _analyze(self, image, result, trace, out_dir, render):
+        try:
+            with trace.span("decode"):
+                if render:
+                    img = load_bgr(image)
+                    work = fit_max_side(img, self.analysis_max_side)
+                else:
+                    img = None
+                    work = load_bgr_reduced(image, self.analysis_max_side)
+        except FileNotFoundError:
+            result.error = "이미지를 찾을 수 없습니다."
+            return result
+        # 크기 구간 라벨: 원본 크기 (render=False는 축소 디코딩 크기)
+        trace.set_image(img.shape if img is not None else work.shape)
+
+        if out_dir is None and render and isinstance(image, (str, Path)):
+            out_dir = Path(image).parent
+        out_dir = Path(out_dir) if out_dir is not None else None
+        test_dir = out_dir / "test_images" if out_dir is not None else None
+
+        def out_path(*parts):
+            return out_dir.joinpath(*parts) if out_dir is not None else None
+
+        def keep(name, image_bgr, *parts):
+            # 메모리 결과 보관 + 저장 폴더가 있으면 파일로도 저장
+            result.images[name] = image_bgr
+            saved = save_image(image_bgr, out_path(*parts)) if parts else None
+            if saved:
+                result.artifacts[name] = saved
+
+        palettes = self.palettes
+        season_clf = self.season_clf
+
+        # ------------------------
+        # 2) FaceMesh 1회 추론 → 얼굴 컨텍스트
+        #    (박스/메쉬/눈/입술 단계가 모두 이 결과를 공유)
+        #    축소 이미지에서 추론해도 좌표는 정규화 값이라 원본에 그대로 사용
+        # ------------------------
+        with trace.span("face_mesh"):
+            face_ctx = self.face_mesh.process(work)
+
+        try:
+            # detect_face는 이제 FaceMesh 기반
+            detect_face(work, face_ctx=face_ctx)
+        except FaceNotFoundError:
+            result.error = "얼굴을 찾을 수 없습니다."
+            return result
+
+        if render:
+            # 박스는 원본 크기 기준으로 다시 계산
+            with trace.span("face_box"):
+                keep("face_box", draw_face_box(img, face_ctx.bbox(img.shape)), "face_box.jpg")
+
+        # ------------------------
+        # 3) FaceMesh 시각화
+        # ------------------------
+        landmarks = face_ctx.landmarks
+        if render:
+            with trace.span("face_mesh_draw"):
+                keep("face_mesh", draw_facemesh(img, face_ctx.face), "face_mesh_result.jpg")
+
+        # ------------------------
+        # 4) 피부 색 추출 (분석용 축소 이미지)
+        # ------------------------
+        try:
+            with trace.span("skin"):
+                skin_lab, corrected_img, skin_mask = process_skin(work)
+        except SkinNotFoundError as e:
+            result.error = f"피부 추출 실패: {e}"
+            return result
+        result.skin_lab = float_list(skin_lab)
+
+        # 피부 픽셀별 시즌 지도 (보조 정보 → 결과 이미지를 만들 때만, 배치 수치 모드는 생략)
+        if render and season_clf.grid is not None:
+            with trace.span("season_map"):
+                pixel_map = skin_season_map(season_clf, corrected_img, skin_mask)
+                if pixel_map is not None:
+                    result.pixel_seasons = pixel_map["pixel_seasons"]
+                    result.pixel_votes = pixel_map["pixel_votes"]
+                    keep("season_map", render_season_map(corrected_img, pixel_map["labels"]),
+                         "season_map.jpg")
+
+        # ------------------------
+        # 5) 눈동자 색 추출
+        # ------------------------
+        try:
+            with trace.span("eye"):
+                if landmarks is not None:
+                    eye_pixels = extract_eye_roi(work, landmarks, eye='both')
+                    eye_lab = compute_eye_color(eye_pixels)['both']
+                else:
+                    eye_lab = None
+        except Exception:
+            # 눈동자 인식 실패 → 눈 색 보정 없이 진행
+            eye_lab = None
+        result.eye_lab = float_list(eye_lab)
+
+        # ------------------------
+        # 6) 시즌 판정
+        # ------------------------
+
+        # 기본 사용자 입력 값
+        season_input = skin_lab.copy().astype(float)
+
+        # 눈색 5% 반영
+        if eye_lab is not None:
+            season_input[1] = skin_lab[1] * 0.95 + eye_lab[1] * 0.05
+            season_input[2] = skin_lab[2] * 0.95 + eye_lab[2] * 0.05
+
+        # L 채널 자동 미세 보정
+        L = skin_lab[0]
+        if L < 40:
+            season_input[0] = L * 1.03
+        elif L > 70:
+            season_input[0] = L * 0.97
+        else:
+            season_input[0] = L
+
+        # 시즌 예측 + 득표율 + 시즌별 ΔE 상세 (이웃 검색 1회)
+        with trace.span("season"):
+            classified = season_clf.classify(season_input)
+        user_season = classified["season"]
+        votes = classified["votes"]
+        detail = classified["detail"]
+
+        result.season = str(user_season)
+        result.season_input = float_list(season_input)
+        result.votes = {s: float(v) for s, v in votes.items()}
+        result.season_detail = {
+            s: {k: round(float(v), 4) for k, v in detail[s].items()}
+            for s in SEASONS if s in detail
+        }
+
+        # 피부 위치 시각화 (차트는 저장 폴더가 있을 때만 생성)
+        if out_dir is not None:
+            chart_path = str(out_path("skin_position.jpg"))
+            with trace.span("skin_chart"):
+                visualize_skin_position(
+                    palettes,
+                    season_input,
+                    season_clf,
+                    save_path=chart_path,
+                    votes=votes,
+                    detail=detail,
+                    verbose=False,
+                    size=self.skin_chart_size
+                )
+            result.artifacts["skin_position"] = chart_path
+
+        # ------------------------
+        # 7) 시즌 팔레트 시각화
+        # ------------------------
+        if render:
+            try:
+                palette_df = palettes[user_season]
+
+                with trace.span("palette"):
+                    keep(
+                        "palette",
+                        compose_palette_image(img, palette_df, block_size=100, max_rows=2),
+                        "test_images", "palette_result.jpg"
+                    )
+            except Exception:
+                # 팔레트 합성 실패는 분석 결과에 영향 없음
+                pass
+
+        # ------------------------
+        # 8) 립 추천
+        #    (립 CSV는 엔진 생성 시 이미 로딩됨)
+        # ------------------------
+        with trace.span("recommend"):
+            recommended = recommend_lip_colors(
+                season_classifier=season_clf,
+                user_season=user_season,
+                skin_lab=season_input,
+                lip_df=self.lip_df,
+                metric=self.lip_metric
+            )
+        result.recommendations = [
+            LipRecommendation.from_row(row) for _, row in recommended.iterrows()
+        ]
+
+        # ------------------------
+        # 9) 립 합성 이미지 생성 (원본 해상도)
+        # ------------------------
+        if not render:
+            return result
+
+        if test_dir is not None and test_dir.exists():
+            # 기존 파일 제거
+            for f in test_dir.glob("lip_result_*.jpg"):
+                f.unlink()
+
+        # 입술 마스크/텍스처는 한 번만 계산하고 TOP 5 색을 한 번에 합성
+        #   (컨텍스트는 결과에 담아 두고 다른 색상 합성에 재사용)
+        with trace.span("lip_render"):
+            lip_render = LipRenderContext.from_face(img, face_ctx=face_ctx)
+            result.lip_render = lip_render
+
+            top = result.recommendations[:5]
+            lip_images = lip_render.render_many([rec.rgb for rec in top])
+            for idx, result_img in enumerate(lip_images, start=1):
+                keep(f"lip_result_{idx}", result_img, "test_images", f"lip_result_{idx}.jpg")
+
+        return result
 
-    # ------------------------
-    # 1) 이미지 입력
-    # ------------------------
-    img_path = Path(input("이미지 경로를 입력하세요: ").strip())
-    if not img_path.exists():
-        print("이미지를 찾을 수 없습니다.")
-        return
 
-    # ------------------------
-    # 2) FaceMesh 기반 얼굴 인식 및 박스 저장
-    # ------------------------
-    #print("얼굴 인식 중...")
-    try:
-        # detect_face는 이제 FaceMesh 기반
-        img, face_crop, bbox = detect_face(img_path)
-        save_face_box(img_path, bbox)  # bbox 직접 전달
-    except FaceNotFoundError:
-        print("얼굴을 찾을 수 없습니다.")
+# ============================================================
+# CLI 출력 (AnalysisResult → 기존 app.py 로그 형식)
+# ============================================================
+def print_result(result):
+    if result.error:
+        print(result.error)
         return
 
-    # ------------------------
-    # 3) FaceMesh landmarks 추출 + 시각화
-    # ------------------------
-    #print("FaceMesh 시각화 중...")
-
-    mesh = init_face_mesh() 
-    img = cv2.imread(str(img_path))
-    img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-
-    result = mesh.process(img_rgb)
-
-    if not result.multi_face_landmarks:
-        print("FaceMesh 인식 실패")
-        landmarks = None
-    else:
-        face = result.multi_face_landmarks[0]
-        landmarks = face.landmark   
-        visualize_facemesh(str(img_path))
+    print(f"판정된 시즌: {result.season}")
 
+    print("\n===== 시즌 KNN 득표율 =====")
+    for s in SEASONS:
+        print(f"{s:7s}: {result.votes.get(s, 0.0):5.2f}%")
+    print("================================\n")
 
-
-    # ------------------------
-    # 4) 피부 색 추출
-    # ------------------------
-    #print("피부 색 추출 중...")
-    try:
-        skin_lab, corrected_img, skin_mask = process_skin(img_path)
-    except SkinNotFoundError as e:
-        print(f"피부 추출 실패: {e}")
-        return
-
-    # ------------------------
-    # 5) 눈동자 색 추출
-    # ------------------------
-    #print("눈동자 색 추출 중...")
-    try:
-        img = cv2.imread(str(img_path))
-        if landmarks is not None:
-            eye_pixels = extract_eye_roi(img, landmarks, eye='both')
-            eye_lab = compute_eye_color(eye_pixels)['both']
+    print("===== 시즌별 거리 정보(ΔE 기준) =====")
+    for s in SEASONS:
+        d = result.season_detail.get(s)
+        if d:
+            print(f"{s:7s} | votes={int(d['votes'])} | avg ΔE={d['avg']:.2f} | min ΔE={d['min']:.2f}")
         else:
-            eye_lab = None
-    except Exception:
-        print("눈동자 인식 실패 → 눈 색 보정 없이 진행")
-        eye_lab = None
-
-    # ------------------------
-    # 6) 시즌 판정
-    # ------------------------
-    #print("시즌 판정 중...")
-    season_clf = SeasonKNNClassifier(palettes)
-
-    # 기본 사용자 입력 값
-    season_input = skin_lab.copy().astype(float)
-
-    # 눈색 5% 반영
-    if eye_lab is not None:
-        season_input[1] = skin_lab[1] * 0.95 + eye_lab[1] * 0.05
-        season_input[2] = skin_lab[2] * 0.95 + eye_lab[2] * 0.05
-
-    # L 채널 자동 미세 보정
-    L = skin_lab[0]
-    if L < 40:
-        season_input[0] = L * 1.03
-    elif L > 70:
-        season_input[0] = L * 0.97
-    else:
-        season_input[0] = L
-
-    # 시즌 예측
-    user_season = season_clf.predict_season(season_input)
-
-    print(f"판정된 시즌: {user_season}")
-    #print("skin_lab:", skin_lab)
-    #print("season_input:", season_input)
-
-    # 피부 위치 시각화
-    visualize_skin_position(
-        palettes,
-        season_input,
-        season_clf,
-        save_path=str(img_path.parent / "skin_position.jpg")
-    )
+            print(f"{s:7s} | votes=0 | avg ΔE= -   | min ΔE= -  ")
+    print("====================================\n")
 
-    # ------------------------
-    # 7) 시즌 팔레트 시각화
-    # ------------------------
-    #print("팔레트 합성 중...")
-    try:
-        palette_df = palettes[user_season]
-
-        save_path = img_path.parent / "test_images" / "palette_result.jpg"
-        save_path.parent.mkdir(exist_ok=True)
-
-        append_palette_to_face(
-            img_path,
-            palette_df,
-            save_path=str(save_path),
-            block_size=100,
-            max_rows=2
-        )
-    except Exception as e:
-        print(f"팔레트 합성 실패: {e}")
+    print("최종 추천 TOP 5:")
+    for rec in result.recommendations:
+        print(f"{rec.brand}  {rec.option}  {rec.hex}")
 
-    # ------------------------
-    # 8) 립 CSV 로드
-    # ------------------------
-    #print("립 데이터 로딩 중...")
-    lip_csv_path = BASE_DIR / "modules" / "lip_data" / "colorchips_data.csv"
 
+# ============================================================
+# 메인 함수 (CLI: 엔진을 만들어서 한 장 분석)
+# ============================================================
+def main():
     try:
-        lip_df = load_and_preprocess_lip_csv(lip_csv_path)
+        engine = AnalysisEngine()
     except Exception as e:
-        print(f"립 CSV 불러오기 실패: {e}")
+        print(f"분석 엔진 초기화 실패 (팔레트/립 CSV): {e}")
         return
 
     # ------------------------
-    # 9) 립 추천
-    # ------------------------
-    #print("립 추천 계산 중...")
-    recommended = recommend_lip_colors(
-        season_classifier=season_clf,
-        user_season=user_season,
-        skin_lab=season_input,
-        lip_df=lip_df
-    )
-
-    print("최종 추천 TOP 5:")
-    try:
-        cleaned = recommended.reset_index(drop=True)
-        print(cleaned[["brand", "option", "hex"]].to_string(index=False))
-
-    except:
-        print(recommended)
-
-    # ------------------------
-    # 10) 립 합성 이미지 생성
+    # 1) 이미지 입력
     # ------------------------
-    #print("립 합성 이미지 생성 중...")
-
-    save_dir = img_path.parent / "test_images"
-    save_dir.mkdir(exist_ok=True)
-
-    # 기존 파일 제거
-    for f in save_dir.glob("lip_result_*.jpg"):
-        f.unlink()
-
-    for idx, (_, row) in enumerate(recommended.iterrows(), start=1):
-        if idx > 5:
-            break
-        
-        color_rgb = (row["r"], row["g"], row["b"])
-        result_img = simulate_lip_color(str(img_path), color_rgb)
-
-        save_path = save_dir / f"lip_result_{idx}.jpg"
-        cv2.imwrite(str(save_path), result_img)
-
-        #print(f"{idx}번 옵션 저장 완료: {save_path}")
+    img_path = Path(input("이미지 경로를 입력하세요: ").strip())
+    print_result(engine.analyze(img_path))
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,306 @@
+# batch_analyze.py
+# -------------------------------------------------------
+# 보관 중인 고객 사진 일괄 재분석 (팔레트/카탈로그 변경 시 재채점용)
+#
+#   python batch_analyze.py ./archive                      # 폴더 전체
+#   python batch_analyze.py manifest.txt -o results.jsonl  # 목록 파일(.txt/.csv/.jsonl)
+#   python batch_analyze.py ./archive --workers 8 --save-artifacts ./batch_out
+#
+# - 워커 프로세스마다 AnalysisEngine을 한 번만 만들어서 재사용
+#   (팔레트 / 분류기 / 립 카탈로그 / FaceMesh 로딩 1회)
+# - 결과는 이미지 1장당 JSON 한 줄로 바로바로 기록 (처리 시간, 실패 사유 포함)
+# - 같은 출력 파일로 다시 실행하면 이미 끝난 이미지는 건너뜀 (중단 후 이어하기)
+# - 워커 프로세스가 죽으면(세그폴트/메모리 부족) 진행 중이던 이미지는 실패로 기록하고
+#   새 풀로 계속 (--retry-failed로 다시 처리)
+# -------------------------------------------------------
+import argparse
+import csv
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from modules.image_io import ANALYSIS_MAX_SIDE
+
+BASE_DIR = Path(__file__).resolve().parent
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+
+
+# ============================================================
+# 1) 입력 목록 만들기 (폴더 / 매니페스트)
+# ============================================================
+def iter_input_paths(source):
+    """
+    source가 폴더면 하위 이미지 전체,
+    파일이면 매니페스트로 읽는다.
+      .txt/.lst : 한 줄에 경로 하나
+      .csv      : 'path' 컬럼
+      .jsonl    : {"path": ...} 한 줄씩
+    상대 경로는 매니페스트 파일 위치 기준.
+    """
+    source = Path(source)
+
+    if source.is_dir():
+        for p in sorted(source.rglob("*")):
+            if p.is_file() and p.suffix.lower() in IMAGE_EXTS:
+                yield str(p.resolve())
+        return
+
+    if not source.exists():
+        raise FileNotFoundError(f"입력 폴더/매니페스트를 찾을 수 없음: {source}")
+
+    base = source.parent
+    suffix = source.suffix.lower()
+
+    with open(source, encoding="utf-8-sig", newline="") as f:
+        if suffix == ".csv":
+            rows = (row.get("path", "") for row in csv.DictReader(f))
+        elif suffix == ".jsonl":
+            rows = (json.loads(line).get("path", "") for line in f if line.strip())
+        else:
+            rows = (line for line in f)
+
+        for raw in rows:
+            raw = (raw or "").strip()
+            if not raw or raw.startswith("#"):
+                continue
+            p = Path(raw)
+            if not p.is_absolute():
+                p = base / p
+            yield str(p.resolve())
+
+
+# ============================================================
+# 2) 이어하기: 이미 기록된 결과 읽기
+# ============================================================
+def load_done_paths(out_path, retry_failed=False):
+    """출력 JSONL에서 이미 처리된 경로 집합 (retry_failed면 성공한 것만)"""
+    done = set()
+    out_path = Path(out_path)
+    if not out_path.exists():
+        return done
+
+    with open(out_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # 중단 시 잘린 마지막 줄
+            if retry_failed and rec.get("status") != "ok":
+                continue
+            done.add(rec.get("path"))
+    return done
+
+
+# ============================================================
+# 3) 워커 (프로세스당 엔진 1개)
+# ============================================================
+_ENGINE = None
+_ARTIFACT_ROOT = None
+
+
+def _init_worker(artifact_root, lip_metric, analysis_max_side):
+    global _ENGINE, _ARTIFACT_ROOT
+    sys.path.insert(0, str(BASE_DIR))
+
+    # 엔진/모듈 로딩 로그는 숨김
+    with open(os.devnull, "w") as devnull:
+        from contextlib import redirect_stdout, redirect_stderr
+        with redirect_stdout(devnull), redirect_stderr(devnull):
+            from app import AnalysisEngine
+            _ENGINE = AnalysisEngine(lip_metric=lip_metric, analysis_max_side=analysis_max_side)
+            _ENGINE.warmup()
+
+    _ARTIFACT_ROOT = Path(artifact_root) if artifact_root else None
+
+
+def _analyze_one(index, path):
+    """이미지 1장 분석 → JSON 직렬화 가능한 dict"""
+    record = {"index": index, "path": path, "status": "ok", "pid": os.getpid()}
+    out_dir = _ARTIFACT_ROOT / f"{index:06d}_{Path(path).stem}" if _ARTIFACT_ROOT else None
+
+    start = time.perf_counter()
+    try:
+        # 결과 이미지를 저장하지 않으면 합성 생략 + 축소 디코딩만 (디스크에 아무것도 쓰지 않음)
+        result = _ENGINE.analyze(path, out_dir=out_dir, render=out_dir is not None)
+    except Exception as e:
+        record.update(status="error", error=f"{type(e).__name__}: {e}")
+        result = None
+    record["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+    if result is not None:
+        if result.error:
+            record.update(status="error", error=result.error)
+        d = result.to_dict()
+        for key in ("season", "votes", "pixel_seasons", "skin_lab", "eye_lab", "season_input"):
+            record[key] = d[key]
+        # 단계별 소요 시간(ms) (전체 추적은 TRACE_LOG로 따로 기록)
+        record["stages_ms"] = {span["name"]: span["wall_ms"] for span in d["trace"].get("spans", [])}
+        record["recommendations"] = [
+            {k: r[k] for k in ("brand", "option", "hex", "delta_e")}
+            for r in d["recommendations"]
+        ]
+        if out_dir:
+            record["artifact_dir"] = str(out_dir)
+            record["artifacts"] = d["artifacts"]
+
+    return record
+
+
+# ============================================================
+# 4) 실행
+# ============================================================
+def _crashed_record(index, path, error):
+    """워커 프로세스가 죽어서 결과를 못 받은 이미지 기록 (--retry-failed로 다시 처리 가능)"""
+    return {
+        "index": index,
+        "path": path,
+        "status": "error",
+        "error": f"{type(error).__name__}: 워커 프로세스가 비정상 종료됨 "
+                 f"(이 이미지 또는 같이 처리 중이던 이미지)",
+    }
+
+
+def run_batch(source, out_path, workers=None, save_artifacts=None,
+              retry_failed=False, lip_metric="cie76", max_in_flight=None,
+              analysis_max_side=ANALYSIS_MAX_SIDE):
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 4
+
+    done = load_done_paths(out_path, retry_failed=retry_failed)
+    stats = {"ok": 0, "error": 0, "skipped": 0, "pool_restarts": 0}
+
+    def iter_todo():
+        # 입력 목록 중 이번 실행에서 실제로 건너뛴 것만 센다
+        for i, p in enumerate(iter_input_paths(source)):
+            if p in done:
+                stats["skipped"] += 1
+                continue
+            yield i, p
+
+    todo = iter_todo()
+    start = time.perf_counter()
+
+    # 중단으로 마지막 줄이 잘려 있으면 새 기록이 거기에 이어 붙지 않도록 줄바꿈 보정
+    out_path = Path(out_path)
+    if out_path.exists() and out_path.stat().st_size > 0:
+        with open(out_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b"\n"
+        if needs_newline:
+            with open(out_path, "a", encoding="utf-8") as f:
+                f.write("\n")
+
+    ctx = mp.get_context("spawn")  # mediapipe는 fork 후 사용이 불안정
+
+    def make_pool():
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(save_artifacts, lip_metric, analysis_max_side),
+        )
+
+    pool = make_pool()
+    pending = {}     # future → (index, path)
+    carry = []       # 풀이 깨져서 제출하지 못한 작업 (새 풀에서 다시 제출)
+    broken = False
+
+    with open(out_path, "a", encoding="utf-8") as out:
+
+        def submit_more():
+            nonlocal broken
+            # 수만 장이어도 메모리에 전부 올리지 않도록 진행 중 작업 수 제한
+            while not broken and len(pending) < max_in_flight:
+                if carry:
+                    i, p = carry.pop()
+                else:
+                    try:
+                        i, p = next(todo)
+                    except StopIteration:
+                        return
+                try:
+                    pending[pool.submit(_analyze_one, i, p)] = (i, p)
+                except BrokenProcessPool:
+                    carry.append((i, p))
+                    broken = True
+
+        def record(fut):
+            nonlocal broken
+            i, p = pending.pop(fut)
+            try:
+                rec = fut.result()
+            except BrokenProcessPool as e:
+                # 워커 하나가 죽으면(세그폴트/메모리 부족 등) 풀 전체가 깨짐 → 진행 중 작업은 모두 실패
+                rec = _crashed_record(i, p, e)
+                broken = True
+            out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            out.flush()
+            stats[rec["status"]] += 1
+
+        try:
+            submit_more()
+            while pending or carry:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    record(fut)
+
+                if broken:
+                    # 깨진 풀의 나머지 작업도 곧바로 끝나므로(실패) 전부 기록한 뒤 새 풀로 계속
+                    rest, _ = wait(pending)
+                    for fut in rest:
+                        record(fut)
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    pool = make_pool()
+                    broken = False
+                    stats["pool_restarts"] += 1
+                    print(f"[batch] 워커 프로세스 비정상 종료 → 풀 재시작 ({stats['pool_restarts']}회)")
+
+                submit_more()
+
+                n = stats["ok"] + stats["error"]
+                if n and n % 100 == 0:
+                    rate = n / (time.perf_counter() - start)
+                    print(f"[batch] {n}장 처리 (성공 {stats['ok']}, 실패 {stats['error']}, {rate:.1f}장/s)")
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+    stats["elapsed_sec"] = round(time.perf_counter() - start, 2)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="퍼스널컬러 일괄 분석 (JSONL 출력, 이어하기 지원)")
+    parser.add_argument("source", help="이미지 폴더 또는 매니페스트(.txt/.csv/.jsonl)")
+    parser.add_argument("-o", "--out", default="batch_results.jsonl", help="결과 JSONL 경로")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="워커 프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--save-artifacts", default=None, help="결과 이미지 저장 폴더 (없으면 저장 안 함)")
+    parser.add_argument("--retry-failed", action="store_true", help="이전 실행에서 실패한 이미지도 다시 처리")
+    parser.add_argument("--metric", default="cie76", choices=["cie76", "ciede2000"], help="립 추천 ΔE 방식")
+    parser.add_argument("--max-side", type=int, default=ANALYSIS_MAX_SIDE,
+                        help="분석 해상도(긴 변 px). 0이면 원본 해상도")
+    args = parser.parse_args(argv)
+
+    stats = run_batch(
+        args.source,
+        args.out,
+        workers=args.workers,
+        save_artifacts=args.save_artifacts,
+        retry_failed=args.retry_failed,
+        lip_metric=args.metric,
+        analysis_max_side=args.max_side or None,
+    )
+    print(
+        f"[batch] 완료: 성공 {stats['ok']} / 실패 {stats['error']} / "
+        f"건너뜀 {stats['skipped']} / 워커 재시작 {stats['pool_restarts']} "
+        f"({stats['elapsed_sec']}s) → {args.out}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
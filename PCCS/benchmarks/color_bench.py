@@ -0,0 +1,98 @@
+# benchmarks/color_bench.py
+# -------------------------------------------------------
+# 색 변환 / ΔE 마이크로 벤치마크 (modules.color_science vs skimage)
+#
+#   python benchmarks/color_bench.py                # 기본 1,000,000색
+#   python benchmarks/color_bench.py -n 200000 -r 5
+#
+# 항목별 최고 기록(best of N) 기준 초당 변환 수와, skimage 대비 최대 오차를 출력.
+# -------------------------------------------------------
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from skimage import color
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules.color_science import (  # noqa: E402
+    srgb_to_lab, lab_to_srgb, delta_e76, delta_e2000,
+)
+
+
+def best_time(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="color_science 처리량 측정 (skimage 대비)")
+    parser.add_argument("-n", "--count", type=int, default=1_000_000, help="색 개수")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="반복 횟수 (최고 기록 사용)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    n = args.count
+    rng = np.random.default_rng(args.seed)
+    rgb_u8 = rng.integers(0, 256, (n, 3), dtype=np.uint8)
+    lab_ref = color.rgb2lab(rgb_u8[None])[0]
+    target = lab_ref[0]
+    out32 = np.empty((n, 3), dtype=np.float32)
+
+    # (이름, color_science 함수, skimage 함수, 오차 계산)
+    cases = [
+        (
+            "sRGB(u8)→Lab f32",
+            lambda: srgb_to_lab(rgb_u8, out=out32),
+            lambda: color.rgb2lab(rgb_u8[None]),
+            lambda: np.abs(srgb_to_lab(rgb_u8) - lab_ref).max(),
+        ),
+        (
+            "sRGB(u8)→Lab f64",
+            lambda: srgb_to_lab(rgb_u8, dtype=np.float64),
+            lambda: color.rgb2lab(rgb_u8[None]),
+            lambda: np.abs(srgb_to_lab(rgb_u8, dtype=np.float64) - lab_ref).max(),
+        ),
+        (
+            "Lab→sRGB f32",
+            lambda: lab_to_srgb(lab_ref),
+            lambda: color.lab2rgb(lab_ref[None]),
+            lambda: np.abs(lab_to_srgb(lab_ref) - color.lab2rgb(lab_ref[None])[0]).max(),
+        ),
+        (
+            "ΔE76 (1 vs N)",
+            lambda: delta_e76(target, lab_ref),
+            lambda: color.deltaE_cie76(target, lab_ref),
+            lambda: np.abs(delta_e76(target, lab_ref) - color.deltaE_cie76(target, lab_ref)).max(),
+        ),
+        (
+            "ΔE2000 (1 vs N)",
+            lambda: delta_e2000(target, lab_ref),
+            lambda: color.deltaE_ciede2000(np.broadcast_to(target, lab_ref.shape), lab_ref),
+            lambda: np.abs(
+                delta_e2000(target, lab_ref)
+                - color.deltaE_ciede2000(np.broadcast_to(target, lab_ref.shape), lab_ref)
+            ).max(),
+        ),
+    ]
+
+    print(f"colors={n:,}  repeat={args.repeat}  numpy={np.__version__}")
+    print(f"{'case':20s} {'ours (M/s)':>11s} {'skimage (M/s)':>14s} {'speedup':>8s} {'max err':>10s}")
+    for name, ours, ref, err in cases:
+        t_ours = best_time(ours, args.repeat)
+        t_ref = best_time(ref, args.repeat)
+        print(
+            f"{name:20s} {n / t_ours / 1e6:11.2f} {n / t_ref / 1e6:14.2f} "
+            f"{t_ref / t_ours:7.1f}x {err():10.2e}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
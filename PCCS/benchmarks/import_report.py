@@ -0,0 +1,123 @@
+# benchmarks/import_report.py
+# -------------------------------------------------------
+# 콜드 스타트 import 시간 리포트
+#   모듈마다 새 파이썬 프로세스에서 `python -X importtime -c "import <모듈>"` 실행 →
+#   전체 import 시간 + 최상위 패키지별 시간(self 합계) 상위 항목 출력.
+#   무거운 라이브러리(mediapipe, sklearn, matplotlib ...)가 import만으로 로딩되는지도 표시.
+#
+#   python benchmarks/import_report.py                    # 기본 대상
+#   python benchmarks/import_report.py app final -n 10     # 대상 지정, 상위 10개 패키지
+#   python benchmarks/import_report.py --budget app=800    # app import가 800ms 넘으면 exit 1
+#   python benchmarks/import_report.py --json import_times.json
+#
+# 리뷰 때 전후 숫자를 붙여 두면 콜드 스타트 회귀가 바로 보임.
+# (같은 모듈 캐시 상태에서 비교하려고 반복 측정 후 최솟값 사용)
+# -------------------------------------------------------
+import argparse
+import json
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+
+DEFAULT_TARGETS = [
+    "app",
+    "openai_client",
+    "chat_cache",
+    "prompt_builder",
+    "modules.lip_recommender.lip_preprocess",
+    "modules.color_science",
+]
+
+# import만으로 로딩되면 안 되는(지연 로딩 대상) 라이브러리
+HEAVY_PACKAGES = ["mediapipe", "sklearn", "matplotlib", "skimage", "tensorflow", "openai", "gradio"]
+
+
+def measure_import(target):
+    """
+    새 프로세스에서 target import → (전체 ms, {최상위 패키지: self ms}, 로딩된 모듈 이름 set)
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BASE_DIR, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        last = (proc.stderr.strip().splitlines() or ["?"])[-1]
+        raise RuntimeError(f"import {target} 실패: {last}")
+
+    per_package = defaultdict(float)
+    modules = set()
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            self_us, cumulative_us = int(self_us), int(cumulative_us)
+        except ValueError:
+            continue
+        name = name.strip()
+        modules.add(name)
+        per_package[name.split(".")[0]] += self_us / 1000
+        if name == target:
+            total_us = cumulative_us
+    return total_us / 1000, dict(per_package), modules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="모듈별 콜드 스타트 import 시간")
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS)
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="반복 횟수 (최솟값 사용)")
+    parser.add_argument("-n", "--top", type=int, default=5, help="패키지별 상위 몇 개를 보여줄지")
+    parser.add_argument("--budget", action="append", default=[], metavar="MODULE=MS",
+                        help="import 시간 상한 (넘으면 exit 1), 여러 번 지정 가능")
+    parser.add_argument("--json", help="결과를 JSON으로도 저장")
+    args = parser.parse_args(argv)
+
+    budgets = {}
+    for item in args.budget:
+        name, _, ms = item.partition("=")
+        budgets[name] = float(ms)
+
+    report = {}
+    over_budget = []
+    for target in list(args.targets) + [t for t in budgets if t not in args.targets]:
+        try:
+            runs = [measure_import(target) for _ in range(max(args.repeat, 1))]
+        except RuntimeError as e:
+            print(f"\n{target}: {e}")
+            report[target] = {"error": str(e)}
+            continue
+
+        total_ms, per_package, modules = min(runs, key=lambda r: r[0])
+        heavy = [p for p in HEAVY_PACKAGES if p in modules]
+        top = sorted(per_package.items(), key=lambda kv: -kv[1])[:args.top]
+        report[target] = {
+            "total_ms": round(total_ms, 1),
+            "modules": len(modules),
+            "heavy_loaded": heavy,
+            "top_packages_ms": {name: round(ms, 1) for name, ms in top},
+        }
+
+        print(f"\n{target}: {total_ms:.1f} ms  ({len(modules)} modules)")
+        for name, ms in top:
+            print(f"    {name:24s} {ms:8.1f} ms")
+        print(f"    무거운 라이브러리 로딩: {', '.join(heavy) if heavy else '없음'}")
+
+        limit = budgets.get(target)
+        if limit is not None and total_ms > limit:
+            over_budget.append(f"{target} {total_ms:.0f}ms > {limit:.0f}ms")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    if over_budget:
+        print("\n예산 초과: " + "; ".join(over_budget))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,124 @@
+# benchmarks/scale_report.py
+# -------------------------------------------------------
+# 분석 해상도(긴 변 px)별 단계 지연 시간 / 메모리 리포트
+#
+#   python benchmarks/scale_report.py                         # test.jpg를 4000x3000으로 키워서 측정
+#   python benchmarks/scale_report.py --image photo.jpg --no-upscale
+#   python benchmarks/scale_report.py --sides 0 2048 1280 960 640
+#
+# 단계: 디코딩(IMREAD_REDUCED_*) / FaceMesh / 피부 Lab / 눈 색
+# 메모리는 tracemalloc 최고치(numpy 배열 포함), 시간은 best of N.
+# 피부 Lab은 원본 해상도 결과 대비 ΔE76 변화도 함께 출력.
+# FaceMesh를 쓸 수 없는 환경이면 해당 단계는 건너뜀.
+# -------------------------------------------------------
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import cv2
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+from modules.color_science import delta_e76  # noqa: E402
+from modules.image_io import load_bgr_reduced  # noqa: E402
+from modules.skin_extractor import process_skin  # noqa: E402
+
+
+def measure(fn, repeat):
+    """(결과, 최소 시간 ms, tracemalloc 최고치 MB)"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best * 1000, peak / 1024 / 1024
+
+
+def make_face_runner():
+    try:
+        from modules.face_context import FaceMeshRunner
+        return FaceMeshRunner()
+    except Exception as e:
+        print(f"(FaceMesh 사용 불가 → FaceMesh/눈 색 단계 생략: {type(e).__name__}: {e})")
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="분석 해상도별 단계 지연/메모리 리포트")
+    parser.add_argument("--image", default=str(BASE_DIR / "test_images" / "test.jpg"))
+    parser.add_argument("--size", default="4000x3000", help="측정 전에 이 크기로 키운 JPEG 사용 (WxH)")
+    parser.add_argument("--no-upscale", action="store_true", help="입력 이미지를 그대로 사용")
+    parser.add_argument("--sides", type=int, nargs="+", default=[0, 2048, 1600, 1280, 960, 640],
+                        help="분석 해상도 목록 (0 = 원본)")
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    image_path = Path(args.image)
+    tmp = None
+    if not args.no_upscale:
+        w, h = (int(v) for v in args.size.lower().split("x"))
+        tmp = tempfile.NamedTemporaryFile(suffix=".jpg", delete=False)
+        tmp.close()
+        cv2.imwrite(tmp.name, cv2.resize(cv2.imread(str(image_path)), (w, h)),
+                    [cv2.IMWRITE_JPEG_QUALITY, 92])
+        image_path = Path(tmp.name)
+
+    runner = make_face_runner()
+    reference_lab = None
+
+    header = (f"{'max_side':>8s} {'work size':>11s} | {'decode ms':>9s} {'MB':>6s} | "
+              f"{'mesh ms':>7s} {'MB':>6s} | {'skin ms':>7s} {'MB':>6s} | "
+              f"{'eye ms':>6s} | {'skin ΔE':>7s}")
+    print(f"input: {image_path.name} {cv2.imread(str(image_path)).shape[1::-1]}")
+    print(header)
+    print("-" * len(header))
+
+    try:
+        for side in args.sides:
+            max_side = side or None
+
+            work, t_dec, m_dec = measure(lambda: load_bgr_reduced(image_path, max_side), args.repeat)
+            (skin_lab, _, _), t_skin, m_skin = measure(lambda: process_skin(work), args.repeat)
+
+            if reference_lab is None:
+                reference_lab = skin_lab  # 첫 항목(기본: 원본) 기준
+            drift = float(delta_e76(reference_lab, skin_lab))
+
+            mesh_cols = f"{'-':>7s} {'-':>6s}"
+            eye_col = f"{'-':>6s}"
+            if runner is not None:
+                from modules.eye_extractor import extract_eye_roi, compute_eye_color
+
+                ctx, t_mesh, m_mesh = measure(lambda: runner.process(work), args.repeat)
+                mesh_cols = f"{t_mesh:7.1f} {m_mesh:6.1f}"
+                if ctx.found:
+                    _, t_eye, _ = measure(
+                        lambda: compute_eye_color(extract_eye_roi(work, ctx.landmarks)), args.repeat
+                    )
+                    eye_col = f"{t_eye:6.1f}"
+
+            size = f"{work.shape[1]}x{work.shape[0]}"
+            print(f"{side or 'full':>8} {size:>11s} | {t_dec:9.1f} {m_dec:6.1f} | {mesh_cols} | "
+                  f"{t_skin:7.1f} {m_skin:6.1f} | {eye_col} | {drift:7.3f}")
+    finally:
+        if runner is not None:
+            runner.close()
+        if tmp is not None:
+            Path(tmp.name).unlink(missing_ok=True)
+
+    print("\n합성 이미지(박스/메쉬/팔레트/립)는 해상도와 무관하게 원본에서 생성됨")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,363 @@
+# benchmarks/stage_bench.py
+# -------------------------------------------------------
+# 분석 파이프라인 단계별 벤치마크 (+ 기준값 저장 / 회귀 비교)
+#
+#   python benchmarks/stage_bench.py                      # 측정만
+#   python benchmarks/stage_bench.py --save               # 기준값 저장 (baselines/stage_bench.json)
+#   python benchmarks/stage_bench.py --compare            # 기준값과 비교, 회귀 있으면 exit 1
+#   python benchmarks/stage_bench.py --compare --threshold 15 --sizes 640x480 1920x1440
+#
+# 단계 (AnalysisEngine.analyze와 같은 입력/해상도로 호출)
+#   공통   : 팔레트 로딩(캐시) / 시즌 분류기 생성 / 립 카탈로그 로딩(컴파일본) / 시즌 판정 / 립 추천 / 피부 위치 차트
+#   이미지별: 디코딩 / 분석용 축소 / FaceMesh / 피부 Lab / 픽셀 시즌 지도 / 눈 색 /
+#            입술 마스크 / 립 합성(TOP 5) / 팔레트 합성
+#
+# 입력: test_images/test.jpg (--images로 추가) + 합성 얼굴 이미지(--sizes 해상도별)
+#   합성 이미지는 피부색 타원 + 눈 + 입술을 그리고 같은 위치에 가짜 랜드마크를 둬서
+#   FaceMesh 없이도 눈/입술 단계를 측정할 수 있게 함.
+#   (mediapipe FaceMesh를 쓸 수 없는 환경이면 FaceMesh 단계와 실사진의 얼굴 단계는 건너뜀)
+#
+# OpenAI 키 / 네트워크 필요 없음. 시간은 best of N(ms).
+# 기준값은 측정한 기계에 묶인 값이라 같은 기계에서 전후 비교할 때 사용.
+# -------------------------------------------------------
+import argparse
+import json
+import platform
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+from modules.eye_extractor import (  # noqa: E402
+    extract_eye_roi, compute_eye_color, LEFT_EYE_INDICES, RIGHT_EYE_INDICES,
+)
+from modules.face_context import FaceContext  # noqa: E402
+from modules.image_io import load_bgr, fit_max_side, ANALYSIS_MAX_SIDE  # noqa: E402
+from modules.lip_recommender.lip_catalog import load_lip_catalog  # noqa: E402
+from modules.lip_recommender.lip_recommender import (  # noqa: E402
+    recommend_lip_colors, attach_season_labels,
+)
+from modules.lip_recommender.lip_simulator import (  # noqa: E402
+    LipRenderContext, UPPER_LIP, LOWER_LIP, INNER_MOUTH,
+)
+from modules.palette_cache import load_season_grid  # noqa: E402
+from modules.palette_processor import load_all_palettes  # noqa: E402
+from modules.season_classifier import SeasonKNNClassifier  # noqa: E402
+from modules.season_map import skin_season_map  # noqa: E402
+from modules.season_visualizer import render_skin_position, SKIN_CHART_SIZE  # noqa: E402
+from modules.skin_extractor import process_skin, SkinNotFoundError  # noqa: E402
+from modules.visualize_palette import compose_palette_image  # noqa: E402
+
+PALETTES_DIR = BASE_DIR / "palettes"
+LIP_CSV_PATH = BASE_DIR / "modules" / "lip_data" / "colorchips_data.csv"
+DEFAULT_IMAGES = [BASE_DIR / "test_images" / "test.jpg"]
+DEFAULT_SIZES = ["640x480", "1280x960", "1920x1440", "4000x3000"]
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "stage_bench.json"
+
+DEFAULT_THRESHOLD = 20.0   # 기준값 대비 몇 % 느려지면 회귀로 볼지
+DEFAULT_MIN_DELTA = 1.0    # 이 ms보다 작은 차이는 측정 잡음으로 보고 무시
+
+FACE_MESH_POINTS = 468
+
+
+def best_time(fn, repeat):
+    """(마지막 결과, 최소 ms, 중앙값 ms)"""
+    times = []
+    result = None
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return result, min(times), float(np.median(times))
+
+
+# ============================================================
+# 합성 얼굴 (이미지 + 같은 위치의 가짜 FaceMesh 랜드마크)
+# ============================================================
+def _ellipse(cx, cy, rx, ry, n, start=0.0, stop=2 * np.pi):
+    t = np.linspace(start, stop, n, endpoint=stop - start < 2 * np.pi - 1e-9)
+    return np.stack([cx + rx * np.cos(t), cy + ry * np.sin(t)], axis=1)
+
+
+def synthetic_landmarks():
+    """정규화 좌표 (468, 2): 얼굴 윤곽 위에 깔고 눈/입술 인덱스만 제자리에 배치"""
+    pts = _ellipse(0.5, 0.5, 0.26, 0.36, FACE_MESH_POINTS)
+    pts[LEFT_EYE_INDICES] = _ellipse(0.39, 0.43, 0.055, 0.022, len(LEFT_EYE_INDICES))
+    pts[RIGHT_EYE_INDICES] = _ellipse(0.61, 0.43, 0.055, 0.022, len(RIGHT_EYE_INDICES))
+    # 입술: 왼쪽 입꼬리 → 오른쪽 입꼬리 (윗입술은 위쪽 반원, 아랫입술은 아래쪽 반원)
+    pts[UPPER_LIP] = _ellipse(0.5, 0.70, 0.09, 0.035, len(UPPER_LIP), np.pi, 2 * np.pi)
+    pts[LOWER_LIP] = _ellipse(0.5, 0.70, 0.09, 0.04, len(LOWER_LIP), np.pi, 0.0)
+    # 입 안쪽: 다문 입 (13, 14가 같은 높이 → 입벌림 0)
+    pts[INNER_MOUTH] = _ellipse(0.5, 0.70, 0.05, 0.003, len(INNER_MOUTH))
+    pts[13] = (0.5, 0.70)
+    pts[14] = (0.5, 0.70)
+    return pts
+
+
+def synthetic_face(width, height, seed=0):
+    """(BGR 이미지, FaceContext) - 랜드마크 위치에 피부/눈/입술을 그린 합성 얼굴"""
+    rng = np.random.default_rng(seed)
+    pts = synthetic_landmarks()
+    scale = np.array([width, height], dtype=np.float64)
+
+    img = np.empty((height, width, 3), dtype=np.uint8)
+    img[:] = (190, 200, 205)
+    face = (_ellipse(0.5, 0.5, 0.26, 0.36, 180) * scale).astype(np.int32)
+    cv2.fillPoly(img, [face], (150, 175, 215))
+    for indices in (LEFT_EYE_INDICES, RIGHT_EYE_INDICES):
+        cv2.fillPoly(img, [(pts[indices] * scale).astype(np.int32)], (60, 70, 80))
+    lips = np.concatenate([pts[UPPER_LIP], pts[LOWER_LIP][::-1]])
+    cv2.fillPoly(img, [(lips * scale).astype(np.int32)], (90, 80, 180))
+
+    noise = rng.normal(0, 6, img.shape)
+    img = np.clip(img + noise, 0, 255).astype(np.uint8)
+
+    face_list = SimpleNamespace(landmark=[SimpleNamespace(x=float(x), y=float(y)) for x, y in pts])
+    return img, FaceContext(img.shape, face_list)
+
+
+def make_face_runner():
+    try:
+        from modules.face_context import FaceMeshRunner
+        return FaceMeshRunner()
+    except Exception as e:
+        print(f"(FaceMesh 사용 불가 → FaceMesh 단계, 실사진 눈/입술 단계 생략: {type(e).__name__}: {e})")
+        return None
+
+
+# ============================================================
+# 측정
+# ============================================================
+def bench_common(repeat):
+    """이미지와 무관한 단계 → ({단계: (min, median)}, 상태 dict)"""
+    results = {}
+
+    def record(name, fn):
+        value, best, median = best_time(fn, repeat)
+        results[name] = (best, median)
+        return value
+
+    palettes = record("palette_load", lambda: load_all_palettes(PALETTES_DIR))
+
+    def build_classifier():
+        clf = SeasonKNNClassifier(palettes)
+        clf.attach_grid(load_season_grid(PALETTES_DIR))
+        return clf
+
+    clf = record("classifier_init", build_classifier)
+    lip_df = record("lip_catalog", lambda: attach_season_labels(load_lip_catalog(LIP_CSV_PATH), clf))
+
+    skin_input = np.array([62.0, 12.0, 16.0])
+    classified = record("classify", lambda: clf.classify(skin_input))
+    record("recommend", lambda: recommend_lip_colors(
+        season_classifier=clf, user_season=classified["season"],
+        skin_lab=skin_input, lip_df=lip_df,
+    ))
+
+    # 차트 배경은 서버 warmup에서 한 번 만들어 두므로 요청 경로(마커만 그리기)를 측정
+    render_skin_position(palettes, skin_input, SKIN_CHART_SIZE)
+    record("chart", lambda: render_skin_position(palettes, skin_input, SKIN_CHART_SIZE))
+
+    state = {"palettes": palettes, "clf": clf, "lip_df": lip_df, "season": classified["season"]}
+    return results, state
+
+
+def bench_image(img, face_ctx, state, runner, repeat, path=None, max_side=ANALYSIS_MAX_SIDE):
+    """이미지 한 장의 단계별 → {단계: (min, median)} (건너뛴 단계는 빠짐)"""
+    results = {}
+
+    def record(name, fn):
+        value, best, median = best_time(fn, repeat)
+        results[name] = (best, median)
+        return value
+
+    if path is not None:
+        record("decode", lambda: load_bgr(path))
+    work = record("downscale", lambda: fit_max_side(img, max_side))
+
+    if runner is not None:
+        detected = record("face_mesh", lambda: runner.process(work))
+        if face_ctx is None and detected.found:
+            face_ctx = detected
+
+    try:
+        skin_lab, corrected, mask = record("skin", lambda: process_skin(work))
+    except SkinNotFoundError:
+        skin_lab = None
+    if skin_lab is not None and state["clf"].grid is not None:
+        record("season_map", lambda: skin_season_map(state["clf"], corrected, mask))
+
+    if face_ctx is not None:
+        record("eye", lambda: compute_eye_color(extract_eye_roi(work, face_ctx.landmarks, eye="both")))
+        lip = record("lip_mask", lambda: LipRenderContext.from_face(img, face_ctx=face_ctx))
+        colors = [tuple(int(v) for v in row) for row in state["lip_df"][["r", "g", "b"]].values[:5]]
+        record("lip_render", lambda: lip.render_many(colors))
+
+    palette_df = state["palettes"][state["season"]]
+    record("palette_composite", lambda: compose_palette_image(img, palette_df, block_size=100, max_rows=2))
+    return results
+
+
+def run_suite(images, sizes, repeat):
+    """전체 측정 → {"그룹/단계": {"ms": 최소, "median_ms": 중앙값}}"""
+    runner = make_face_runner()
+    common, state = bench_common(repeat)
+    groups = {"common": common}
+
+    for path in images:
+        path = Path(path)
+        img = load_bgr(path)
+        groups[f"{path.name}"] = bench_image(img, None, state, runner, repeat, path=path)
+
+    for size in sizes:
+        w, h = (int(v) for v in size.lower().split("x"))
+        img, face_ctx = synthetic_face(w, h)
+        groups[f"synthetic_{w}x{h}"] = bench_image(img, face_ctx, state, runner, repeat)
+
+    results = {}
+    for group, stages in groups.items():
+        for stage, (best, median) in stages.items():
+            results[f"{group}/{stage}"] = {"ms": round(best, 3), "median_ms": round(median, 3)}
+    return results
+
+
+def print_results(results):
+    groups = {}
+    for key, value in results.items():
+        group, stage = key.split("/", 1)
+        groups.setdefault(group, []).append((stage, value))
+    for group, stages in groups.items():
+        print(f"\n[{group}]")
+        for stage, value in stages:
+            print(f"    {stage:18s} {value['ms']:9.2f} ms   (median {value['median_ms']:.2f})")
+
+
+# ============================================================
+# 기준값 저장 / 비교
+# ============================================================
+def environment_info(repeat):
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+    }
+
+
+def save_baseline(path, results, repeat):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {"meta": environment_info(repeat), "results": results}
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+
+def compare(baseline, results, threshold=DEFAULT_THRESHOLD, min_delta=DEFAULT_MIN_DELTA):
+    """
+    기준값 대비 비교 → (행 리스트, 회귀 키 리스트)
+    회귀: threshold% 이상 느려지고 차이가 min_delta ms 이상인 단계
+    """
+    base = baseline.get("results", {})
+    rows = []
+    regressions = []
+    for key in sorted(set(base) | set(results)):
+        old = base.get(key, {}).get("ms")
+        new = results.get(key, {}).get("ms")
+        if old is None or new is None:
+            rows.append((key, old, new, None, "없음" if new is None else "새 항목"))
+            continue
+        change = (new - old) / old * 100 if old > 0 else 0.0
+        status = ""
+        if change >= threshold and new - old >= min_delta:
+            status = "회귀"
+            regressions.append(key)
+        elif change <= -threshold and old - new >= min_delta:
+            status = "개선"
+        rows.append((key, old, new, change, status))
+    return rows, regressions
+
+
+def merge_best(a, b):
+    """두 번 측정한 결과를 단계별 최소값으로 합침 (회귀 재확인용)"""
+    merged = dict(a)
+    for key, value in b.items():
+        if key not in merged or value["ms"] < merged[key]["ms"]:
+            merged[key] = value
+    return merged
+
+
+def print_comparison(rows):
+    print(f"\n{'stage':40s} {'base ms':>10s} {'now ms':>10s} {'change':>8s}")
+    for key, old, new, change, status in rows:
+        old_s = f"{old:10.2f}" if old is not None else f"{'-':>10s}"
+        new_s = f"{new:10.2f}" if new is not None else f"{'-':>10s}"
+        change_s = f"{change:+7.1f}%" if change is not None else f"{'':>8s}"
+        print(f"{key:40s} {old_s} {new_s} {change_s}  {status}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="분석 파이프라인 단계별 벤치마크")
+    parser.add_argument("--images", nargs="*", default=[str(p) for p in DEFAULT_IMAGES],
+                        help="측정할 실사진 (기본 test_images/test.jpg)")
+    parser.add_argument("--sizes", nargs="*", default=DEFAULT_SIZES,
+                        help="합성 얼굴 해상도 목록 (WxH), 비우면 합성 이미지 생략")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="반복 횟수 (최소값 사용)")
+    parser.add_argument("--save", nargs="?", const=str(DEFAULT_BASELINE), metavar="PATH",
+                        help="결과를 기준값 JSON으로 저장")
+    parser.add_argument("--compare", nargs="?", const=str(DEFAULT_BASELINE), metavar="PATH",
+                        help="기준값 JSON과 비교 (회귀가 있으면 exit 1)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="회귀로 볼 느려짐 비율 %% (기본 20)")
+    parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA,
+                        help="무시할 차이 ms (측정 잡음, 기본 1.0)")
+    parser.add_argument("--retries", type=int, default=1,
+                        help="회귀가 보이면 다시 측정해서 최소값으로 재확인할 횟수 (기본 1)")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        baseline_path = Path(args.compare)
+        if not baseline_path.exists():
+            print(f"기준값 파일 없음: {baseline_path} (--save로 먼저 생성)")
+            return 2
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+
+    results = run_suite(args.images, args.sizes, args.repeat)
+
+    if baseline is not None:
+        # 순간적인 CPU 경합으로 느려진 것인지 다시 측정해서 확인
+        for _ in range(max(args.retries, 0)):
+            _, regressions = compare(baseline, results, args.threshold, args.min_delta)
+            if not regressions:
+                break
+            print(f"(회귀 의심 {len(regressions)}건 → 다시 측정)")
+            results = merge_best(results, run_suite(args.images, args.sizes, args.repeat))
+
+    print_results(results)
+
+    if args.save:
+        save_baseline(args.save, results, args.repeat)
+        print(f"\n기준값 저장: {args.save}")
+
+    if baseline is not None:
+        rows, regressions = compare(baseline, results, args.threshold, args.min_delta)
+        print(f"\n기준값: {baseline_path} ({baseline.get('meta', {}).get('created', '?')})")
+        print_comparison(rows)
+        if regressions:
+            print(f"\n회귀 {len(regressions)}건 (+{args.threshold:g}% 이상): " + ", ".join(regressions))
+            return 1
+        print(f"\n회귀 없음 (기준 +{args.threshold:g}%, 최소 {args.min_delta:g}ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,263 @@
+# chat_cache.py
+# -------------------------------------------------------
+# 챗봇 답변 디스크 캐시 (SQLite)
+#   "여름쿨인데 립 추천해줘" 처럼 자주 반복되는 질문은
+#   같은 시즌 + 같은 추천 TOP 5 조건이면 답변도 사실상 같으므로 저장해 두고 재사용.
+#
+#   키 = (질문, 시즌, 추천 제품 집합)
+#     - exact 단계: 질문 앞뒤 공백만 정리한 문자열 그대로
+#     - norm  단계: 대소문자/공백/문장부호/이모지/끝의 높임 "요"를 정리한 문자열
+#   제거 규칙
+#     - TTL: 저장 후 ttl_sec 지나면 만료 (조회 시 삭제)
+#     - LRU: max_entries 넘으면 마지막 사용 시각이 오래된 것부터 삭제
+#   통계: 단계별 적중 수 / 미스 수 / 적중률 / 절약한 응답 시간(저장 당시 생성 시간 합)
+#
+#   python chat_cache.py --stats      # 통계 출력
+#   python chat_cache.py --clear      # 전체 삭제
+# -------------------------------------------------------
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+DEFAULT_DB_PATH = BASE_DIR / "uploads" / "chat_cache.sqlite3"
+
+CHAT_CACHE_TTL_SEC = 7 * 24 * 3600   # 일주일 지나면 다시 생성
+CHAT_CACHE_MAX_ENTRIES = 5000
+
+# 정규화 시 지울 문자: 공백, 문장부호, 기호(이모지 포함)
+_STRIP_CATEGORIES = ("Z", "P", "S")
+# 질문 끝의 높임 "요" (예: "추천해줘요" ≒ "추천해줘", "어울리나요" ≒ "어울리나")
+#   동사 어미(세/해/줘/나/까) 바로 뒤의 요/용/염만 지움 → "필요", "중요" 같은 명사는 그대로
+_TRAILING_PARTICLES = re.compile(r"(?<=[세해줘나까])(요|용|염)$")
+# 정규화 규칙이 바뀌면 올려서 기존 norm 키를 무효화 (exact 키는 그대로 적중)
+_NORM_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chat_cache (
+    key         TEXT PRIMARY KEY,
+    norm_key    TEXT NOT NULL,
+    question    TEXT NOT NULL,
+    season      TEXT,
+    reply       TEXT NOT NULL,
+    latency_ms  REAL NOT NULL,
+    created_at  REAL NOT NULL,
+    last_used   REAL NOT NULL,
+    hits        INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_chat_cache_norm ON chat_cache(norm_key, created_at);
+CREATE INDEX IF NOT EXISTS idx_chat_cache_used ON chat_cache(last_used);
+CREATE TABLE IF NOT EXISTS chat_cache_stats (
+    name   TEXT PRIMARY KEY,
+    value  REAL NOT NULL
+);
+"""
+
+_STAT_NAMES = ("hits_exact", "hits_norm", "misses", "saved_ms")
+
+
+def normalize_question(text):
+    """비교용 질문 정규화: NFKC, 소문자, 공백/문장부호/이모지 제거, 끝 어미 정리"""
+    text = unicodedata.normalize("NFKC", str(text)).lower()
+    text = "".join(
+        ch for ch in text if not unicodedata.category(ch).startswith(_STRIP_CATEGORIES)
+    )
+    return _TRAILING_PARTICLES.sub("", text)
+
+
+def recommendation_set(recommendations):
+    """추천 리스트 → 순서와 무관한 (brand, option, hex) 정렬 튜플"""
+    items = []
+    for rec in recommendations or []:
+        if isinstance(rec, dict):
+            items.append((str(rec.get("brand", "")), str(rec.get("option", "")),
+                          str(rec.get("hex", "")).upper()))
+    return sorted(items)
+
+
+def _digest(question, season, recommendations):
+    payload = json.dumps(
+        [question, season or "", recommendation_set(recommendations)],
+        ensure_ascii=False, separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cache_keys(question, season=None, recommendations=None):
+    """(exact 키, norm 키)"""
+    exact = _digest(str(question).strip(), season, recommendations)
+    norm = _digest(f"v{_NORM_VERSION}:{normalize_question(question)}", season, recommendations)
+    return exact, norm
+
+
+class ChatCache:
+    """
+    SQLite 기반 LRU + TTL 답변 캐시 (스레드 안전).
+    조회/저장이 수 ms 이내라서 async 콜백 안에서 바로 불러도 됨.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH, ttl_sec=CHAT_CACHE_TTL_SEC,
+                 max_entries=CHAT_CACHE_MAX_ENTRIES, use_norm=True):
+        self.db_path = Path(db_path)
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self.use_norm = use_norm
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    # ---------------------------------------------------
+    # 통계
+    # ---------------------------------------------------
+    def _bump(self, **deltas):
+        self._conn.executemany(
+            "INSERT INTO chat_cache_stats(name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            list(deltas.items()),
+        )
+
+    def stats(self):
+        with self._lock:
+            rows = dict(self._conn.execute("SELECT name, value FROM chat_cache_stats"))
+            entries = self._conn.execute("SELECT COUNT(*) FROM chat_cache").fetchone()[0]
+        stats = {name: rows.get(name, 0) for name in _STAT_NAMES}
+        for name in ("hits_exact", "hits_norm", "misses"):
+            stats[name] = int(stats[name])
+        hits = stats["hits_exact"] + stats["hits_norm"]
+        total = hits + stats["misses"]
+        stats["hit_rate"] = hits / total if total else 0.0
+        stats["entries"] = entries
+        return stats
+
+    # ---------------------------------------------------
+    # 조회 / 저장
+    # ---------------------------------------------------
+    def get(self, question, season=None, recommendations=None):
+        """적중 시 (답변, 단계 "exact"/"norm"), 아니면 None"""
+        exact, norm = cache_keys(question, season, recommendations)
+        now = time.time()
+        expire_before = now - self.ttl_sec
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key, reply, latency_ms, created_at FROM chat_cache WHERE key = ?",
+                (exact,),
+            ).fetchone()
+            tier = "exact"
+            if row is None and self.use_norm:
+                row = self._conn.execute(
+                    "SELECT key, reply, latency_ms, created_at FROM chat_cache "
+                    "WHERE norm_key = ? AND created_at >= ? "
+                    "ORDER BY created_at DESC LIMIT 1",
+                    (norm, expire_before),
+                ).fetchone()
+                tier = "norm"
+
+            if row is not None and row[3] < expire_before:
+                self._conn.execute("DELETE FROM chat_cache WHERE key = ?", (row[0],))
+                row = None
+
+            if row is None:
+                self._bump(misses=1)
+                self._conn.commit()
+                return None
+
+            key, reply, latency_ms, _ = row
+            self._conn.execute(
+                "UPDATE chat_cache SET last_used = ?, hits = hits + 1 WHERE key = ?",
+                (now, key),
+            )
+            self._bump(**{f"hits_{tier}": 1, "saved_ms": latency_ms})
+            self._conn.commit()
+            return reply, tier
+
+    def put(self, question, reply, season=None, recommendations=None, latency_ms=0.0):
+        """답변 저장 (같은 키면 덮어씀) 후 TTL/LRU 정리"""
+        if not reply:
+            return
+        exact, norm = cache_keys(question, season, recommendations)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO chat_cache"
+                "(key, norm_key, question, season, reply, latency_ms, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (exact, norm, str(question).strip(), season, reply, float(latency_ms), now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM chat_cache WHERE created_at < ?", (now - self.ttl_sec,))
+        overflow = self._conn.execute("SELECT COUNT(*) FROM chat_cache").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM chat_cache WHERE key IN "
+                "(SELECT key FROM chat_cache ORDER BY last_used ASC LIMIT ?)",
+                (overflow,),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM chat_cache")
+            self._conn.execute("DELETE FROM chat_cache_stats")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_default_cache():
+    """환경변수 설정을 반영한 기본 캐시 (CHAT_CACHE=0 이면 None → 캐시 사용 안 함)"""
+    if os.getenv("CHAT_CACHE", "1") == "0":
+        return None
+    return ChatCache(
+        os.getenv("CHAT_CACHE_PATH") or DEFAULT_DB_PATH,
+        ttl_sec=float(os.getenv("CHAT_CACHE_TTL_SEC", CHAT_CACHE_TTL_SEC)),
+        max_entries=int(os.getenv("CHAT_CACHE_MAX_ENTRIES", CHAT_CACHE_MAX_ENTRIES)),
+        use_norm=os.getenv("CHAT_CACHE_NORM", "1") != "0",
+    )
+
+
+def format_stats(stats):
+    return (
+        f"entries={stats['entries']}  "
+        f"hit_rate={stats['hit_rate']:.1%} "
+        f"(exact {stats['hits_exact']}, norm {stats['hits_norm']}, miss {stats['misses']})  "
+        f"saved={stats['saved_ms'] / 1000:.1f}s"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="챗봇 답변 캐시 통계/정리")
+    parser.add_argument("--db", default=os.getenv("CHAT_CACHE_PATH") or str(DEFAULT_DB_PATH))
+    parser.add_argument("--stats", action="store_true", help="통계 출력 (기본 동작)")
+    parser.add_argument("--clear", action="store_true", help="캐시/통계 전체 삭제")
+    args = parser.parse_args(argv)
+
+    cache = ChatCache(args.db)
+    try:
+        if args.clear:
+            cache.clear()
+            print("캐시 삭제 완료")
+        print(format_stats(cache.stats()))
+    finally:
+        cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,104 +1,151 @@
+import asyncio
 import os
-import sys
-import subprocess
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from contextlib import redirect_stdout, redirect_stderr
+from contextlib import aclosing, redirect_stdout, redirect_stderr
 import html  # ✅ 컬러칩 HTML 만들 때 사용
 
+import cv2
 import gradio as gr
 
-from openai_client import ask_openai, API_KEY
+import openai_client
+from openai_client import stream_openai
+from chat_cache import open_default_cache
+from prompt_builder import build_messages, clean_history
+from app import AnalysisEngine
+from modules.image_io import load_bgr
+from modules.seasons import SEASONS
+from modules.job_queue import (
+    AnalysisQueue, QueueFullError, ANALYSIS_WORKERS, ANALYSIS_QUEUE_DEPTH, start_metrics_server,
+)
+from modules.workspace import WorkspaceManager
 
 # -----------------------------
 # 경로 설정
 # -----------------------------
 BASE_DIR = Path(__file__).resolve().parent        # LP/PCCS
-APP_PATH = BASE_DIR / "app.py"                    # LP/PCCS/app.py
 UPLOAD_DIR = BASE_DIR / "uploads"                 # 업로드 이미지 저장
 UPLOAD_DIR.mkdir(exist_ok=True)
 
-# (참고용으로만 두고, 실제 시스템 프롬프트는 chat() 안에서 동적으로 생성)
-SYSTEM_PROMPT_BASE = (
-    "당신은 퍼스널컬러 전문가로서 친절하고 유익하게 상담해주는 챗봇입니다."
+# -----------------------------
+# 요청별 작업 폴더 (uploads/jobs/<job_id>/)
+#   동시에 여러 명이 분석해도 결과 파일이 섞이지 않도록 요청마다 분리하고,
+#   오래되었거나 전체 용량/개수를 넘긴 폴더는 새 요청 때 자동 정리
+# -----------------------------
+WORKSPACES = WorkspaceManager(
+    UPLOAD_DIR / "jobs",
+    max_age_sec=30 * 60,                # 30분 지난 결과 삭제
+    max_total_bytes=512 * 1024 * 1024,  # 전체 512MB 초과 시 오래된 것부터 삭제
+    max_jobs=100,
 )
 
+# -----------------------------
+# 분석 엔진: 서버 시작 시 한 번만 생성
+#   (팔레트 추출, KNN 준비, 립 CSV 로딩을
+#    매 클릭마다 반복하지 않도록 프로세스에 상주시킴)
+# -----------------------------
+ENGINE = AnalysisEngine()
 
-def extract_recommend_block(log_text: str) -> str:
-    """
-    app.py 출력(log_text)에서
-    '최종 추천 TOP 5:' 이후의 립 추천 테이블만 뽑아서
+# -----------------------------
+# 분석 대기열
+#   동시에 실행하는 분석 수(ANALYSIS_WORKERS)와 기다릴 수 있는 요청 수(ANALYSIS_QUEUE_DEPTH)를
+#   제한해서 요청이 몰려도 메모리/CPU가 끝없이 늘지 않도록 함. 넘치면 바로 안내 후 거절.
+#   METRICS_PORT를 주면 http://<host>:<port>/metrics 로 대기열 지표(Prometheus) 노출
+# -----------------------------
+ANALYSIS_QUEUE = AnalysisQueue(
+    workers=int(os.getenv("ANALYSIS_WORKERS", ANALYSIS_WORKERS)),
+    max_depth=int(os.getenv("ANALYSIS_QUEUE_DEPTH", ANALYSIS_QUEUE_DEPTH)),
+)
+QUEUE_POLL_SEC = 0.5
 
-    ▶ 인덱스 / RGB(r,g,b) / 뒤 로그는 제거하고
-    ▶ '브랜드  옵션  #HEX' 형식의 줄들만 반환.
-    """
-    lines = log_text.splitlines()
-    start = None
-
-    # 1) '최종 추천 TOP 5'가 나오는 줄 위치 찾기
-    for i, line in enumerate(lines):
-        if "최종 추천 TOP 5" in line:
-            start = i
-            break
-
-    if start is None:
-        return "추천 정보를 로그에서 찾지 못했습니다."
-
-    result_lines = []
-
-    # 2) 그 다음 줄부터 테이블 부분만 파싱
-    for line in lines[start + 1:]:
-        s = line.strip()
-        if not s:
-            # 빈 줄을 만나고 나서 이미 뭔가를 모았다면, 거기서 끝
-            if result_lines:
-                break
-            else:
-                continue
-
-        # ▶ 테이블 이후의 로그가 시작되면 거기서 끝내기
-        if s.startswith("[stderr]") \
-           or s.startswith("립 합성 이미지 생성 중") \
-           or "옵션 저장 완료" in s:
-            break
-
-        # ▶ 헤더 줄(brand option hex r g b)은 건너뛰기
-        if "brand" in s and "option" in s and "hex" in s:
-            continue
-
-        # ▶ 실제 데이터 줄만 처리 (hex 코드 포함)
-        if "#" not in s:
-            continue
-
-        tokens = s.split()
-        # 예상 형식: index, brand, option..., #HEX, r, g, b
-        # ex) ['464','오아드','008브로위','#521C13','82','28','19']
-        if len(tokens) < 4:
-            continue
-
-        # 마지막 3개는 r,g,b 이고, 그 앞이 hex 라고 가정
-        hex_idx = -4
-        if not tokens[hex_idx].startswith("#"):
-            # 혹시 포맷이 달라졌으면 skip
-            continue
-
-        index = tokens[0]
-        brand = tokens[1]
-        hex_code = tokens[hex_idx]
-        option_tokens = tokens[2:hex_idx]  # brand와 hex 사이가 옵션
-        option = " ".join(option_tokens) if option_tokens else ""
-
-        # "브랜드  옵션  #HEX" 형태로 정리
-        if option:
-            pretty_line = f"{brand}  {option}  {hex_code}"
-        else:
-            pretty_line = f"{brand}  {hex_code}"
+# /metrics: 대기열 지표 + 분석 단계별 시간/CPU/메모리 지표 (modules.tracing)
+if os.getenv("METRICS_PORT"):
+    start_metrics_server(
+        lambda: ANALYSIS_QUEUE.metrics_text() + ENGINE.stage_metrics.metrics_text(),
+        port=int(os.getenv("METRICS_PORT")),
+    )
+
+# -----------------------------
+# 립 합성 컨텍스트 캐시 (job_id → LipRenderContext)
+#   분석 때 만든 입술 마스크/텍스처를 보관해 두고
+#   '다른 색상 입혀보기'에서 재사용.
+#   컨텍스트마다 원본 해상도 이미지를 들고 있어서(12MP ≈ 36MB, 48MP ≈ 144MB)
+#   개수와 전체 바이트(LIP_RENDER_CACHE_MB) 둘 다 넘지 않게 오래된 것부터 버림.
+#   (방금 넣은 것 하나는 한도보다 커도 유지)
+# -----------------------------
+LIP_RENDER_CACHE_SIZE = 32
+LIP_RENDER_CACHE_BYTES = int(os.getenv("LIP_RENDER_CACHE_MB", "512")) * 1024 * 1024
+_LIP_RENDER_CACHE = OrderedDict()
+_LIP_RENDER_LOCK = threading.Lock()
+
+
+def remember_lip_render(job_id, lip_render):
+    if job_id is None or lip_render is None:
+        return
+    with _LIP_RENDER_LOCK:
+        _LIP_RENDER_CACHE[job_id] = lip_render
+        _LIP_RENDER_CACHE.move_to_end(job_id)
+        total = sum(c.nbytes for c in _LIP_RENDER_CACHE.values())
+        while len(_LIP_RENDER_CACHE) > 1 and (
+            len(_LIP_RENDER_CACHE) > LIP_RENDER_CACHE_SIZE or total > LIP_RENDER_CACHE_BYTES
+        ):
+            _, evicted = _LIP_RENDER_CACHE.popitem(last=False)
+            total -= evicted.nbytes
+
+
+def get_lip_render(job_id):
+    with _LIP_RENDER_LOCK:
+        lip_render = _LIP_RENDER_CACHE.get(job_id)
+        if lip_render is not None:
+            _LIP_RENDER_CACHE.move_to_end(job_id)
+        return lip_render
 
-        result_lines.append(pretty_line)
 
-    if not result_lines:
-        return "추천 정보를 로그에서 찾지 못했습니다."
+def lip_shade_choices(lip_df):
+    """립 카탈로그 전체 → Dropdown 선택지 [(\"브랜드 옵션 #HEX\", 행 번호)]"""
+    return [
+        (f"{row['brand']}  {row['option']}  {row['hex']}", int(i))
+        for i, row in lip_df.iterrows()
+    ]
+
+
+LIP_SHADE_CHOICES = lip_shade_choices(ENGINE.lip_df)
 
-    return "\n".join(result_lines)
+# -----------------------------
+# 챗봇 답변 캐시 (uploads/chat_cache.sqlite3)
+#   대화 첫 질문만 (질문, 시즌, 추천 TOP 5) 기준으로 저장/재사용.
+#   이전 대화가 있으면 답이 대화 흐름에 따라 달라지므로 캐시하지 않음.
+#   CHAT_CACHE=0 이면 사용 안 함, 통계는 python chat_cache.py --stats
+# -----------------------------
+CHAT_CACHE = open_default_cache()
+
+# 챗봇 시스템 프롬프트 (분석 결과 요약/이전 대화 요약은 prompt_builder가 뒤에 붙임)
+SYSTEM_PROMPT = (
+    "당신은 퍼스널컬러 전문가로서 친절하고 유익하게 상담해주는 챗봇입니다.\n"
+    "아래에 사용자의 최근 퍼스널컬러 분석/추천 정보가 있으면, "
+    "가장 어울리는 퍼스널컬러는 득표수가 높은 시즌으로 판단하되, 득표수가 동률일 경우에는 색상거리가 짧은 시즌을 우선시하고 순위를 매겨 답변할때 참고하세요. "
+    "대화 중 이 정보를 기억하고 적극 활용해 주세요."
+)
+
+
+def format_recommend_text(result: dict) -> str:
+    """
+    분석 결과(dict)의 추천 립 목록을
+    '브랜드  옵션  #HEX' 형식의 줄들로 변환.
+    """
+    recs = (result or {}).get("recommendations") or []
+    if not recs:
+        return "추천 정보를 가져올 수 없습니다."
+
+    lines = []
+    for r in recs:
+        if r.get("option"):
+            lines.append(f"{r['brand']}  {r['option']}  {r['hex']}")
+        else:
+            lines.append(f"{r['brand']}  {r['hex']}")
+    return "\n".join(lines)
 
 
 def recommend_to_html(recommend_text: str) -> str:
@@ -147,90 +194,50 @@ def recommend_to_html(recommend_text: str) -> str:
     return "<div>" + "\n".join(html_lines) + "</div>"
 
 
-def extract_season_block(log_text: str) -> str:
-    """
-    전체 log_text에서
-    '판정된 시즌:' 줄부터
-    피부 Lab/팔레트/립 데이터 로딩/stderr 직전까지 잘라서 반환.
-    """
-    lines = log_text.splitlines()
-    start = None
-
-    # 시작 지점: '판정된 시즌:' 이 있는 줄
-    for i, line in enumerate(lines):
-        if "판정된 시즌" in line:
-            start = i
-            break
-
-    if start is None:
-        # 못 찾으면 그냥 전체 로그를 그대로 보여주기 (fallback)
-        return log_text
-
-    block = []
-    for line in lines[start:]:
-        stripped = line.strip()
-
-        # 여기서부터는 시즌 요약 이후 다른 섹션이 나오면 끊기
-        if stripped.startswith("피부 Lab 위치 시각화") \
-           or stripped.startswith("팔레트 합성 중") \
-           or stripped.startswith("립 데이터 로딩 중") \
-           or stripped.startswith("[stderr]"):
-            break
-
-        block.append(line)
-
-    result = "\n".join(block).strip()
-    return result if result else log_text
-
-
-def clean_season_block(season_block: str) -> str:
+def format_season_block(result: dict) -> str:
     """
-    시즌 블럭에서
-    - 판정된 시즌: ...
-    - skin_lab: ...
-    - season_input: ...
-    이 세 줄을 제거해서 반환.
-    (로그 Textbox용)
+    분석 결과(dict)의 KNN 득표율 / 시즌별 거리 정보를
+    탭1 로그 창에 보여줄 텍스트로 변환.
     """
-    if not season_block:
+    if not result:
         return ""
-
-    cleaned = []
-    for line in season_block.splitlines():
-        s = line.strip()
-        if (
-            s.startswith("판정된 시즌") or
-            s.startswith("skin_lab:") or
-            s.startswith("season_input:")
-        ):
-            continue
-        cleaned.append(line)
-    return "\n".join(cleaned)
+    if result.get("error"):
+        return f"❌ {result['error']}"
+
+    votes = result.get("votes") or {}
+    detail = result.get("season_detail") or {}
+
+    lines = ["===== 시즌 KNN 득표율 ====="]
+    for s in SEASONS:
+        lines.append(f"{s:7s}: {votes.get(s, 0.0):5.2f}%")
+    lines.append("================================")
+    lines.append("")
+    lines.append("===== 시즌별 거리 정보(ΔE 기준) =====")
+    for s in SEASONS:
+        d = detail.get(s)
+        if d:
+            lines.append(f"{s:7s} | votes={int(d['votes'])} | avg ΔE={d['avg']:.2f} | min ΔE={d['min']:.2f}")
+        else:
+            lines.append(f"{s:7s} | votes=0 | avg ΔE= -   | min ΔE= -  ")
+    lines.append("====================================")
+    return "\n".join(lines)
 
 
 def make_season_title(shared_state) -> str:
     """
-    shared_state["log"] (원본 전체 로그)에서
-    '판정된 시즌:' 한 줄을 찾아
+    shared_state["result"] (최근 분석 결과)의 시즌으로
+    '판정된 시즌: ...' 한 줄을
     시즌별로 색/크기/굵기를 준 HTML로 반환.
     """
     # shared_state가 dict 아닐 수도 있으니 방어코드
     if not isinstance(shared_state, dict):
         return ""
 
-    full_log = shared_state.get("log") or ""
-    if not full_log:
+    season = (shared_state.get("result") or {}).get("season")
+    if not season:
         return ""
 
-    season_line = ""
-    for line in full_log.splitlines():
-        s = line.strip()
-        if s.startswith("판정된 시즌"):
-            season_line = s
-            break
-
-    if not season_line:
-        return ""
+    season_line = f"판정된 시즌: {season}"
 
     # 기본 색 (혹시 매칭 안될 때 대비)
     color = "#0C0506"
@@ -257,93 +264,60 @@ def make_season_title(shared_state) -> str:
 
 
 # -----------------------------
-# 1) 이미지 분석: app.py 서브프로세스로 실행
+# 1) 이미지 분석: 상주 엔진(ENGINE.analyze) 직접 호출
 #   ➜ shared_state 에 최근 분석 결과 저장
 # -----------------------------
-def run_app(image, shared_state):
+def run_analysis(image, shared_state):
     """
+    (대기열 워커 스레드에서 실행) 분석 1건 → UI 출력 8개
     image: 업로드된 PIL 이미지
-    shared_state: {"log": str, "recommend": str} 형태의 dict (gr.State로 전달됨)
+    shared_state: {"result": dict, "recommend": str, "job_id": str} 형태의 dict (gr.State로 전달됨)
     """
     # shared_state가 처음에는 None 일 수 있으므로 안전하게 초기화
     if shared_state is None or not isinstance(shared_state, dict):
-        shared_state = {"log": "", "recommend": ""}
-
-    # 이미지가 없을 때
-    if image is None:
-        # 기존 recommend 텍스트를 HTML로 변환해서 그대로 보여주기
-        recommend_text = shared_state.get("recommend", "")
-        recommend_html = recommend_to_html(recommend_text)
-        return (
-            "⚠️ 먼저 이미지를 업로드 해주세요.",
-            recommend_html,
-            None, None, None, None, None,
-            shared_state,   # ✅ state도 함께 리턴
-        )
+        shared_state = {"result": None, "recommend": ""}
 
     try:
-        # 1) 업로드 이미지를 저장
-        img_path = UPLOAD_DIR / "input.jpg"
-        image.save(str(img_path))
-
-        # 2) app.py 실행 (이미지 경로를 stdin으로 전달)
-        cmd = [sys.executable, str(APP_PATH)]
-        proc = subprocess.Popen(
-            cmd,
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            cwd=str(BASE_DIR),
-        )
-        out, err = proc.communicate(str(img_path) + "\n", timeout=600)
-
-        # 3) stdout / stderr 분리해서 처리
-        stdout_text = out or ""           # 👉 UI용 로그는 stdout만 사용
-        full_log = stdout_text            # 👉 내부용 전체 로그 (stdout + stderr)
+        # 1) 업로드 이미지를 메모리에서 한 번만 BGR로 변환
+        #    (input.jpg 재인코딩 없음 → JPEG 손실로 피부색이 바뀌지 않음)
+        img = load_bgr(image)
 
-        if err:
-            # 내부용 전체 로그에만 stderr를 붙여둔다
-            full_log += "\n[stderr]\n" + err
+        # 2) 이번 요청 전용 작업 폴더에서 엔진으로 분석
+        #    (로그 파싱 없이 AnalysisResult 필드를 그대로 사용)
+        job = WORKSPACES.create()
+        result = ENGINE.analyze(img, out_dir=job.path, job_id=job.job_id)
+        result_dict = result.to_dict()
 
-        # 🔹 시즌 요약 블럭만 따로 추출 (탭1에서 보여줄용)
-        raw_season_block = extract_season_block(full_log)
-        season_block = clean_season_block(raw_season_block)
+        # 🔹 시즌 요약 블럭 (탭1에서 보여줄용)
+        season_block = format_season_block(result_dict)
 
-        # ✅ 로그에서 추천 제품 텍스트만 추출
-        recommend_text = extract_recommend_block(full_log)
-        # ✅ UI에서 바로 쓸 HTML로 변환
+        # ✅ 추천 제품 텍스트 → UI에서 바로 쓸 HTML로 변환
+        recommend_text = format_recommend_text(result_dict)
         recommend_html = recommend_to_html(recommend_text)
 
-        # 4) app.py가 만든 결과 이미지 경로들
-        img_dir = img_path.parent              # LP/PCCS/uploads
-        test_dir = img_dir / "test_images"     # LP/PCCS/uploads/test_images
-
-        face_box_img = img_dir / "face_box.jpg"
-        facemesh_img = img_dir / "face_mesh_result.jpg"
-        skin_pos_img = img_dir / "skin_position.jpg"
-        palette_img = test_dir / "palette_result.jpg"
-        lip_img = test_dir / "lip_result_1.jpg"
-
-        # ✅ 5) 이번 분석 결과를 shared_state 에 저장 (챗봇용)
-        shared_state["log"] = full_log          # 챗봇/디버깅용: stderr 포함
+        # ✅ 3) 이번 분석 결과를 shared_state 에 저장 (챗봇용)
+        shared_state["result"] = result_dict
         shared_state["recommend"] = recommend_text  # 순수 텍스트 저장
+        shared_state["job_id"] = job.job_id
+        remember_lip_render(job.job_id, result.lip_render)
 
+        # 4) 엔진이 작업 폴더에 저장한 결과 이미지 경로들
+        artifacts = result.artifacts
         return (
             season_block,                              # 1: 탭1 시즌 로그 요약
             recommend_html,                            # 2: 탭2 HTML (텍스트 + 컬러칩)
-            str(face_box_img) if face_box_img.exists() else None,
-            str(facemesh_img) if facemesh_img.exists() else None,
-            str(skin_pos_img) if skin_pos_img.exists() else None,
-            str(palette_img) if palette_img.exists() else None,
-            str(lip_img) if lip_img.exists() else None,
+            artifacts.get("face_box"),
+            artifacts.get("face_mesh"),
+            artifacts.get("skin_position"),
+            artifacts.get("palette"),
+            artifacts.get("lip_result_1"),
             shared_state,                              # 8: 공유 상태
         )
 
     except Exception as e:
         # 에러일 때도 8개 리턴 맞추기
         err_msg = f"❌ 실행 중 오류 발생: {e}"
-        shared_state["log"] = err_msg
+        shared_state["result"] = {"error": err_msg}
         shared_state["recommend"] = "추천 정보를 가져올 수 없습니다."
         recommend_html = recommend_to_html(shared_state["recommend"])
         return (
@@ -354,6 +328,85 @@ def run_app(image, shared_state):
         )
 
 
+def _notice(message, shared_state):
+    """분석 없이 안내 문구만 보여줄 때의 8개 리턴 (기존 추천은 그대로 유지)"""
+    recommend_html = recommend_to_html(shared_state.get("recommend", ""))
+    return (
+        message,
+        recommend_html,
+        None, None, None, None, None,
+        shared_state,   # ✅ state도 함께 리턴
+    )
+
+
+def _queue_status(job):
+    position = job.position()
+    if position == 0:
+        return "⏳ 분석 중입니다..."
+    eta = job.eta_sec()
+    if eta < 1:
+        return f"⏳ 대기 중: {position}번째 (곧 시작)"
+    return f"⏳ 대기 중: {position}번째 (예상 대기 약 {eta:.0f}초)"
+
+
+async def run_app(image, shared_state):
+    """
+    '분석 시작' 버튼 콜백 (async generator).
+    분석을 대기열에 넣고, 기다리는 동안 로그 창에 대기 순번/예상 시간을 표시.
+    """
+    # shared_state가 처음에는 None 일 수 있으므로 안전하게 초기화
+    if shared_state is None or not isinstance(shared_state, dict):
+        shared_state = {"result": None, "recommend": ""}
+
+    # 이미지가 없을 때
+    if image is None:
+        yield _notice("⚠️ 먼저 이미지를 업로드 해주세요.", shared_state)
+        return
+
+    try:
+        job = ANALYSIS_QUEUE.submit(run_analysis, image, shared_state)
+    except QueueFullError:
+        yield _notice("⚠️ 지금 분석 요청이 많아요. 잠시 후 다시 시도해 주세요.", shared_state)
+        return
+
+    # 대기/진행 상태는 로그 창만 갱신 (나머지 출력은 그대로 둠)
+    keep = (gr.skip(),) * 7
+    status = None
+    try:
+        while not job.done():
+            new_status = _queue_status(job)
+            if new_status != status:
+                status = new_status
+                yield (status,) + keep
+            await asyncio.sleep(QUEUE_POLL_SEC)
+        yield job.result()
+    finally:
+        # 브라우저를 닫는 등으로 중단되면 아직 시작 안 한 작업은 대기열에서 제거
+        if not job.done():
+            job.cancel()
+
+
+def try_lip_shade(shade_index, shared_state):
+    """
+    탭2 '다른 색상 입혀보기': 카탈로그에서 고른 색을
+    최근 분석한 얼굴에 바로 합성 (마스크/텍스처 재계산 없음)
+    """
+    if shade_index is None:
+        return None, ""
+
+    job_id = shared_state.get("job_id") if isinstance(shared_state, dict) else None
+    lip_render = get_lip_render(job_id)
+    if lip_render is None:
+        return None, "⚠️ 먼저 이미지 분석을 실행해 주세요."
+
+    row = ENGINE.lip_df.loc[int(shade_index)]
+    rgb = (int(row["r"]), int(row["g"]), int(row["b"]))
+    result_img = lip_render.render(rgb)
+
+    label = f"{row['brand']}  {row['option']}  {row['hex']}"
+    return cv2.cvtColor(result_img, cv2.COLOR_BGR2RGB), recommend_to_html(label)
+
+
 def gradio_runner(image, shared_state):
     """
     Gradio에서 직접 호출할 래퍼 함수.
@@ -363,9 +416,9 @@ def gradio_runner(image, shared_state):
     # devnull(검은 구멍)에 출력 버리기
     with open(os.devnull, "w") as devnull:
         with redirect_stdout(devnull), redirect_stderr(devnull):
-            result = run_app(image, shared_state)
+            result = run_analysis(image, shared_state)
 
-    # run_app이 이미 8개 값을 튜플로 리턴하니까 그대로 돌려주면 됨
+    # run_analysis가 이미 8개 값을 튜플로 리턴하니까 그대로 돌려주면 됨
     return result
 
 
@@ -385,11 +438,12 @@ def is_pc_related(text: str) -> bool:
     return any(k in text for k in keywords)
 
 
-def chat(message, history, shared_state):
+async def chat(message, history, shared_state):
     """
-    Gradio Chatbot 콜백.
+    Gradio Chatbot 콜백 (async generator).
+    답변을 토큰 단위로 받아서 그때그때 history를 yield → 대화창에 바로 표시.
     history 형식: [{"role": "user"/"assistant", "content": "..."} ...]
-    shared_state: {"log": str, "recommend": str}
+    shared_state: {"result": dict, "recommend": str}
     """
     if history is None:
         history = []
@@ -401,57 +455,52 @@ def chat(message, history, shared_state):
             {"role": "user", "content": message},
             {"role": "assistant", "content": reply},
         ]
-        return history
+        yield history
+        return
 
-    # ✅ shared_state 에서 최근 분석/추천 정보 꺼내기
+    # ✅ shared_state 에서 최근 분석 결과 꺼내기
     if not isinstance(shared_state, dict):
-        shared_state = {"log": "", "recommend": ""}
-
-    log_text = (shared_state.get("log") or "").strip()
-    recommend_text = (shared_state.get("recommend") or "").strip()
-
-    context_parts = []
-    if log_text:
-        context_parts.append("【최근 이미지 분석 로그 요약】\n" + log_text)
-    if recommend_text:
-        context_parts.append("【이미지 기반 립 제품 추천 TOP 5】\n" + recommend_text)
-
-    if context_parts:
-        pc_context = "\n\n".join(context_parts)
-    else:
-        pc_context = (
-            "아직 이미지 분석 결과가 공유되지 않았습니다. "
-            "일반적인 퍼스널컬러 이론과 사용자 질문만을 바탕으로 답변하세요."
-        )
-
-    # ✅ 이번 대화에 사용할 시스템 프롬프트 (1탭 정보 포함)
-    system_prompt = {
-        "role": "system",
-        "content": (
-            SYSTEM_PROMPT_BASE
-            + "\n\n아래는 사용자의 최근 퍼스널컬러 분석/추천 정보입니다. "
-              "가장 어울리는 퍼스널컬러는 득표수가 높은 시즌으로 판단하되, 득표수가 동률일 경우에는 색상거리가 짧은 시즌을 우선시하고 순위를 매겨 답변할때 참고하세요. "
-              "대화 중 이 정보를 기억하고 적극 활용해 주세요.\n\n"
-            + pc_context
-        ),
-    }
-
-    # 2) 최근 대화 6쌍(=12개 메시지)만 context로 사용
-    trimmed = history[-12:]
-
-    messages = [system_prompt] + trimmed
-    messages.append({"role": "user", "content": message})
+        shared_state = {"result": None, "recommend": ""}
+    result = shared_state.get("result") or {}
 
-    try:
-        reply = ask_openai(messages)   # openai_client.ask_openai 사용
-    except Exception as e:
-        reply = f"API 호출 중 오류가 발생했어요: {e}"
+    # 2) 분석 결과 요약 + 토큰 예산 안의 최근 대화 (넘치는 옛 대화는 요약)
+    first_turn = not clean_history(history)
+    messages, _ = build_messages(SYSTEM_PROMPT, result, history, message)
 
+    # 질문은 바로 보여주고, 답변 칸은 비워 둔 채로 스트리밍 시작
     history = history + [
         {"role": "user", "content": message},
-        {"role": "assistant", "content": reply},
+        {"role": "assistant", "content": ""},
     ]
-    return history
+    yield history
+
+    # 캐시 확인 (첫 질문일 때만)
+    cache_args = None
+    if CHAT_CACHE is not None and first_turn:
+        cache_args = (result.get("season"), result.get("recommendations"))
+        cached = CHAT_CACHE.get(message, *cache_args)
+        if cached is not None:
+            history[-1] = {"role": "assistant", "content": cached[0]}
+            yield history
+            return
+
+    reply = ""
+    start = time.perf_counter()
+    try:
+        # 사용자가 중단하면 Gradio가 이 generator를 닫음 → aclosing으로 스트림까지 바로 닫음
+        async with aclosing(stream_openai(messages)) as pieces:   # openai_client.stream_openai 사용
+            async for piece in pieces:
+                reply += piece
+                history[-1] = {"role": "assistant", "content": reply}
+                yield history
+    except Exception as e:
+        history[-1] = {"role": "assistant", "content": reply + f"\n\nAPI 호출 중 오류가 발생했어요: {e}"}
+        yield history
+        return
+
+    if cache_args is not None:
+        latency_ms = (time.perf_counter() - start) * 1000
+        CHAT_CACHE.put(message, reply, *cache_args, latency_ms=latency_ms)
 
 
 # -----------------------------
@@ -459,9 +508,9 @@ def chat(message, history, shared_state):
 # -----------------------------
 with gr.Blocks(title="PCCS 퍼스널컬러 분석 & 상담") as demo:
     # ✅ 탭 전체에서 공유할 state 정의
-    #   log: 1탭 전체 로그
+    #   result: 최근 분석 결과 (AnalysisResult.to_dict())
     #   recommend: 챗봇용 추천 텍스트
-    shared_state = gr.State({"log": "", "recommend": ""})
+    shared_state = gr.State({"result": None, "recommend": ""})
 
     gr.HTML("""
     <style>
@@ -597,6 +646,22 @@ with gr.Blocks(title="PCCS 퍼스널컬러 분석 & 상담") as demo:
             elem_id="recommend-box"
         )
 
+        gr.Markdown("### 다른 색상 입혀보기")
+        shade_dropdown = gr.Dropdown(
+            choices=LIP_SHADE_CHOICES,
+            value=None,
+            label="립 카탈로그에서 색상 선택",
+            filterable=True
+        )
+        shade_label = gr.HTML(value="")
+        shade_out = gr.Image(label="립 합성 (선택한 색상)", type="numpy")
+
+        shade_dropdown.change(
+            fn=try_lip_shade,
+            inputs=[shade_dropdown, shared_state],
+            outputs=[shade_out, shade_label],
+        )
+
     # ===== 탭 3: 퍼스널컬러 상담 챗봇 =====
     with gr.Tab(" 퍼스널컬러 상담 챗봇"):
         gr.Markdown("퍼스널컬러/톤/립 관련 궁금한 걸 물어보세요!")
@@ -623,6 +688,8 @@ with gr.Blocks(title="PCCS 퍼스널컬러 분석 & 상담") as demo:
             lip_result_out,  # 7
             shared_state,    # 8: 공유 상태
         ],
+        # 대기열 순번을 보여줄 수 있도록 Gradio 쪽에서는 대기열 크기만큼 들여보냄
+        concurrency_limit=ANALYSIS_QUEUE.workers + ANALYSIS_QUEUE.max_depth,
     )
 
     # 2) 시즌 블럭 내용을 이용해 '판정된 시즌: ...' 한 줄만 예쁘게 출력
@@ -633,7 +700,17 @@ with gr.Blocks(title="PCCS 퍼스널컬러 분석 & 상담") as demo:
     )
 
 
+# Gradio 자체 대기열도 상한을 둬서 이벤트가 끝없이 쌓이지 않도록 함
+demo.queue(
+    max_size=int(os.getenv("GRADIO_QUEUE_MAX_SIZE", "64")),
+    default_concurrency_limit=int(os.getenv("GRADIO_CONCURRENCY", "4")),
+)
+
+
 if __name__ == "__main__":
+    # 첫 요청이 느리지 않도록 mediapipe/matplotlib/openai SDK를 미리 로딩
+    ENGINE.warmup()
+    openai_client.warmup()
     demo.launch(
         debug=True,
         share=True
@@ -0,0 +1,104 @@
+# modules/analysis_result.py
+import copy
+import json
+from dataclasses import dataclass, field, asdict, fields
+from typing import Dict, List, Optional
+
+# 메모리 전용 필드 (JSON 변환 제외)
+_IN_MEMORY_FIELDS = ("images", "lip_render")
+
+
+def float_list(values, ndigits=4):
+    """numpy 배열/스칼라 → JSON용 float 리스트 (None은 그대로)"""
+    if values is None:
+        return None
+    return [round(float(v), ndigits) for v in values]
+
+
+@dataclass
+class LipRecommendation:
+    """추천 립 1개"""
+    brand: str
+    option: str
+    hex: str
+    rgb: List[int]
+    lab: List[float]
+    delta_e: float
+
+    @classmethod
+    def from_row(cls, row, lab_columns=("lab_L", "lab_a", "lab_b")):
+        return cls(
+            brand=str(row["brand"]),
+            option=str(row["option"]),
+            hex=str(row["hex"]),
+            rgb=[int(row["r"]), int(row["g"]), int(row["b"])],
+            lab=float_list([row[c] for c in lab_columns]),
+            delta_e=round(float(row["delta_e"]), 4),
+        )
+
+
+@dataclass
+class AnalysisResult:
+    """
+    이미지 1장 분석 결과.
+    UI / 챗봇 / 일괄 분석이 출력 텍스트를 파싱하지 않고 이 필드를 직접 사용한다.
+
+    season_detail: 시즌 → {"votes", "sum", "min", "avg"} (KNN 이웃 ΔE 기준)
+    pixel_seasons: 피부 픽셀 중 시즌별 비율(%) (render=True이고 Lab 조회 격자가 있을 때만, 아니면 빈 dict)
+    pixel_votes  : 피부 픽셀 평균 KNN 득표율(%)
+    artifacts    : 결과 이미지 이름 → 저장 경로 (디스크에 저장된 것만)
+    images       : 결과 이미지 이름 → BGR ndarray (메모리, JSON 변환 제외)
+    lip_render   : 이 얼굴의 LipRenderContext (다른 색상 합성용, JSON 변환 제외)
+    trace        : 단계별 시간/CPU/메모리 추적 (modules.tracing.AnalysisTrace.to_dict())
+    """
+    season: Optional[str] = None
+    votes: Dict[str, float] = field(default_factory=dict)
+    season_detail: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    pixel_seasons: Dict[str, float] = field(default_factory=dict)
+    pixel_votes: Dict[str, float] = field(default_factory=dict)
+    skin_lab: Optional[List[float]] = None
+    eye_lab: Optional[List[float]] = None
+    season_input: Optional[List[float]] = None
+    recommendations: List[LipRecommendation] = field(default_factory=list)
+    artifacts: Dict[str, str] = field(default_factory=dict)
+    images: Dict[str, object] = field(default_factory=dict, repr=False)
+    lip_render: object = field(default=None, repr=False)
+    error: Optional[str] = None
+    job_id: Optional[str] = None
+    trace: Dict[str, object] = field(default_factory=dict)
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    # ------------------------------
+    # 직렬화
+    # ------------------------------
+    def to_dict(self):
+        """JSON 직렬화 가능한 dict (images / lip_render 제외)"""
+        d = {}
+        for f in fields(self):
+            if f.name in _IN_MEMORY_FIELDS:
+                continue
+            value = getattr(self, f.name)
+            if f.name == "recommendations":
+                d[f.name] = [asdict(r) for r in value]
+            else:
+                d[f.name] = copy.deepcopy(value)
+        return d
+
+    def to_json(self, **kwargs):
+        kwargs.setdefault("ensure_ascii", False)
+        return json.dumps(self.to_dict(), **kwargs)
+
+    @classmethod
+    def from_dict(cls, d):
+        d = dict(d or {})
+        for name in _IN_MEMORY_FIELDS:
+            d.pop(name, None)
+        d["recommendations"] = [
+            r if isinstance(r, LipRecommendation) else LipRecommendation(**r)
+            for r in d.get("recommendations") or []
+        ]
+        known = set(cls.__dataclass_fields__)
+        return cls(**{k: v for k, v in d.items() if k in known})
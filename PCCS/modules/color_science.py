@@ -0,0 +1,254 @@
+# modules/color_science.py
+# -------------------------------------------------------
+# 파이프라인 공용 색 과학 모듈
+#   sRGB ↔ Lab (D65 / 2°), HEX 파싱, ΔE76 / CIEDE2000
+#
+#   - skimage.color.rgb2lab / lab2rgb 와 같은 식과 상수를 사용
+#     (float64로 계산하면 skimage와 1e-12 이내로 일치)
+#   - 배열 단위(…, 3) 일괄 계산, 기본은 float32
+#   - uint8 입력은 256칸 감마 LUT로 변환 (pow 계산 없음)
+#   - 중간 배열을 재사용해서 (N, 3) 임시 배열을 최소한만 만든다.
+#     out= 을 주면 결과도 그 배열에 바로 쓴다.
+#
+# 처리량 측정: python benchmarks/color_bench.py
+# -------------------------------------------------------
+import numpy as np
+
+# sRGB(D65) → XYZ 행렬 (skimage와 동일)
+XYZ_FROM_RGB = np.array([
+    [0.412453, 0.357580, 0.180423],
+    [0.212671, 0.715160, 0.072169],
+    [0.019334, 0.119193, 0.950227],
+])
+RGB_FROM_XYZ = np.linalg.inv(XYZ_FROM_RGB)
+
+# D65 / 2° 기준 백색
+D65_WHITE = np.array([0.95047, 1.0, 1.08883])
+
+_LAB_EPSILON = 0.008856
+_LAB_KAPPA = 7.787
+_LAB_OFFSET = 16.0 / 116.0
+
+# 화이트포인트 나눗셈까지 합친 행렬 (행 벡터 @ 행렬 형태로 전치, dtype별)
+_XYZN_FROM_RGB_T = {
+    np.dtype(np.float32): (XYZ_FROM_RGB / D65_WHITE[:, None]).T.astype(np.float32),
+    np.dtype(np.float64): (XYZ_FROM_RGB / D65_WHITE[:, None]).T,
+}
+_RGB_FROM_XYZN_T = {
+    np.dtype(np.float32): (RGB_FROM_XYZ * D65_WHITE[None, :]).T.astype(np.float32),
+    np.dtype(np.float64): (RGB_FROM_XYZ * D65_WHITE[None, :]).T,
+}
+
+
+def _srgb_decode(c):
+    """sRGB 감마 → 선형 (0~1 float 배열, 새 배열 반환)"""
+    return np.where(c > 0.04045, ((c + 0.055) / 1.055) ** 2.4, c / 12.92)
+
+
+def _srgb_encode(c):
+    """선형 → sRGB 감마 (0~1 float 배열, 새 배열 반환)"""
+    return np.where(c > 0.0031308, 1.055 * np.power(np.maximum(c, 0), 1 / 2.4) - 0.055, 12.92 * c)
+
+
+# uint8 → 선형 LUT (dtype별)
+_LINEAR_LUT = {
+    np.dtype(np.float64): _srgb_decode(np.arange(256, dtype=np.float64) / 255.0),
+}
+_LINEAR_LUT[np.dtype(np.float32)] = _LINEAR_LUT[np.dtype(np.float64)].astype(np.float32)
+
+
+def _check_dtype(dtype):
+    dtype = np.dtype(dtype)
+    if dtype not in _XYZN_FROM_RGB_T:
+        raise ValueError(f"지원하지 않는 dtype: {dtype} (float32 / float64)")
+    return dtype
+
+
+# ============================================================
+# 1) sRGB → Lab
+# ============================================================
+def srgb_to_lab(rgb, dtype=np.float32, out=None):
+    """
+    rgb: (..., 3) RGB
+         uint8이면 0~255, float이면 0~1 (skimage와 같은 규칙)
+    반환: (..., 3) Lab (dtype), out을 주면 out에 기록
+    """
+    dtype = _check_dtype(dtype)
+    rgb = np.asarray(rgb)
+    shape = rgb.shape
+    if shape[-1] != 3:
+        raise ValueError(f"마지막 축은 RGB 3채널이어야 함: {shape}")
+    flat = rgb.reshape(-1, 3)
+
+    # 감마 해제 (uint8은 LUT 인덱싱 한 번)
+    if flat.dtype == np.uint8:
+        linear = _LINEAR_LUT[dtype][flat]
+    else:
+        linear = _srgb_decode(flat.astype(dtype, copy=False)).astype(dtype, copy=False)
+
+    # 화이트포인트로 나눈 XYZ
+    xyz = linear @ _XYZN_FROM_RGB_T[dtype]
+
+    # f(t): 큰 값은 세제곱근, 작은 값은 선형 구간 (linear 버퍼 재사용)
+    small = xyz <= _LAB_EPSILON
+    np.multiply(xyz, dtype.type(_LAB_KAPPA), out=linear)
+    linear += dtype.type(_LAB_OFFSET)
+    np.cbrt(xyz, out=xyz)
+    np.copyto(xyz, linear, where=small)
+
+    if out is None:
+        out = np.empty(shape, dtype=dtype)
+    lab = out.reshape(-1, 3)
+    fx, fy, fz = xyz[:, 0], xyz[:, 1], xyz[:, 2]
+    np.multiply(fy, 116.0, out=lab[:, 0])
+    lab[:, 0] -= 16.0
+    np.subtract(fx, fy, out=lab[:, 1])
+    lab[:, 1] *= 500.0
+    np.subtract(fy, fz, out=lab[:, 2])
+    lab[:, 2] *= 200.0
+    return out
+
+
+def rgb255_to_lab(rgb, dtype=np.float64):
+    """0~255 RGB(정수/실수 상관없이) → Lab. 팔레트처럼 skimage 값과 맞춰야 할 때 float64"""
+    rgb = np.asarray(rgb, dtype=np.float64) / 255.0
+    return srgb_to_lab(rgb, dtype=dtype)
+
+
+# ============================================================
+# 2) Lab → sRGB
+# ============================================================
+def lab_to_srgb(lab, dtype=np.float32, as_uint8=False):
+    """
+    lab: (..., 3) Lab
+    반환: (..., 3) RGB 0~1 float (범위 밖은 잘림), as_uint8이면 0~255 uint8
+    """
+    dtype = _check_dtype(dtype)
+    lab = np.asarray(lab, dtype=dtype)
+    shape = lab.shape
+    flat = lab.reshape(-1, 3)
+
+    f = np.empty_like(flat)
+    np.add(flat[:, 0], 16.0, out=f[:, 1])
+    f[:, 1] /= 116.0
+    np.divide(flat[:, 1], 500.0, out=f[:, 0])
+    f[:, 0] += f[:, 1]
+    np.divide(flat[:, 2], -200.0, out=f[:, 2])
+    f[:, 2] += f[:, 1]
+
+    # f → t (skimage lab2xyz와 같은 경계 0.2068966)
+    t = np.where(f > 0.2068966, f ** 3, (f - dtype.type(_LAB_OFFSET)) / dtype.type(_LAB_KAPPA))
+    np.maximum(t, 0, out=t)
+
+    rgb = _srgb_encode(t @ _RGB_FROM_XYZN_T[dtype]).astype(dtype, copy=False)
+    np.clip(rgb, 0, 1, out=rgb)
+    rgb = rgb.reshape(shape)
+
+    if as_uint8:
+        return np.rint(rgb * 255).astype(np.uint8)
+    return rgb
+
+
+# ============================================================
+# 3) HEX
+# ============================================================
+def hex_to_rgb(hex_code):
+    """'#RRGGBB' / 'RRGGBB' / '#RGB' → (R, G, B) 0~255"""
+    h = str(hex_code).strip().lstrip("#")
+    if len(h) == 3:
+        h = "".join(c * 2 for c in h)
+    if len(h) != 6:
+        raise ValueError(f"HEX 색상 형식이 아님: {hex_code}")
+    return int(h[0:2], 16), int(h[2:4], 16), int(h[4:6], 16)
+
+
+def hexes_to_rgb(hex_codes):
+    """HEX 리스트 → (N, 3) uint8"""
+    return np.array([hex_to_rgb(h) for h in hex_codes], dtype=np.uint8).reshape(-1, 3)
+
+
+def hex_to_lab(hex_code, dtype=np.float64):
+    """HEX → Lab (3,)"""
+    return srgb_to_lab(np.array(hex_to_rgb(hex_code), dtype=np.uint8), dtype=dtype)
+
+
+def rgb_to_hex(rgb):
+    r, g, b = (int(v) for v in rgb)
+    return f"#{r:02X}{g:02X}{b:02X}"
+
+
+# ============================================================
+# 4) ΔE (CIE76 / CIEDE2000) — 브로드캐스트 가능
+# ============================================================
+def delta_e76(lab1, lab2):
+    """(..., 3) 끼리 ΔE76 → (...)"""
+    lab1 = np.asarray(lab1, dtype=np.float64)
+    lab2 = np.asarray(lab2, dtype=np.float64)
+    # 채널별로 빼면 (3,) 대 (N, 3) 브로드캐스트 시 (N, 3) 임시 배열이 생기지 않음
+    dL = lab1[..., 0] - lab2[..., 0]
+    da = lab1[..., 1] - lab2[..., 1]
+    db = lab1[..., 2] - lab2[..., 2]
+    return np.sqrt(dL * dL + da * da + db * db)
+
+
+def delta_e2000(lab1, lab2, kL=1.0, kC=1.0, kH=1.0):
+    """
+    (..., 3) 끼리 CIEDE2000 → (...)
+    (Sharma et al. 2005 공식, skimage.deltaE_ciede2000과 1e-12 이내 일치)
+    """
+    lab1 = np.asarray(lab1, dtype=np.float64)
+    lab2 = np.asarray(lab2, dtype=np.float64)
+    L1, a1, b1 = lab1[..., 0], lab1[..., 1], lab1[..., 2]
+    L2, a2, b2 = lab2[..., 0], lab2[..., 1], lab2[..., 2]
+
+    # a' 보정 (G)
+    C_bar = (np.hypot(a1, b1) + np.hypot(a2, b2)) / 2
+    C_bar7 = C_bar ** 7
+    G = 0.5 * (1 - np.sqrt(C_bar7 / (C_bar7 + 25.0 ** 7)))
+    a1p = (1 + G) * a1
+    a2p = (1 + G) * a2
+
+    C1p = np.hypot(a1p, b1)
+    C2p = np.hypot(a2p, b2)
+    h1p = np.degrees(np.arctan2(b1, a1p)) % 360
+    h2p = np.degrees(np.arctan2(b2, a2p)) % 360
+    chroma_zero = (C1p * C2p) == 0
+
+    # ΔL', ΔC', ΔH'
+    dLp = L2 - L1
+    dCp = C2p - C1p
+    dhp = h2p - h1p
+    dhp = np.where(dhp > 180, dhp - 360, dhp)
+    dhp = np.where(dhp < -180, dhp + 360, dhp)
+    dhp = np.where(chroma_zero, 0.0, dhp)
+    dHp = 2 * np.sqrt(C1p * C2p) * np.sin(np.radians(dhp / 2))
+
+    # 평균값
+    L_barp = (L1 + L2) / 2
+    C_barp = (C1p + C2p) / 2
+    h_sum = h1p + h2p
+    h_barp = np.where(
+        np.abs(h1p - h2p) <= 180,
+        h_sum / 2,
+        np.where(h_sum < 360, (h_sum + 360) / 2, (h_sum - 360) / 2),
+    )
+    h_barp = np.where(chroma_zero, h_sum, h_barp)
+
+    T = (1
+         - 0.17 * np.cos(np.radians(h_barp - 30))
+         + 0.24 * np.cos(np.radians(2 * h_barp))
+         + 0.32 * np.cos(np.radians(3 * h_barp + 6))
+         - 0.20 * np.cos(np.radians(4 * h_barp - 63)))
+
+    d_theta = 30 * np.exp(-(((h_barp - 275) / 25) ** 2))
+    C_barp7 = C_barp ** 7
+    R_C = 2 * np.sqrt(C_barp7 / (C_barp7 + 25.0 ** 7))
+    S_L = 1 + (0.015 * (L_barp - 50) ** 2) / np.sqrt(20 + (L_barp - 50) ** 2)
+    S_C = 1 + 0.045 * C_barp
+    S_H = 1 + 0.015 * C_barp * T
+    R_T = -np.sin(np.radians(2 * d_theta)) * R_C
+
+    dL = dLp / (kL * S_L)
+    dC = dCp / (kC * S_C)
+    dH = dHp / (kH * S_H)
+    return np.sqrt(dL ** 2 + dC ** 2 + dH ** 2 + R_T * dC * dH)
@@ -1,6 +1,7 @@
 import cv2
 import numpy as np
-from skimage import color
+
+from modules.color_science import srgb_to_lab
 
 # FaceMesh 눈 영역 인덱스
 LEFT_EYE_INDICES = [33, 133, 160, 159, 158, 157, 173, 144, 145, 153, 154, 155]
@@ -96,8 +97,8 @@ def compute_eye_color(eye_pixels):
 
         # LAB 변환
         rgb = adjusted[:, ::-1]  # BGR → RGB
-        lab = color.rgb2lab(rgb.reshape(-1, 1, 3)).reshape(-1, 3)
-        lab_mean = lab.mean(axis=0)
+        lab = srgb_to_lab(rgb)
+        lab_mean = lab.mean(axis=0, dtype=np.float64)
 
         result[name] = lab_mean
         all_pixels.append(adjusted)
@@ -106,7 +107,7 @@ def compute_eye_color(eye_pixels):
     if all_pixels:
         combined = np.vstack(all_pixels)
         rgb = combined[:, ::-1]
-        lab_combined = color.rgb2lab(rgb.reshape(-1, 1, 3)).reshape(-1, 3).mean(axis=0)
+        lab_combined = srgb_to_lab(rgb).mean(axis=0, dtype=np.float64)
         result['both'] = lab_combined
     else:
         result['both'] = None
@@ -0,0 +1,91 @@
+# modules/face_context.py
+import threading
+
+import cv2
+import numpy as np
+
+from .face_mesh_utils import init_face_mesh
+
+
+class FaceContext:
+    """
+    이미지 한 장에 대한 FaceMesh 추론 결과(1회)를 담는 컨텍스트.
+    얼굴 박스 / 메쉬 시각화 / 눈 ROI / 입술 마스크 / 립 합성이
+    모두 이 객체를 입력으로 받아 FaceMesh를 다시 돌리지 않는다.
+
+    좌표는 정규화(0~1) 값으로 보관하므로 같은 사진의
+    다른 해상도 버전에도 그대로 사용할 수 있다.
+    """
+
+    def __init__(self, image_shape, face):
+        self.image_shape = tuple(image_shape)
+        self.face = face  # NormalizedLandmarkList (얼굴 없으면 None)
+
+        if face is not None:
+            self.points = np.array(
+                [(lm.x, lm.y) for lm in face.landmark], dtype=np.float64
+            )
+        else:
+            self.points = None
+
+    @property
+    def found(self):
+        return self.face is not None
+
+    @property
+    def landmarks(self):
+        """mediapipe landmark 시퀀스 (face.landmark)"""
+        return self.face.landmark if self.face is not None else None
+
+    def pixel_points(self, indices=None, shape=None):
+        """
+        랜드마크 → 픽셀 좌표 (N, 2) float64.
+        shape를 주면 해당 크기의 이미지 기준으로 변환.
+        """
+        h, w = (shape or self.image_shape)[:2]
+        pts = self.points if indices is None else self.points[indices]
+        return pts * np.array([w, h], dtype=np.float64)
+
+    def bbox(self, shape=None):
+        """FaceMesh 전체 랜드마크를 감싸는 (x, y, w, h)"""
+        pts = self.pixel_points(shape=shape)
+        x_min, y_min = int(pts[:, 0].min()), int(pts[:, 1].min())
+        x_max, y_max = int(pts[:, 0].max()), int(pts[:, 1].max())
+        return (x_min, y_min, x_max - x_min, y_max - y_min)
+
+
+class FaceMeshRunner:
+    """
+    FaceMesh 그래프를 한 번만 만들어 두고 재사용.
+    (mediapipe 그래프는 스레드 안전하지 않아서 lock으로 보호)
+    """
+
+    def __init__(self, **mesh_kwargs):
+        self._mesh = init_face_mesh(**mesh_kwargs)
+        self._lock = threading.Lock()
+
+    def process(self, image_bgr):
+        img_rgb = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
+        with self._lock:
+            result = self._mesh.process(img_rgb)
+
+        face = result.multi_face_landmarks[0] if result.multi_face_landmarks else None
+        return FaceContext(image_bgr.shape, face)
+
+    def close(self):
+        self._mesh.close()
+
+
+def build_face_context(image_bgr, runner=None):
+    """
+    BGR 이미지 → FaceContext.
+    runner가 없으면 1회용 FaceMesh를 만들어서 추론한다.
+    """
+    if runner is not None:
+        return runner.process(image_bgr)
+
+    one_shot = FaceMeshRunner()
+    try:
+        return one_shot.process(image_bgr)
+    finally:
+        one_shot.close()
@@ -1,9 +1,8 @@
 # modules/face_detector.py
 import cv2
-import mediapipe as mp
-from pathlib import Path
 
-mp_face_mesh = mp.solutions.face_mesh
+from modules.face_mesh_utils import init_face_mesh
+from modules.image_io import load_bgr, image_label
 
 class FaceNotFoundError(Exception):
     """FaceMesh로 얼굴을 찾지 못했을 때 발생"""
@@ -13,24 +12,16 @@ class FaceNotFoundError(Exception):
 # ---------------------------------------
 # FaceMesh 전체 랜드마크 추출
 # ---------------------------------------
-def get_facemesh_landmarks(image_path):
-    img = cv2.imread(str(image_path))
-    if img is None:
-        raise FileNotFoundError(f"이미지를 찾을 수 없음: {image_path}")
-
+def get_facemesh_landmarks(image):
+    img = load_bgr(image)
     img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
 
-    with mp_face_mesh.FaceMesh(
-        static_image_mode=True,
-        max_num_faces=1,
-        refine_landmarks=True,
-        min_detection_confidence=0.5
-    ) as mesh:
+    with init_face_mesh() as mesh:
 
         result = mesh.process(img_rgb)
 
         if not result.multi_face_landmarks:
-            raise FaceNotFoundError(f"FaceMesh 랜드마크를 찾을 수 없음: {image_path}")
+            raise FaceNotFoundError(f"FaceMesh 랜드마크를 찾을 수 없음: {image_label(image)}")
 
         return result.multi_face_landmarks[0]
 
@@ -52,17 +43,20 @@ def get_facemesh_bbox(landmarks, img_shape):
 
 # ---------------------------------------
 # 최종 얼굴 인식 + 얼굴 crop 반환 (Haar 대체)
+#   image: 경로 또는 BGR ndarray
+#   face_ctx(FaceContext)가 있으면 FaceMesh를 다시 돌리지 않음
 # ---------------------------------------
-def detect_face(image_path):
-    img_path = Path(image_path)
-    img = cv2.imread(str(img_path))
-
-    if img is None:
-        raise FileNotFoundError(f"이미지를 찾을 수 없음: {image_path}")
-
-    # FaceMesh landmarks
-    landmarks = get_facemesh_landmarks(img_path)
-    x, y, w, h = get_facemesh_bbox(landmarks, img.shape)
+def detect_face(image, face_ctx=None):
+    img = load_bgr(image)
+
+    if face_ctx is not None:
+        if not face_ctx.found:
+            raise FaceNotFoundError(f"FaceMesh 랜드마크를 찾을 수 없음: {image_label(image)}")
+        x, y, w, h = face_ctx.bbox(img.shape)
+    else:
+        # FaceMesh landmarks
+        landmarks = get_facemesh_landmarks(img)
+        x, y, w, h = get_facemesh_bbox(landmarks, img.shape)
 
     # crop
     face_crop = img[y:y + h, x:x + w]
@@ -1,9 +1,42 @@
 # face_mesh_utils.py
-import mediapipe as mp
+import logging
+import os
+import warnings
+from contextlib import redirect_stdout, redirect_stderr
+
+_mp = None
+
+
+def load_mediapipe():
+    """
+    mediapipe 지연 import (처음 쓸 때 한 번만).
+    import 중 TensorFlow/absl이 쏟아내는 로그는 숨기고, 이후 로그 레벨도 ERROR로 낮춤.
+    """
+    global _mp
+    if _mp is not None:
+        return _mp
+
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+    with open(os.devnull, "w") as fnull, redirect_stdout(fnull), redirect_stderr(fnull):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            import mediapipe as mp
+
+    try:
+        import absl.logging
+        absl.logging.set_verbosity(absl.logging.ERROR)
+    except ImportError:
+        pass
+    logging.getLogger('tensorflow').setLevel(logging.ERROR)
+    logging.getLogger('absl').setLevel(logging.ERROR)
+
+    _mp = mp
+    return mp
+
 
 def init_face_detection(model_selection=1, min_detection_confidence=0.5):
     """Mediapipe 얼굴 검출 초기화"""
-    mp_face = mp.solutions.face_detection
+    mp_face = load_mediapipe().solutions.face_detection
     return mp_face.FaceDetection(
         model_selection=model_selection,
         min_detection_confidence=min_detection_confidence
@@ -16,7 +49,7 @@ def init_face_mesh(
     min_detection_confidence=0.5
 ):
     """Mediapipe FaceMesh 초기화"""
-    mp_face_mesh = mp.solutions.face_mesh
+    mp_face_mesh = load_mediapipe().solutions.face_mesh
     return mp_face_mesh.FaceMesh(
         static_image_mode=static_image_mode,
         max_num_faces=max_num_faces,
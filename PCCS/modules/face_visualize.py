@@ -2,28 +2,15 @@
 import cv2
 from pathlib import Path
 from .face_mesh_utils import init_face_mesh
+from .image_io import load_bgr, save_image, default_save_path, image_label
 
 class FaceNotFoundError(Exception):
     """FaceMesh 랜드마크를 찾지 못했을 때 발생"""
     pass
 
-def visualize_facemesh(image_path, save_path=None):
-    """FaceMesh 랜드마크를 이미지에 표시하고 저장"""
-    img_path = Path(image_path)
-    save_path = Path(save_path) if save_path else img_path.parent / "face_mesh_result.jpg"
-
-    img = cv2.imread(str(img_path))
-    if img is None:
-        raise FileNotFoundError(f"이미지를 찾을 수 없음: {image_path}")
-
-    img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-    mesh = init_face_mesh()
-    result = mesh.process(img_rgb)
-
-    if not result.multi_face_landmarks:
-        raise FaceNotFoundError(f"FaceMesh 랜드마크를 찾을 수 없음: {image_path}")
-
-    landmarks = result.multi_face_landmarks[0]
+def draw_facemesh(img, landmarks):
+    """BGR 이미지 복사본 위에 FaceMesh 랜드마크 점을 찍어서 반환"""
+    img = img.copy()
     h, w, _ = img.shape
 
     for lm in landmarks.landmark:
@@ -31,6 +18,30 @@ def visualize_facemesh(image_path, save_path=None):
         y = int(lm.y * h)
         cv2.circle(img, (x, y), 1, (0, 255, 0), -1)
 
-    cv2.imwrite(str(save_path), img)
-    print(f"FaceMesh 시각화 이미지 저장됨 → {save_path}")
-    return str(save_path)
+    return img
+
+def visualize_facemesh(image, save_path=None, face_ctx=None):
+    """
+    FaceMesh 랜드마크를 이미지에 표시하고 저장
+    image: 경로 또는 BGR ndarray (ndarray면 save_path가 있을 때만 저장)
+    face_ctx(FaceContext)가 있으면 그 랜드마크를 그대로 사용
+    :return: 저장 경로(str), 저장하지 않았으면 None
+    """
+    save_path = Path(save_path) if save_path else default_save_path(image, "face_mesh_result.jpg")
+    img = load_bgr(image)
+
+    if face_ctx is not None:
+        landmarks = face_ctx.face
+    else:
+        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        mesh = init_face_mesh()
+        result = mesh.process(img_rgb)
+        landmarks = result.multi_face_landmarks[0] if result.multi_face_landmarks else None
+
+    if landmarks is None:
+        raise FaceNotFoundError(f"FaceMesh 랜드마크를 찾을 수 없음: {image_label(image)}")
+
+    saved = save_image(draw_facemesh(img, landmarks), save_path)
+    if saved:
+        print(f"FaceMesh 시각화 이미지 저장됨 → {save_path}")
+    return saved
@@ -0,0 +1,121 @@
+# modules/image_io.py
+import cv2
+import numpy as np
+from pathlib import Path
+
+
+def load_bgr(image):
+    """
+    경로 / PIL 이미지 / BGR ndarray → BGR ndarray (uint8, HxWx3)
+
+    - ndarray는 그대로 반환 (복사 없음)
+    - 경로는 cv2.imread로 한 번만 디코딩
+    - PIL은 JPEG 재인코딩 없이 메모리에서 바로 변환
+    """
+    if isinstance(image, np.ndarray):
+        if image.ndim != 3 or image.shape[2] != 3:
+            raise ValueError(f"BGR 3채널 이미지가 필요함: shape={image.shape}")
+        return image
+
+    if isinstance(image, (str, Path)):
+        img = cv2.imread(str(image))
+        if img is None:
+            raise FileNotFoundError(f"이미지를 찾을 수 없음: {image}")
+        return img
+
+    # PIL.Image (Gradio 업로드)
+    if hasattr(image, "convert"):
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        return cv2.cvtColor(np.asarray(image), cv2.COLOR_RGB2BGR)
+
+    raise TypeError(f"지원하지 않는 이미지 타입: {type(image)}")
+
+
+# -------------------------------------------------------
+# 분석용 축소 이미지
+#   색 통계 / 랜드마크는 긴 변 ANALYSIS_MAX_SIDE 이하 이미지에서 계산하고,
+#   사용자에게 보여줄 합성 이미지만 원본 해상도로 만든다.
+#   (FaceMesh 랜드마크는 0~1 정규화 좌표라 원본에 그대로 대응됨)
+# -------------------------------------------------------
+ANALYSIS_MAX_SIDE = 1280
+
+# 디코더 단계 축소 (JPEG는 DCT 단계에서 1/2, 1/4, 1/8로 바로 디코딩)
+_REDUCED_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+def fit_max_side(img, max_side=ANALYSIS_MAX_SIDE):
+    """긴 변이 max_side보다 크면 INTER_AREA로 축소 (작으면 그대로, 복사 없음)"""
+    if max_side is None:
+        return img
+    h, w = img.shape[:2]
+    longest = max(h, w)
+    if longest <= max_side:
+        return img
+    scale = max_side / longest
+    size = (max(1, round(w * scale)), max(1, round(h * scale)))
+    return cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+
+
+def reduced_decode_factor(size, max_side):
+    """긴 변이 max_side 아래로 내려가지 않는 가장 큰 디코더 축소 배율 (1/2/4/8)"""
+    longest = max(size)
+    for factor in (8, 4, 2):
+        if longest / factor >= max_side:
+            return factor
+    return 1
+
+
+def load_bgr_reduced(image, max_side=ANALYSIS_MAX_SIDE):
+    """
+    분석용 BGR 이미지 (긴 변 ≤ max_side).
+    경로 입력은 헤더에서 크기만 읽고 IMREAD_REDUCED_*로 줄여서 디코딩한 뒤
+    남은 배율만 리사이즈. 그 외 입력은 load_bgr 후 리사이즈.
+    """
+    if max_side is None or not isinstance(image, (str, Path)):
+        return fit_max_side(load_bgr(image), max_side)
+
+    factor = 1
+    try:
+        from PIL import Image
+        with Image.open(image) as im:
+            factor = reduced_decode_factor(im.size, max_side)
+    except Exception:
+        pass  # 크기를 못 읽으면 원본 디코딩 후 리사이즈
+
+    img = cv2.imread(str(image), _REDUCED_FLAGS[factor])
+    if img is None:
+        raise FileNotFoundError(f"이미지를 찾을 수 없음: {image}")
+    return fit_max_side(img, max_side)
+
+
+def save_image(img, save_path):
+    """save_path가 있을 때만 디스크에 저장. 저장 경로(str) 또는 None 반환"""
+    if save_path is None:
+        return None
+    save_path = Path(save_path)
+    save_path.parent.mkdir(parents=True, exist_ok=True)
+    cv2.imwrite(str(save_path), img)
+    return str(save_path)
+
+
+def default_save_path(image, filename):
+    """
+    입력이 경로일 때만 '같은 폴더/filename' 기본 저장 경로를 만든다.
+    (ndarray 입력이면 None → 디스크에 쓰지 않음)
+    """
+    if isinstance(image, (str, Path)):
+        return Path(image).parent / filename
+    return None
+
+
+def image_label(image):
+    """에러 메시지용 이미지 이름 (경로면 경로, 아니면 메모리 이미지 표시)"""
+    if isinstance(image, (str, Path)):
+        return str(image)
+    return "<memory image>"
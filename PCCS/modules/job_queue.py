@@ -0,0 +1,289 @@
+# modules/job_queue.py
+# -------------------------------------------------------
+# 분석 작업 대기열 (최대 길이 제한 + 고정 워커 수)
+#   - workers 개의 스레드가 순서대로 작업을 꺼내 실행
+#   - 대기 중인 작업이 max_depth 개를 넘으면 QueueFullError로 바로 거절
+#     (요청이 끝없이 쌓여 메모리/CPU를 잡아먹지 않도록)
+#   - 대기 순번 / 예상 대기 시간(최근 처리 시간 이동평균 기반) 조회
+#   - Prometheus 텍스트 형식 지표 (대기열 길이, 대기/처리 시간 히스토그램, 거절 수)
+#
+#   queue = AnalysisQueue(workers=2, max_depth=8)
+#   job = queue.submit(fn, *args)        # 꽉 차 있으면 QueueFullError
+#   job.position(), job.eta_sec(), job.result(timeout)
+# -------------------------------------------------------
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ANALYSIS_WORKERS = 2
+ANALYSIS_QUEUE_DEPTH = 8
+DEFAULT_SERVICE_SEC = 10.0   # 처리 기록이 없을 때 쓰는 작업 1건 예상 시간
+_EMA_ALPHA = 0.3
+
+# 히스토그램 구간(초)
+_WAIT_BUCKETS = (0.1, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+_SERVICE_BUCKETS = (0.5, 1, 2, 5, 10, 15, 20, 30, 60)
+
+
+class QueueFullError(RuntimeError):
+    """대기열이 가득 차서 작업을 받을 수 없음"""
+
+
+class Histogram:
+    """Prometheus 히스토그램 (누적 구간 카운트 + 합계)"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += 1
+        self.sum += value
+
+    def lines(self, name, labels=""):
+        """labels: 'stage="skin"' 같은 라벨 문자열 (없으면 빈 문자열)"""
+        sep = "," if labels else ""
+        out = []
+        for bound, count in zip(self.buckets, self.counts):
+            out.append(f'{name}_bucket{{{labels}{sep}le="{bound}"}} {count}')
+        out.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {self.total}')
+        suffix = f"{{{labels}}}" if labels else ""
+        out.append(f"{name}_sum{suffix} {self.sum:.6f}")
+        out.append(f"{name}_count{suffix} {self.total}")
+        return out
+
+
+class Job:
+    """대기열에 들어간 작업 1건 (Future를 감싸서 순번/예상 시간 조회 제공)"""
+
+    def __init__(self, queue, fn, args, kwargs):
+        self._queue = queue
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.submitted_at = time.perf_counter()
+        self.started_at = None
+
+    def position(self):
+        """대기 순번 (1부터), 실행 중이거나 끝났으면 0"""
+        return self._queue.position(self)
+
+    def eta_sec(self):
+        """실행 시작까지 예상 대기 시간(초)"""
+        return self._queue.eta_sec(self.position())
+
+    def cancel(self):
+        """아직 대기 중이면 대기열에서 빼고 True"""
+        return self._queue.cancel(self)
+
+    def done(self):
+        return self.future.done()
+
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+
+
+class AnalysisQueue:
+    def __init__(self, workers=ANALYSIS_WORKERS, max_depth=ANALYSIS_QUEUE_DEPTH,
+                 default_service_sec=DEFAULT_SERVICE_SEC, name="analysis"):
+        if workers < 1:
+            raise ValueError("workers는 1 이상이어야 함")
+        self.workers = workers
+        self.max_depth = max_depth
+        self.name = name
+
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._running = 0
+        self._closed = False
+
+        # 지표
+        self._service_ema = default_service_sec
+        self._submitted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._failed = 0
+        self._wait_hist = Histogram(_WAIT_BUCKETS)
+        self._service_hist = Histogram(_SERVICE_BUCKETS)
+
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"{name}-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    # ---------------------------------------------------
+    # 제출 / 조회
+    # ---------------------------------------------------
+    def submit(self, fn, *args, **kwargs):
+        job = Job(self, fn, args, kwargs)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("대기열이 종료됨")
+            if len(self._pending) >= self.max_depth:
+                self._rejected += 1
+                raise QueueFullError(
+                    f"대기 중인 분석이 {len(self._pending)}건이라 지금은 받을 수 없습니다."
+                )
+            self._pending.append(job)
+            self._submitted += 1
+            self._cond.notify()
+        return job
+
+    def position(self, job):
+        with self._cond:
+            try:
+                return self._pending.index(job) + 1
+            except ValueError:
+                return 0
+
+    def eta_sec(self, position):
+        """
+        순번 → 실행 시작까지 예상 대기 시간(초)
+        실행 중인 작업은 평균 절반쯤 진행됐다고 보고, 앞선 대기 작업은 워커 수만큼 나눠 처리
+        """
+        if position <= 0:
+            return 0.0
+        with self._cond:
+            busy = self._running
+            service = self._service_ema
+        if busy < self.workers:
+            return 0.0
+        return (0.5 + (position - 1) // self.workers) * service
+
+    def cancel(self, job):
+        with self._cond:
+            try:
+                self._pending.remove(job)
+            except ValueError:
+                return False
+        job.future.cancel()
+        return True
+
+    def depth(self):
+        with self._cond:
+            return len(self._pending)
+
+    def running(self):
+        with self._cond:
+            return self._running
+
+    def shutdown(self, wait=True):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            for t in self._threads:
+                t.join()
+
+    # ---------------------------------------------------
+    # 워커
+    # ---------------------------------------------------
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                job = self._pending.popleft()
+                self._running += 1
+
+            if not job.future.set_running_or_notify_cancel():
+                with self._cond:
+                    self._running -= 1
+                continue
+
+            job.started_at = time.perf_counter()
+            ok = True
+            try:
+                job.future.set_result(job.fn(*job.args, **job.kwargs))
+            except BaseException as e:
+                ok = False
+                job.future.set_exception(e)
+            finished = time.perf_counter()
+
+            with self._cond:
+                self._running -= 1
+                service = finished - job.started_at
+                self._wait_hist.observe(job.started_at - job.submitted_at)
+                self._service_hist.observe(service)
+                self._service_ema += _EMA_ALPHA * (service - self._service_ema)
+                if ok:
+                    self._completed += 1
+                else:
+                    self._failed += 1
+
+    # ---------------------------------------------------
+    # 지표
+    # ---------------------------------------------------
+    def metrics_text(self):
+        """Prometheus 텍스트 형식 지표"""
+        p = f"pccs_{self.name}"
+        with self._cond:
+            lines = [
+                f"# HELP {p}_queue_depth 실행을 기다리는 작업 수",
+                f"# TYPE {p}_queue_depth gauge",
+                f"{p}_queue_depth {len(self._pending)}",
+                f"# HELP {p}_queue_max_depth 대기열 최대 길이",
+                f"# TYPE {p}_queue_max_depth gauge",
+                f"{p}_queue_max_depth {self.max_depth}",
+                f"# HELP {p}_running 실행 중인 작업 수",
+                f"# TYPE {p}_running gauge",
+                f"{p}_running {self._running}",
+                f"# HELP {p}_workers 워커 수",
+                f"# TYPE {p}_workers gauge",
+                f"{p}_workers {self.workers}",
+                f"# HELP {p}_jobs_total 처리 결과별 작업 수",
+                f"# TYPE {p}_jobs_total counter",
+                f'{p}_jobs_total{{status="submitted"}} {self._submitted}',
+                f'{p}_jobs_total{{status="rejected"}} {self._rejected}',
+                f'{p}_jobs_total{{status="completed"}} {self._completed}',
+                f'{p}_jobs_total{{status="failed"}} {self._failed}',
+                f"# HELP {p}_wait_seconds 대기열에서 기다린 시간",
+                f"# TYPE {p}_wait_seconds histogram",
+                *self._wait_hist.lines(f"{p}_wait_seconds"),
+                f"# HELP {p}_service_seconds 작업 처리 시간",
+                f"# TYPE {p}_service_seconds histogram",
+                *self._service_hist.lines(f"{p}_service_seconds"),
+            ]
+        return "\n".join(lines) + "\n"
+
+
+# -------------------------------------------------------
+# /metrics 엔드포인트 (별도 포트, 백그라운드 스레드)
+# -------------------------------------------------------
+def start_metrics_server(render, host="0.0.0.0", port=9100):
+    """
+    render: 지표 텍스트를 돌려주는 함수 (예: queue.metrics_text)
+    반환: (server, thread)
+    """
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?")[0].rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            data = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, thread
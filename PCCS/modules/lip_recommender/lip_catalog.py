@@ -0,0 +1,297 @@
+# modules/lip_recommender/lip_catalog.py
+# -------------------------------------------------------
+# 립 카탈로그 컴파일 (CSV → 컬럼별 .npy + manifest.json)
+#   colorchips_data.csv를 매번 pandas로 파싱하지 않고, 한 번 검증/변환해서
+#   컬럼마다 고정 타입 .npy 파일로 저장해 둔다.
+#   로딩은 np.load(mmap_mode="r") → 파싱 없이 거의 즉시, 숫자 컬럼은 페이지 캐시를
+#   여러 워커 프로세스가 같이 씀 (읽기 전용).
+#
+#   - Lab은 CSV 값 대신 RGB에서 다시 계산 (lab_L / lab_a / lab_b)
+#     CSV의 Lab은 헤더 중복(b / b.1) + L 0.3배 저장 문제가 있어 검증에만 사용
+#   - 스키마 검사: 필수 컬럼 / RGB 범위 / hex ↔ RGB 일치 (어긋나면 LipCatalogError)
+#     CSV Lab과 재계산 Lab 차이, 중복 제품 수는 manifest에 기록
+#   - CSV 내용 해시가 manifest와 다르면 자동으로 다시 컴파일
+#
+# 배포 시 미리 빌드:
+#   python -m modules.lip_recommender.lip_catalog           # 빌드 + 검사 결과 출력
+#   python -m modules.lip_recommender.lip_catalog --force   # 해시가 같아도 강제 재빌드
+# -------------------------------------------------------
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from modules.color_science import hex_to_rgb
+from modules.lip_recommender.lip_preprocess import (
+    load_and_preprocess_lip_csv, RGB_COLUMNS, LAB_COLUMNS,
+)
+
+# 컬럼 구성/검증 로직이 바뀌면 올려서 기존 컴파일 결과를 무효화
+LIP_CATALOG_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+# 컬럼 → 저장 타입 (문자열 컬럼은 최대 길이에 맞춘 고정 폭 유니코드)
+NUMERIC_DTYPES = {
+    "date": np.int32,
+    "r": np.uint8,
+    "g": np.uint8,
+    "b": np.uint8,
+    "lab_L": np.float64,
+    "lab_a": np.float64,
+    "lab_b": np.float64,
+}
+STRING_COLUMNS = ["category", "brand", "option", "hex", "case_type", "timestamp"]
+REQUIRED_COLUMNS = ["brand", "option", "hex"] + RGB_COLUMNS
+
+CSV_L_SCALE = 0.3          # CSV에 저장된 L = 실제 L* × 0.3
+CSV_LAB_TOLERANCE = 0.05   # CSV Lab과 재계산 Lab 허용 차이 (경고만)
+
+
+class LipCatalogError(ValueError):
+    """립 카탈로그 스키마 검사 실패"""
+
+
+def default_catalog_dir(csv_path):
+    csv_path = Path(csv_path)
+    return csv_path.parent / ".cache" / f"{csv_path.stem}_v{LIP_CATALOG_VERSION}"
+
+
+def file_sha256(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+# -------------------------------------------------------
+# 스키마 검사
+# -------------------------------------------------------
+def validate_lip_catalog(df):
+    """
+    파싱된 카탈로그 검사 → 검사 결과 dict (manifest에 기록)
+    필수 컬럼 누락 / RGB 범위 밖 / hex와 RGB 불일치는 LipCatalogError
+    """
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        raise LipCatalogError(f"립 카탈로그 필수 컬럼 없음: {missing}")
+    if df.empty:
+        raise LipCatalogError("립 카탈로그가 비어 있음")
+
+    rgb = df[RGB_COLUMNS].to_numpy(dtype=np.float64)
+    bad = ~np.all((rgb >= 0) & (rgb <= 255) & (rgb == np.round(rgb)), axis=1)
+    if bad.any():
+        raise LipCatalogError(f"RGB 값이 0~255 정수가 아닌 행 {int(bad.sum())}개 (예: {int(np.argmax(bad))}행)")
+
+    try:
+        hex_rgb = np.array([hex_to_rgb(h) for h in df["hex"].astype(str)], dtype=np.float64)
+    except ValueError as e:
+        raise LipCatalogError(f"hex 형식 오류: {e}") from None
+    mismatch = np.any(hex_rgb != rgb, axis=1)
+    if mismatch.any():
+        raise LipCatalogError(
+            f"hex와 RGB가 다른 행 {int(mismatch.sum())}개 (예: {int(np.argmax(mismatch))}행)"
+        )
+
+    checks = {
+        "rows": int(len(df)),
+        "duplicate_products": int(df.duplicated(["brand", "option"]).sum()),
+        "duplicate_colors": int(df.duplicated(RGB_COLUMNS).sum()),
+    }
+
+    # CSV에 저장된 Lab과 비교 (L은 0.3배 저장분을 되돌려서 비교)
+    lab = df[LAB_COLUMNS].to_numpy(dtype=np.float64)
+    stored = {}
+    if "csv_L" in df.columns:
+        stored["L"] = (df["csv_L"].to_numpy(dtype=np.float64) / CSV_L_SCALE, lab[:, 0])
+    if "csv_a" in df.columns:
+        stored["a"] = (df["csv_a"].to_numpy(dtype=np.float64), lab[:, 1])
+    if "csv_b" in df.columns:
+        stored["b"] = (df["csv_b"].to_numpy(dtype=np.float64), lab[:, 2])
+    for name, (csv_values, values) in stored.items():
+        diff = np.abs(csv_values - values)
+        checks[f"csv_{name}_max_diff"] = round(float(np.nanmax(diff)), 4)
+        checks[f"csv_{name}_mismatch"] = int(np.sum(~(diff <= CSV_LAB_TOLERANCE)))
+    return checks
+
+
+# -------------------------------------------------------
+# 빌드
+# -------------------------------------------------------
+def _column_arrays(df):
+    """DataFrame → {컬럼: 고정 타입 ndarray}"""
+    arrays = {}
+    for col, dtype in NUMERIC_DTYPES.items():
+        if col in df.columns:
+            arrays[col] = np.ascontiguousarray(df[col].to_numpy(), dtype=dtype)
+    for col in STRING_COLUMNS:
+        if col in df.columns:
+            values = df[col].fillna("").astype(str).to_numpy()
+            width = max(1, max((len(v) for v in values), default=1))
+            arrays[col] = values.astype(f"<U{width}")
+    return arrays
+
+
+def _atomic_write(path, write):
+    """임시 파일에 쓰고 rename (다른 프로세스가 읽는 중에도 깨진 파일이 보이지 않도록)"""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def build_lip_catalog(csv_path, catalog_dir=None):
+    """CSV 파싱 + 검사 + 컬럼별 저장. manifest dict 반환"""
+    csv_path = Path(csv_path)
+    catalog_dir = Path(catalog_dir) if catalog_dir else default_catalog_dir(csv_path)
+
+    source_sha = file_sha256(csv_path)
+    df = load_and_preprocess_lip_csv(csv_path)
+    checks = validate_lip_catalog(df)
+    arrays = _column_arrays(df)
+
+    catalog_dir.mkdir(parents=True, exist_ok=True)
+    columns = {}
+    for col, values in arrays.items():
+        filename = f"{col}.npy"
+        _atomic_write(catalog_dir / filename, lambda f, v=values: np.save(f, v, allow_pickle=False))
+        columns[col] = {"file": filename, "dtype": values.dtype.str, "shape": list(values.shape)}
+
+    manifest = {
+        "version": LIP_CATALOG_VERSION,
+        "source": csv_path.name,
+        "source_sha256": source_sha,
+        "rows": int(len(df)),
+        "columns": columns,
+        "checks": checks,
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    # manifest를 마지막에 써야 컬럼 파일이 다 준비된 뒤에만 유효한 카탈로그로 보임
+    data = json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8")
+    _atomic_write(catalog_dir / MANIFEST_NAME, lambda f: f.write(data))
+    return manifest
+
+
+# -------------------------------------------------------
+# 로드
+# -------------------------------------------------------
+def read_manifest(catalog_dir):
+    try:
+        return json.loads((Path(catalog_dir) / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def read_lip_catalog(catalog_dir, expected_sha=None):
+    """
+    컴파일된 카탈로그 → {컬럼: 읽기 전용 memmap}
+    버전/해시/컬럼 타입·길이가 manifest와 맞지 않으면 None
+    """
+    catalog_dir = Path(catalog_dir)
+    manifest = read_manifest(catalog_dir)
+    if manifest is None or manifest.get("version") != LIP_CATALOG_VERSION:
+        return None
+    if expected_sha is not None and manifest.get("source_sha256") != expected_sha:
+        return None
+
+    rows = manifest.get("rows")
+    columns = {}
+    try:
+        for col, spec in manifest["columns"].items():
+            values = np.load(catalog_dir / spec["file"], mmap_mode="r", allow_pickle=False)
+            if values.dtype.str != spec["dtype"] or list(values.shape) != spec["shape"] or len(values) != rows:
+                return None
+            columns[col] = values
+    except (OSError, ValueError, KeyError):
+        return None
+
+    if any(c not in columns for c in REQUIRED_COLUMNS + LAB_COLUMNS):
+        return None
+    return columns
+
+
+def catalog_frame(columns):
+    """컬럼 dict → DataFrame (숫자 컬럼은 memmap을 복사 없이 그대로 사용)"""
+    return pd.DataFrame(columns, copy=False)
+
+
+def load_lip_catalog(csv_path, catalog_dir=None):
+    """
+    립 카탈로그 DataFrame (r, g, b, lab_L, lab_a, lab_b, brand, option, hex ...)
+    컴파일 결과가 CSV와 맞으면 memmap으로 읽기만, 아니면 다시 컴파일.
+    """
+    csv_path = Path(csv_path)
+    if not csv_path.exists():
+        raise FileNotFoundError(f"CSV 파일이 존재하지 않음: {csv_path}")
+    catalog_dir = Path(catalog_dir) if catalog_dir else default_catalog_dir(csv_path)
+
+    source_sha = file_sha256(csv_path)
+    columns = read_lip_catalog(catalog_dir, expected_sha=source_sha)
+    if columns is None:
+        try:
+            build_lip_catalog(csv_path, catalog_dir)
+            columns = read_lip_catalog(catalog_dir, expected_sha=source_sha)
+        except OSError:
+            columns = None
+        if columns is None:
+            # 캐시 폴더에 쓸 수 없는 환경이면 CSV 파싱 결과를 검사 후 그대로 사용
+            df = load_and_preprocess_lip_csv(csv_path)
+            validate_lip_catalog(df)
+            return catalog_frame(_column_arrays(df))
+    return catalog_frame(columns)
+
+
+def print_catalog_report(manifest):
+    checks = manifest["checks"]
+    print(f"립 카탈로그: {manifest['rows']}행, 컬럼 {len(manifest['columns'])}개 "
+          f"(중복 제품 {checks['duplicate_products']}, 같은 RGB {checks['duplicate_colors']})")
+    for name in ("L", "a", "b"):
+        if f"csv_{name}_max_diff" in checks:
+            scale = f" (÷{CSV_L_SCALE:g})" if name == "L" else ""
+            print(f"  CSV {name}{scale} vs RGB 재계산: 최대 차이 {checks[f'csv_{name}_max_diff']:.4f}, "
+                  f"허용 {CSV_LAB_TOLERANCE:g} 초과 {checks[f'csv_{name}_mismatch']}행")
+
+
+# -------------------------------------------------------
+# CLI (배포 시 미리 빌드)
+# -------------------------------------------------------
+def main(argv=None):
+    default_csv = Path(__file__).resolve().parents[1] / "lip_data" / "colorchips_data.csv"
+
+    parser = argparse.ArgumentParser(description="립 카탈로그 컴파일 (CSV → 컬럼별 .npy)")
+    parser.add_argument("--csv", default=str(default_csv), help="립 CSV 경로")
+    parser.add_argument("--catalog-dir", default=None, help="출력 폴더 (기본: <csv 폴더>/.cache/)")
+    parser.add_argument("--force", action="store_true", help="해시가 같아도 다시 빌드")
+    args = parser.parse_args(argv)
+
+    catalog_dir = Path(args.catalog_dir) if args.catalog_dir else default_catalog_dir(args.csv)
+
+    if not args.force and read_lip_catalog(catalog_dir, expected_sha=file_sha256(args.csv)) is not None:
+        print(f"립 카탈로그 최신 상태 → {catalog_dir}")
+        print_catalog_report(read_manifest(catalog_dir))
+        return 0
+
+    start = time.perf_counter()
+    try:
+        manifest = build_lip_catalog(args.csv, catalog_dir)
+    except LipCatalogError as e:
+        print(f"립 카탈로그 검사 실패: {e}")
+        return 1
+    elapsed = (time.perf_counter() - start) * 1000
+
+    print(f"립 카탈로그 빌드 완료 ({elapsed:.1f} ms) → {catalog_dir}")
+    print_catalog_report(manifest)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
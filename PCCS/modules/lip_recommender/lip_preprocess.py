@@ -1,20 +1,45 @@
 from pathlib import Path
 import pandas as pd
 
+from modules.color_science import rgb255_to_lab
+
+# 립 카탈로그 컬럼
+#   r, g, b              : sRGB (0~255)
+#   lab_L, lab_a, lab_b  : RGB에서 다시 계산한 CIE Lab (추천/시즌 분류에 사용)
+RGB_COLUMNS = ["r", "g", "b"]
+LAB_COLUMNS = ["lab_L", "lab_a", "lab_b"]
+
+# CSV에 같이 저장된 Lab 컬럼 (검증용으로만 보관)
+#   헤더가 r,g,b,L,a,b 라서 Lab b*가 RGB b와 이름이 겹침 → pandas가 두 번째 b를 b.1로 바꿈
+#   L은 실제 L*의 0.3배로 저장되어 있음 (#884745 → 11.4, 실제 L* ≈ 38.1)
+CSV_LAB_COLUMNS = {"L": "csv_L", "a": "csv_a", "b.1": "csv_b"}
+
+
 def load_and_preprocess_lip_csv(csv_path):
+    """
+    립 CSV 원본 파싱 (pandas) → DataFrame
+    저장된 Lab은 csv_L/csv_a/csv_b로 이름을 바꿔 두고, lab_L/lab_a/lab_b를 RGB에서 새로 계산.
+    (서버/배치는 컴파일된 카탈로그 modules.lip_recommender.lip_catalog를 사용)
+    """
     csv_path = Path(csv_path)
 
     if not csv_path.exists():
         raise FileNotFoundError(f"CSV 파일이 존재하지 않음: {csv_path}")
 
     df = pd.read_csv(csv_path)
+    df = df.rename(columns=CSV_LAB_COLUMNS)
 
-    numeric_cols = ["r", "g", "b"]
+    numeric_cols = RGB_COLUMNS + list(CSV_LAB_COLUMNS.values())
     numeric_cols = [c for c in numeric_cols if c in df.columns]
 
     for col in numeric_cols:
         df[col] = pd.to_numeric(df[col], errors="coerce")
 
-    df = df.dropna(subset=numeric_cols)
+    df = df.dropna(subset=[c for c in RGB_COLUMNS if c in df.columns]).reset_index(drop=True)
+
+    if all(c in df.columns for c in RGB_COLUMNS):
+        lab = rgb255_to_lab(df[RGB_COLUMNS].to_numpy())
+        for i, col in enumerate(LAB_COLUMNS):
+            df[col] = lab[:, i]
 
     return df
@@ -2,8 +2,10 @@ import numpy as np
 import pandas as pd
 from pathlib import Path
 
-# palette_processor에서 PNG → DF 변환 함수 읽기
-from modules.palette_processor import process_palette
+# palette_processor에서 팔레트 로딩 함수 읽기 (컴파일 캐시 사용)
+from modules.palette_processor import load_all_palettes
+from modules.color_science import delta_e76, delta_e2000
+from modules.lip_recommender.lip_preprocess import LAB_COLUMNS
 
 
 # ================================================================
@@ -14,7 +16,7 @@ PALETTE_DIR = BASE_DIR / "palettes"
 
 
 # ================================================================
-# 1) ΔE 계산 함수 (CIE76)
+# 1) ΔE 계산 함수 (CIE76 / CIEDE2000 — modules.color_science)
 # ================================================================
 def delta_e(lab1, lab2):
     lab1 = np.array(lab1)
@@ -22,15 +24,38 @@ def delta_e(lab1, lab2):
     return np.sqrt(np.sum((lab1 - lab2) ** 2))
 
 
+def delta_e76_batch(target_lab, labs):
+    """target_lab (3,) 과 labs (N, 3) 사이 ΔE76 을 한 번에 계산 → (N,)"""
+    return delta_e76(target_lab, labs)
+
+
+def delta_e2000_batch(target_lab, labs, kL=1.0, kC=1.0, kH=1.0):
+    """target_lab (3,) 과 labs (N, 3) 사이 CIEDE2000 → (N,)"""
+    return delta_e2000(target_lab, labs, kL=kL, kC=kC, kH=kH)
+
+
+# 추천 정렬/중복 제거에 쓸 수 있는 거리 함수
+DELTA_E_METRICS = {
+    "cie76": delta_e76_batch,
+    "ciede2000": delta_e2000_batch,
+}
+
+
+def get_delta_e_metric(metric):
+    if metric not in DELTA_E_METRICS:
+        raise ValueError(f"지원하지 않는 ΔE 방식: {metric} (가능: {list(DELTA_E_METRICS)})")
+    return DELTA_E_METRICS[metric]
+
+
 # ================================================================
-# 2) 시즌 팔레트 로딩 (PNG → DataFrame)
+# 2) 시즌 팔레트 로딩 (팔레트 캐시 → DataFrame)
 # ================================================================
 def load_season_palette(season):
     palette_path = PALETTE_DIR / f"{season}_numbered.png"
     if not palette_path.exists():
         raise FileNotFoundError(f"시즌 팔레트 파일 없음: {palette_path}")
 
-    df = process_palette(palette_path)
+    df = load_all_palettes(PALETTE_DIR)[season]
     df = df.rename(columns={"L*": "L", "a*": "a", "b*": "b"})
     return df
 
@@ -46,16 +71,45 @@ def classify_lip_season_knn(lip_lab, season_classifier):
     return season_classifier.predict_season(lip_lab)
 
 
+def catalog_lab_array(lip_df):
+    """립 카탈로그의 Lab 컬럼(RGB에서 계산한 lab_L, lab_a, lab_b) → (N, 3) float 배열"""
+    return lip_df[LAB_COLUMNS].to_numpy(dtype=np.float64)
+
+
+def attach_season_labels(lip_df, season_classifier):
+    """
+    카탈로그 전체 시즌 라벨을 한 번의 일괄 predict로 계산해서
+    season_knn 컬럼으로 붙인 복사본 반환.
+    (라벨은 사용자와 무관하므로 카탈로그 로딩 시 한 번만 호출)
+    """
+    # 얕은 복사: 카탈로그 컬럼(memmap)은 복사하지 않고 라벨 컬럼만 추가
+    lip_df = lip_df.copy(deep=False)
+    lip_df["season_knn"] = season_classifier.predict_seasons(catalog_lab_array(lip_df))
+    return lip_df
+
+
 # ================================================================
 # 4) 사용자 피부색 기준 ΔE 정렬
+#    (전체 후보 거리를 배열 연산 한 번으로 계산)
 # ================================================================
-def sort_by_lab_distance(lip_df, target_lab):
+def sort_by_lab_distance(lip_df, target_lab, metric="cie76"):
     lip_df = lip_df.copy()
-    lip_df["delta_e"] = lip_df.apply(
-        lambda r: delta_e(target_lab, (r["L"], r["a"], r["b"])),
-        axis=1
-    )
-    return lip_df.sort_values("delta_e")
+    lip_df["delta_e"] = get_delta_e_metric(metric)(target_lab, catalog_lab_array(lip_df))
+    return lip_df.sort_values("delta_e", kind="stable")
+
+
+def top_k_indices(distances, k):
+    """
+    거리 배열에서 가장 가까운 k개 위치를 가까운 순으로 반환.
+    전체 정렬 대신 argpartition(부분 선택) 후 k개만 정렬.
+    """
+    n = len(distances)
+    if k >= n:
+        return np.argsort(distances, kind="stable")
+    part = np.argpartition(distances, k - 1)[:k]
+    # 동일 거리는 카탈로그 순서 유지
+    order = np.lexsort((part, distances[part]))
+    return part[order]
 
 
 # ================================================================
@@ -66,7 +120,7 @@ def remove_duplicates(lip_df, threshold=2.0, max_count=5):
     used = []
 
     for _, row in lip_df.iterrows():
-        current = np.array([row["L"], row["a"], row["b"]])
+        current = np.array([row[c] for c in LAB_COLUMNS], dtype=np.float64)
 
         duplicated = any(delta_e(current, u) < threshold for u in used)
         if duplicated:
@@ -81,45 +135,83 @@ def remove_duplicates(lip_df, threshold=2.0, max_count=5):
     return pd.DataFrame(final)
 
 
+def select_distinct(labs, order, threshold=2.0, max_count=5, metric="cie76"):
+    """
+    order(가까운 순 위치 배열)를 따라가며 이미 고른 색과 ΔE < threshold 인 후보는 건너뛰고
+    최대 max_count개 위치를 반환. (remove_duplicates의 배열 버전)
+    """
+    dist_fn = get_delta_e_metric(metric)
+    picked = []
+
+    for i in order:
+        if picked and (dist_fn(labs[i], labs[picked]) < threshold).any():
+            continue
+        picked.append(i)
+        if len(picked) >= max_count:
+            break
+
+    return picked
+
+
+def rank_lip_candidates(lip_df, target_lab, metric="cie76", threshold=2.0, max_count=5):
+    """
+    후보 전체 ΔE를 한 번에 계산하고, 부분 선택(top-k)으로 앞쪽만 정렬해서
+    중복 제거 후 TOP max_count 행(DataFrame, delta_e 컬럼 포함) 반환.
+    중복 때문에 부족하면 k를 늘려가며 다시 선택한다.
+    """
+    if lip_df.empty:
+        return lip_df.assign(delta_e=pd.Series(dtype=float))
+
+    labs = catalog_lab_array(lip_df)
+    distances = get_delta_e_metric(metric)(target_lab, labs)
+
+    n = len(distances)
+    k = min(n, max_count * 8)
+    while True:
+        order = top_k_indices(distances, k)
+        picked = select_distinct(labs, order, threshold, max_count, metric)
+        if len(picked) >= max_count or k >= n:
+            break
+        k = min(n, k * 4)
+
+    final = lip_df.iloc[picked].copy()
+    final["delta_e"] = distances[picked]
+    return final
+
+
 # ================================================================
 # 6) 최종 립 추천 (LAB-KNN 시즌 매칭 + ΔE 정렬 + 중복 제거)
 # ================================================================
-def recommend_lip_colors(season_classifier, user_season, skin_lab, lip_df):
+def recommend_lip_colors(season_classifier, user_season, skin_lab, lip_df, metric="cie76"):
     """
     season_classifier : SeasonKNNClassifier (LAB-KNN 버전)
     user_season       : 사용자 판정 시즌 (spring/summer/autumn/winter)
     skin_lab          : 사용자 피부 Lab (L, a, b)
-    lip_df            : 전체 립 CSV (L,a,b 포함)
+    lip_df            : 전체 립 카탈로그 (lab_L, lab_a, lab_b 포함, lip_catalog.load_lip_catalog)
+                        season_knn 컬럼이 이미 있으면 그대로 사용
+                        (attach_season_labels로 카탈로그 로딩 시 미리 계산)
+    metric            : ΔE 방식 ("cie76" 기본, "ciede2000" 선택 가능)
     """
 
     # ---------------------------------------------------
-    # 1) 립 CSV 전체에 대해 시즌 라벨 자동 부착 (LAB-KNN)
+    # 1) 립 CSV 전체 시즌 라벨 (LAB-KNN)
+    #    미리 계산된 라벨이 없을 때만 일괄 predict 한 번
     # ---------------------------------------------------
-    assigned_seasons = []
-    for _, row in lip_df.iterrows():
-        lip_lab = (row["L"], row["a"], row["b"])
-        lip_season = classify_lip_season_knn(lip_lab, season_classifier)
-        assigned_seasons.append(lip_season)
-
-    lip_df = lip_df.copy()
-    lip_df["season_knn"] = assigned_seasons
+    if "season_knn" not in lip_df.columns:
+        lip_df = attach_season_labels(lip_df, season_classifier)
 
     # ---------------------------------------------------
     # 2) 사용자 시즌과 일치하는 립만 사용
     # ---------------------------------------------------
-    filtered = lip_df[lip_df["season_knn"] == user_season].copy()
+    filtered = lip_df[lip_df["season_knn"] == user_season]
     if filtered.empty:
         # 시즌 내 립이 하나도 없다면 전체에서 진행 (fallback)
-        filtered = lip_df.copy()
-
-    # ---------------------------------------------------
-    # 3) 피부 Lab 기준 ΔE 거리 정렬
-    # ---------------------------------------------------
-    sorted_df = sort_by_lab_distance(filtered, skin_lab)
+        filtered = lip_df
 
     # ---------------------------------------------------
+    # 3) 피부 Lab 기준 ΔE 계산 + 부분 선택 정렬
     # 4) ΔE < 2 중복 제거, TOP 5
     # ---------------------------------------------------
-    final = remove_duplicates(sorted_df, threshold=2.0, max_count=5)
+    final = rank_lip_candidates(filtered, skin_lab, metric=metric, threshold=2.0, max_count=5)
 
     return final
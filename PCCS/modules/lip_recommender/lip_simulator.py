@@ -1,9 +1,7 @@
 import cv2
 import numpy as np
-import mediapipe as mp
-from pathlib import Path
-
-mp_face_mesh = mp.solutions.face_mesh
+from modules.face_context import build_face_context
+from modules.image_io import load_bgr
 
 class LipNotFoundError(Exception):
     pass
@@ -78,137 +76,204 @@ def get_teeth_mask(image, base_mask):
 
 
 # -----------------------------
-# 입술 마스크 생성
+# 입술 ROI (입술 bbox + 블러 여유분)
+#   마스크/합성에 쓰는 블러가 번지는 거리보다 넉넉하게 잡아서
+#   ROI 안에서만 계산해도 전체 프레임 계산과 결과가 같다.
+#   (치아 9x9 → 4px, 입안 13x13 → 6px, 입술 13x13 → 6px, 텍스처 21x21 → 10px)
 # -----------------------------
-def get_lip_mask(image):
-    img_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+LIP_ROI_MARGIN = 32
 
-    with mp_face_mesh.FaceMesh(
-        static_image_mode=True,
-        max_num_faces=1,
-        refine_landmarks=True,
-        min_detection_confidence=0.5
-    ) as mesh:
 
-        results = mesh.process(img_rgb)
-        if not results.multi_face_landmarks:
-            raise LipNotFoundError("입술 인식 실패")
+def get_lip_polygons(face, w, h):
+    """입술 윗/아랫 polygon, 입 안쪽 polygon, 입벌림 강도 (전체 이미지 좌표)"""
+    upper = np.array([
+        (int(face.landmark[i].x * w), int(face.landmark[i].y * h))
+        for i in UPPER_LIP
+    ], np.int32)
 
-        h, w, _ = image.shape
-        face = results.multi_face_landmarks[0]
+    lower = np.array([
+        (int(face.landmark[i].x * w), int(face.landmark[i].y * h))
+        for i in LOWER_LIP
+    ], np.int32)
 
-        upper = np.array([
-            (int(face.landmark[i].x * w), int(face.landmark[i].y * h))
-            for i in UPPER_LIP
-        ], np.int32)
+    upper = expand_polygon(upper, 1.08)
+    lower = expand_polygon(lower, 1.10)
 
-        lower = np.array([
-            (int(face.landmark[i].x * w), int(face.landmark[i].y * h))
-            for i in LOWER_LIP
-        ], np.int32)
+    inner = get_inner_mouth_polygon(face, w, h, scale=1.18)
+    strength = get_inner_mask_strength(face, h)
+    return upper, lower, inner, strength
 
-        upper = expand_polygon(upper, 1.08)
-        lower = expand_polygon(lower, 1.10)
 
-        lip_mask = np.zeros((h, w), dtype=np.uint8)
-        cv2.fillPoly(lip_mask, [upper], 255)
-        cv2.fillPoly(lip_mask, [lower], 255)
+def get_lip_roi(polygons, shape, margin=LIP_ROI_MARGIN):
+    """polygon들을 감싸는 bbox + margin → (x0, y0, x1, y1), 이미지 범위로 자름"""
+    h, w = shape[:2]
+    pts = np.concatenate(polygons, axis=0)
+    x0 = max(int(pts[:, 0].min()) - margin, 0)
+    y0 = max(int(pts[:, 1].min()) - margin, 0)
+    x1 = min(int(pts[:, 0].max()) + margin + 1, w)
+    y1 = min(int(pts[:, 1].max()) + margin + 1, h)
 
-        strength = get_inner_mask_strength(face, h)
+    if x0 >= x1 or y0 >= y1:
+        raise LipNotFoundError("입술 영역이 이미지 밖에 있음")
+    return x0, y0, x1, y1
 
-        inner_poly = get_inner_mouth_polygon(face, w, h, scale=1.18)
-        inner_mask = np.zeros((h, w), dtype=np.uint8)
-        cv2.fillPoly(inner_mask, [inner_poly], 255)
 
-        teeth_mask = get_teeth_mask(image, base_mask=cv2.bitwise_or(lip_mask, inner_mask))
+# -----------------------------
+# 입술 마스크 생성 (ROI)
+#   face_ctx(FaceContext)가 있으면 FaceMesh를 다시 돌리지 않음
+#   반환: (ROI 크기 마스크, (x0, y0, x1, y1))
+# -----------------------------
+def get_lip_mask_roi(image, face_ctx=None, margin=LIP_ROI_MARGIN):
+    if face_ctx is None:
+        face_ctx = build_face_context(image)
+
+    if not face_ctx.found:
+        raise LipNotFoundError("입술 인식 실패")
+
+    h, w, _ = image.shape
+    upper, lower, inner_poly, strength = get_lip_polygons(face_ctx.face, w, h)
 
-        inner_mask_blur = cv2.GaussianBlur(inner_mask, (13, 13), 6)
-        inner_float = (inner_mask_blur.astype(np.float32) / 255.0) * strength
-        teeth_float = (teeth_mask.astype(np.float32) / 255.0) * 1.0
+    x0, y0, x1, y1 = get_lip_roi([upper, lower, inner_poly], image.shape, margin)
+    roi = image[y0:y1, x0:x1]
+    offset = np.array([x0, y0], np.int32)
+    rh, rw = roi.shape[:2]
 
-        remove_float = np.clip(inner_float + teeth_float, 0.0, 1.0)
-        lip_mask = (lip_mask.astype(np.float32) * (1.0 - remove_float)).astype(np.uint8)
+    lip_mask = np.zeros((rh, rw), dtype=np.uint8)
+    cv2.fillPoly(lip_mask, [upper - offset], 255)
+    cv2.fillPoly(lip_mask, [lower - offset], 255)
 
-        lip_mask = cv2.GaussianBlur(lip_mask, (13, 13), 8)
-        return lip_mask
+    inner_mask = np.zeros((rh, rw), dtype=np.uint8)
+    cv2.fillPoly(inner_mask, [inner_poly - offset], 255)
+
+    teeth_mask = get_teeth_mask(roi, base_mask=cv2.bitwise_or(lip_mask, inner_mask))
+
+    inner_mask_blur = cv2.GaussianBlur(inner_mask, (13, 13), 6)
+    inner_float = (inner_mask_blur.astype(np.float32) / 255.0) * strength
+    teeth_float = (teeth_mask.astype(np.float32) / 255.0) * 1.0
+
+    remove_float = np.clip(inner_float + teeth_float, 0.0, 1.0)
+    lip_mask = (lip_mask.astype(np.float32) * (1.0 - remove_float)).astype(np.uint8)
+
+    lip_mask = cv2.GaussianBlur(lip_mask, (13, 13), 8)
+    return lip_mask, (x0, y0, x1, y1)
 
 
 # -----------------------------
-# 립 합성
+# 입술 마스크 생성 (전체 프레임 크기)
 # -----------------------------
-def apply_lip_color(image, lip_mask, color_rgb):
-    h, w, _ = image.shape
+def get_lip_mask(image, face_ctx=None):
+    roi_mask, (x0, y0, x1, y1) = get_lip_mask_roi(image, face_ctx=face_ctx)
 
-    # -----------------------------
-    # 1) 목표 색(BGR) & 결과 색 템플릿 생성
-    # -----------------------------
-    desired_color_BGR = np.array(color_rgb[::-1], dtype=np.uint8)
-    desired = np.full((h, w, 3), desired_color_BGR, dtype=np.uint8)
-
-    # -----------------------------
-    # 2) 입술 텍스처 보존 (원본 - 블러)
-    # -----------------------------
-    blur = cv2.GaussianBlur(image, (21, 21), 10)
-    texture = cv2.subtract(image, blur)
-    texture = np.clip(texture * 1.30, 0, 255)
-
-    # -----------------------------
-    # 3) 부드러운 그라데이션 마스크(입술 중심 → 외곽)
-    # -----------------------------
-    dist = cv2.distanceTransform((lip_mask > 0).astype(np.uint8), cv2.DIST_L2, 5)
-    dist = dist / (dist.max() + 1e-6)
-    grad_mask = (0.7 + dist * 0.3)  # shape: (H, W)
-    grad_mask = grad_mask[:, :, None]  # (H, W, 1)
-
-    # -----------------------------
-    # 4) gloss(광택)
-    # -----------------------------
-    gloss = cv2.GaussianBlur(desired, (17, 17), 15)
-    gloss = np.clip((gloss - desired) * 0.25, 0, 255)
-
-    # -----------------------------
-    # 5) 최종 결과 색 생성
-    # -----------------------------
-    result = np.clip(desired + texture + gloss, 0, 255).astype(np.float32)
-
-    # -----------------------------
-    # 6) lip_mask를 안정적으로 3채널로 변환 (핵심 fix)
-    # -----------------------------
-    mask = lip_mask.astype(np.float32) / 255.0  # (H, W) 또는 (H, W, 1)
-
-    # (H, W) → (H, W, 1)
-    if mask.ndim == 2:
-        mask = mask[:, :, None]
-
-    # grad_mask와 결합 → (H, W, 1)
-    blend_strength = 0.70
-    mask = mask * grad_mask * blend_strength
-
-    # 이제 반드시 (H, W, 3)로 확장
-    if mask.shape[2] == 1:
-        mask = np.repeat(mask, 3, axis=2)
-
-    # -----------------------------
-    # 7) Blending
-    # -----------------------------
-    blended = image.astype(np.float32) * (1 - mask) + result * mask
-    blended = np.clip(blended, 0, 255).astype(np.uint8)
-
-    return blended
+    h, w, _ = image.shape
+    lip_mask = np.zeros((h, w), dtype=np.uint8)
+    lip_mask[y0:y1, x0:x1] = roi_mask
+    return lip_mask
 
 
 # -----------------------------
-# 비포/애프터 생성
+# 립 합성 컨텍스트
+#   얼굴 1개에 대해 마스크 / 텍스처 / 그라데이션을 한 번만 계산해 두고
+#   여러 색을 한 번에(벡터화) 입힌다. 세션 동안 보관해 두면
+#   다른 색상을 고를 때 마스크를 다시 만들 필요가 없다.
 # -----------------------------
-def simulate_lip_color(image_path, color_rgb):
-    img_path = Path(image_path)
-    image = cv2.imread(str(img_path))
+class LipRenderContext:
+    BLEND_STRENGTH = 0.70
+
+    def __init__(self, image, lip_mask, box=None):
+        """
+        image   : 전체 BGR 이미지
+        lip_mask: box 영역 크기의 입술 마스크 (box가 None이면 전체 크기)
+        box     : (x0, y0, x1, y1) 입술 ROI
+        """
+        h, w, _ = image.shape
+        self.image = image
+        self.box = box if box is not None else (0, 0, w, h)
+        x0, y0, x1, y1 = self.box
+        roi = image[y0:y1, x0:x1]
+
+        # 입술 텍스처 보존 (원본 - 블러)
+        blur = cv2.GaussianBlur(roi, (21, 21), 10)
+        texture = cv2.subtract(roi, blur)
+        self._texture = np.clip(texture * 1.30, 0, 255)
+
+        # 부드러운 그라데이션 마스크(입술 중심 → 외곽)
+        dist = cv2.distanceTransform((lip_mask > 0).astype(np.uint8), cv2.DIST_L2, 5)
+        dist = dist / (dist.max() + 1e-6)
+        grad_mask = (0.7 + dist * 0.3)[:, :, None]  # (h, w, 1)
+
+        mask = lip_mask.astype(np.float32) / 255.0
+        if mask.ndim == 2:
+            mask = mask[:, :, None]
+        self._mask = mask * grad_mask * self.BLEND_STRENGTH  # (h, w, 1), 3채널에 브로드캐스트
+
+        # 색과 무관한 원본 쪽 항
+        self._base = roi.astype(np.float32) * (1 - self._mask)
+
+    @property
+    def nbytes(self):
+        """보관 중인 배열 전체 크기 (원본 이미지 + ROI 텍스처/마스크/기본 항) — 캐시 용량 계산용"""
+        return self.image.nbytes + self._texture.nbytes + self._mask.nbytes + self._base.nbytes
+
+    @classmethod
+    def from_face(cls, image, face_ctx=None):
+        """이미지 + FaceContext로 입술 ROI 마스크부터 계산"""
+        image = load_bgr(image)
+        lip_mask, box = get_lip_mask_roi(image, face_ctx=face_ctx)
+        return cls(image, lip_mask, box)
+
+    @staticmethod
+    def _gloss(desired):
+        """
+        gloss(광택) 항. 단색 이미지를 블러해도 단색이므로
+        작은 패치 하나로 계산한 값이 전체 프레임 계산과 같다.
+        desired: (N, 3) uint8 → (N, 1, 1, 3)
+        """
+        gloss = np.empty((len(desired), 1, 1, 3), dtype=np.float64)
+        for i, c in enumerate(desired):
+            patch = np.full((17, 17, 3), c, dtype=np.uint8)
+            g = cv2.GaussianBlur(patch, (17, 17), 15)
+            gloss[i] = np.clip((g[8:9, 8:9] - patch[8:9, 8:9]) * 0.25, 0, 255)
+        return gloss
+
+    def render_roi(self, colors_rgb):
+        """여러 색을 한 번에 합성한 ROI 배열 (N, h, w, 3) uint8"""
+        desired = np.array([tuple(c)[::-1] for c in colors_rgb], dtype=np.uint8)
+        gloss = self._gloss(desired)
+
+        result = np.clip(desired[:, None, None, :] + self._texture + gloss, 0, 255).astype(np.float32)
+        blended = self._base + result * self._mask
+        return np.clip(blended, 0, 255).astype(np.uint8)
+
+    def render_many(self, colors_rgb, chunk=8):
+        """색 리스트 → 전체 크기 BGR 이미지 리스트 (메모리 제한을 위해 chunk개씩)"""
+        x0, y0, x1, y1 = self.box
+        colors_rgb = list(colors_rgb)
+        outputs = []
+        for start in range(0, len(colors_rgb), chunk):
+            for roi in self.render_roi(colors_rgb[start:start + chunk]):
+                out = self.image.copy()
+                out[y0:y1, x0:x1] = roi
+                outputs.append(out)
+        return outputs
+
+    def render(self, color_rgb):
+        return self.render_many([color_rgb])[0]
+
 
-    if image is None:
-        raise FileNotFoundError(f"이미지를 찾을 수 없음: {image_path}")
+# -----------------------------
+# 립 합성
+# -----------------------------
+def apply_lip_color(image, lip_mask, color_rgb):
+    return LipRenderContext(image, lip_mask).render(color_rgb)
 
-    lip_mask = get_lip_mask(image)
-    result_image = apply_lip_color(image, lip_mask, color_rgb=color_rgb)
 
-    # 저장하지 않고 이미지 반환만
-    return result_image
+# -----------------------------
+# 비포/애프터 생성
+# -----------------------------
+def simulate_lip_color(image, color_rgb, face_ctx=None):
+    """
+    image: 경로 또는 BGR ndarray
+    여러 색을 입힐 때는 LipRenderContext.from_face(...).render_many(...) 사용
+    """
+    # 입술 ROI에서만 마스크/합성 계산 후 원본 복사본에 붙여넣기
+    return LipRenderContext.from_face(image, face_ctx=face_ctx).render(color_rgb)
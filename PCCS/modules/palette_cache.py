@@ -0,0 +1,228 @@
+# modules/palette_cache.py
+# -------------------------------------------------------
+# 시즌 팔레트 컴파일 캐시
+#   *_numbered.png 4장에서 추출한 96색(RGB + Lab)을 .npz 하나로 저장해 두고,
+#   PNG 내용 해시가 같으면 추출 과정 없이 바로 읽어온다.
+#   PNG가 바뀌면 해시가 달라져서 자동으로 다시 만든다.
+#   같은 파일에 시즌 KNN의 Lab 조회 격자(SeasonLookupGrid)도 함께 저장
+#   (픽셀 단위 시즌 분류용, grid_* 배열).
+#
+# 배포 시 미리 빌드:
+#   python -m modules.palette_cache            # palettes/ 기준 빌드 + 격자 일치율 출력
+#   python -m modules.palette_cache --force    # 해시가 같아도 강제 재빌드
+# -------------------------------------------------------
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from modules.palette_processor import process_palette, season_palette_files
+from modules.season_classifier import SeasonKNNClassifier, SeasonLookupGrid, grid_agreement
+from modules.seasons import SEASONS
+
+# 추출 로직(process_palette)이나 격자 형식이 바뀌면 올려서 기존 캐시를 무효화
+#   v2: Lab 조회 격자(grid_*) 추가
+PALETTE_CACHE_VERSION = 2
+CACHE_FILENAME = f"palettes_v{PALETTE_CACHE_VERSION}.npz"
+
+
+def default_cache_path(palette_dir):
+    return Path(palette_dir) / ".cache" / CACHE_FILENAME
+
+
+def file_sha256(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def palette_hashes(palette_dir):
+    """시즌별 PNG 내용 해시 (SEASONS 순서)"""
+    files = season_palette_files(palette_dir)
+    for season, path in files.items():
+        if not path.exists():
+            raise FileNotFoundError(f"팔레트 파일을 찾을 수 없음: {path}")
+    return [file_sha256(files[season]) for season in SEASONS]
+
+
+# -------------------------------------------------------
+# DataFrame dict <-> 배열 변환
+# -------------------------------------------------------
+def _palettes_to_arrays(palettes):
+    rgb = np.stack([palettes[s][["R", "G", "B"]].to_numpy(np.int64) for s in SEASONS])
+    lab = np.stack([palettes[s][["L*", "a*", "b*"]].to_numpy(np.float64) for s in SEASONS])
+    return rgb, lab
+
+
+def _arrays_to_palettes(rgb, lab):
+    palettes = {}
+    for i, season in enumerate(SEASONS):
+        n = rgb.shape[1]
+        palettes[season] = pd.DataFrame({
+            "번호": range(1, n + 1),
+            "R": rgb[i, :, 0],
+            "G": rgb[i, :, 1],
+            "B": rgb[i, :, 2],
+            "L*": lab[i, :, 0],
+            "a*": lab[i, :, 1],
+            "b*": lab[i, :, 2],
+        })
+    return palettes
+
+
+# -------------------------------------------------------
+# 빌드 / 로드
+# -------------------------------------------------------
+def build_palette_cache(palette_dir, cache_path=None):
+    """PNG에서 팔레트를 추출해 캐시 파일로 저장. (palettes, cache_path) 반환"""
+    palette_dir = Path(palette_dir)
+    cache_path = Path(cache_path) if cache_path else default_cache_path(palette_dir)
+
+    hashes = palette_hashes(palette_dir)
+    files = season_palette_files(palette_dir)
+    palettes = {season: process_palette(files[season]) for season in SEASONS}
+    rgb, lab = _palettes_to_arrays(palettes)
+    grid = SeasonKNNClassifier(palettes).build_grid()
+
+    # 다른 프로세스가 읽는 중에도 깨진 파일이 보이지 않도록 임시 파일 → rename
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            # 격자가 수 MB라 압축 저장 (대부분 같은 값이 이어져서 수백 KB로 줄어듦)
+            np.savez_compressed(
+                f,
+                version=np.array(PALETTE_CACHE_VERSION),
+                seasons=np.array(SEASONS),
+                hashes=np.array(hashes),
+                rgb=rgb,
+                lab=lab,
+                **grid.to_arrays(),
+            )
+        os.replace(tmp, cache_path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+    return palettes, cache_path
+
+
+def read_palette_cache(cache_path, expected_hashes=None):
+    """
+    캐시 파일 읽기. 버전/시즌/해시가 맞지 않으면 None.
+    반환: {"rgb", "lab", "hashes", "grid_*"} 배열 dict (추가 항목은 그대로 포함)
+    """
+    cache_path = Path(cache_path)
+    if not cache_path.exists():
+        return None
+
+    try:
+        with np.load(cache_path, allow_pickle=False) as data:
+            arrays = {k: data[k] for k in data.files}
+    except (OSError, ValueError, KeyError):
+        return None
+
+    if int(arrays.get("version", -1)) != PALETTE_CACHE_VERSION:
+        return None
+    if list(arrays.get("seasons", [])) != SEASONS:
+        return None
+    if expected_hashes is not None and list(arrays.get("hashes", [])) != list(expected_hashes):
+        return None
+    return arrays
+
+
+def load_compiled_palettes(palette_dir, cache_path=None):
+    """
+    load_all_palettes와 같은 형식(dict: season → DataFrame) 반환.
+    캐시가 유효하면 읽기만, 아니면 PNG에서 추출 후 캐시 갱신.
+    """
+    palette_dir = Path(palette_dir)
+    cache_path = Path(cache_path) if cache_path else default_cache_path(palette_dir)
+
+    hashes = palette_hashes(palette_dir)
+    arrays = read_palette_cache(cache_path, expected_hashes=hashes)
+    if arrays is not None:
+        return _arrays_to_palettes(arrays["rgb"], arrays["lab"])
+
+    try:
+        palettes, _ = build_palette_cache(palette_dir, cache_path)
+    except OSError:
+        # 캐시 폴더에 쓸 수 없는 환경이면 추출 결과만 사용
+        files = season_palette_files(palette_dir)
+        palettes = {season: process_palette(files[season]) for season in SEASONS}
+    return palettes
+
+
+def load_season_grid(palette_dir, cache_path=None):
+    """
+    팔레트 캐시에 저장된 Lab 조회 격자 (SeasonLookupGrid).
+    캐시가 없거나 PNG와 맞지 않으면 None (빌드는 load_compiled_palettes가 담당)
+    """
+    palette_dir = Path(palette_dir)
+    cache_path = Path(cache_path) if cache_path else default_cache_path(palette_dir)
+    arrays = read_palette_cache(cache_path, expected_hashes=palette_hashes(palette_dir))
+    if arrays is None:
+        return None
+    return SeasonLookupGrid.from_arrays(arrays)
+
+
+def agreement_samples(n=200_000, seed=0):
+    """격자 일치율 확인용 Lab 표본: sRGB 전체에서 무작위 + 피부색 근처 정규분포"""
+    from modules.color_science import srgb_to_lab
+
+    rng = np.random.default_rng(seed)
+    gamut = srgb_to_lab(rng.integers(0, 256, (n, 3), dtype=np.uint8), dtype=np.float64)
+    skin = rng.normal([62.0, 14.0, 18.0], [8.0, 4.0, 5.0], (n, 3))
+    return {"gamut": gamut, "skin": skin}
+
+
+def print_grid_report(palettes, grid):
+    classifier = SeasonKNNClassifier(palettes)
+    print(f"Lab 격자: {' x '.join(map(str, grid.season.shape))} 칸, 간격 {grid.step:g}, "
+          f"경계 칸 {grid.mixed.mean():.1%}")
+    for name, samples in agreement_samples().items():
+        r = grid_agreement(classifier, grid, samples)
+        print(f"  {name:5s} {r['samples']:,}점 | 격자 일치 {r['agree']:.2%} | "
+              f"경계 칸 재계산 시 {r['agree_hybrid']:.3%} (재계산 {r['fallback']:.1%}) | "
+              f"득표 오차 {r['vote_mae']:.2f}%p")
+
+
+# -------------------------------------------------------
+# CLI (배포 시 미리 빌드)
+# -------------------------------------------------------
+def main(argv=None):
+    default_dir = Path(__file__).resolve().parents[1] / "palettes"
+
+    parser = argparse.ArgumentParser(description="시즌 팔레트 컴파일 캐시 빌드")
+    parser.add_argument("--palette-dir", default=str(default_dir), help="*_numbered.png 폴더")
+    parser.add_argument("--cache-path", default=None, help="캐시 파일 경로 (기본: <palette-dir>/.cache/)")
+    parser.add_argument("--force", action="store_true", help="해시가 같아도 다시 빌드")
+    args = parser.parse_args(argv)
+
+    cache_path = Path(args.cache_path) if args.cache_path else default_cache_path(args.palette_dir)
+    hashes = palette_hashes(args.palette_dir)
+
+    arrays = None if args.force else read_palette_cache(cache_path, expected_hashes=hashes)
+    if arrays is not None:
+        print(f"팔레트 캐시 최신 상태 → {cache_path}")
+        print_grid_report(_arrays_to_palettes(arrays["rgb"], arrays["lab"]),
+                          SeasonLookupGrid.from_arrays(arrays))
+        return 0
+
+    start = time.perf_counter()
+    palettes, cache_path = build_palette_cache(args.palette_dir, cache_path)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    n_colors = sum(len(df) for df in palettes.values())
+    print(f"팔레트 캐시 빌드 완료 ({n_colors}색, {elapsed:.1f} ms) → {cache_path}")
+    print_grid_report(palettes, load_season_grid(args.palette_dir, cache_path))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
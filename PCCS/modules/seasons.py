@@ -0,0 +1,3 @@
+# modules/seasons.py
+# 시즌 이름과 순서 (팔레트 파일 / KNN 득표 / 결과 JSON / 차트 / 프롬프트가 모두 이 순서를 따름)
+SEASONS = ["spring", "summer", "autumn", "winter"]
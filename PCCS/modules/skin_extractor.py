@@ -1,13 +1,76 @@
 import cv2
 import numpy as np
-from skimage import color
-from pathlib import Path
+
+from modules.color_science import srgb_to_lab
+from modules.image_io import load_bgr
 
 
 class SkinNotFoundError(Exception):
     pass
 
 
+# -------------------------------------------------------
+# 빠른 sRGB(uint8) → Lab 변환 + 히스토그램 median
+#   color_science.srgb_to_lab (감마 LUT 256칸 + float32 행렬곱,
+#   skimage.rgb2lab과 같은 식)으로 변환.
+#   피부 픽셀은 같은 색이 많이 반복되므로 (수백만 픽셀 → 수만 색)
+#   색별 개수를 먼저 세고, 고유 색만 변환한 뒤 개수를 가중치로 쓴다.
+#   median은 정렬 대신 고정 폭(0.01) 가중 히스토그램의 누적 분포로 구함.
+#
+#   허용 오차: 기존 경로(skimage float64 + np.median) 대비
+#              ΔE76 ≤ SKIN_LAB_TOLERANCE  (float32 반올림 + 히스토그램 칸 폭)
+# -------------------------------------------------------
+SKIN_LAB_TOLERANCE = 0.02
+
+# 히스토그램 범위 / 칸 폭 (L, a, b)
+_LAB_HIST_RANGE = np.array([[0.0, 100.0], [-128.0, 128.0], [-128.0, 128.0]])
+_LAB_HIST_BIN = 0.01
+
+
+def unique_rgb_counts(rgb):
+    """(N, 3) uint8 RGB → (고유 색 (M, 3) uint8, 색별 개수 (M,))"""
+    rgb = np.asarray(rgb, dtype=np.uint8).reshape(-1, 3)
+    code = (
+        (rgb[:, 0].astype(np.int32) << 16)
+        | (rgb[:, 1].astype(np.int32) << 8)
+        | rgb[:, 2]
+    )
+    # 24비트 전체 bincount(2^24칸, 128MB)보다 정수 정렬 기반 unique가 빠르고 메모리도 적음
+    colors, counts = np.unique(code, return_counts=True)
+
+    unique = np.empty((len(colors), 3), dtype=np.uint8)
+    unique[:, 0] = colors >> 16
+    unique[:, 1] = (colors >> 8) & 255
+    unique[:, 2] = colors & 255
+    return unique, counts
+
+
+def histogram_median(values, lo, hi, weights=None, bin_width=_LAB_HIST_BIN):
+    """1차원 값의 (가중) median — 고정 폭 히스토그램, 정렬 없음. 칸 중앙값 반환"""
+    n_bins = int(round((hi - lo) / bin_width))
+    idx = ((values - lo) * (1.0 / bin_width)).astype(np.int64)
+    np.clip(idx, 0, n_bins - 1, out=idx)
+
+    counts = np.bincount(idx, weights=weights, minlength=n_bins)
+    cum = np.cumsum(counts)
+    n = int(round(cum[-1]))
+
+    # np.median과 같게: 짝수 개면 가운데 두 값의 평균
+    lo_bin = np.searchsorted(cum, (n - 1) // 2 + 1)
+    hi_bin = np.searchsorted(cum, n // 2 + 1)
+    return lo + ((lo_bin + hi_bin) / 2.0 + 0.5) * bin_width
+
+
+def skin_lab_median(rgb):
+    """피부 픽셀 (N, 3) uint8 RGB → 채널별 Lab median (float64, shape (3,))"""
+    unique, counts = unique_rgb_counts(rgb)
+    lab = srgb_to_lab(unique)
+    return np.array([
+        histogram_median(lab[:, c], *_LAB_HIST_RANGE[c], weights=counts)
+        for c in range(3)
+    ])
+
+
 # -------------------------------------------------------
 # 1) 최소 화이트밸런스 (L만 5~8% 조절, a/b 보정 금지)
 # -------------------------------------------------------
@@ -72,11 +135,13 @@ def minimal_extreme_filter(gray, mask):
 # -------------------------------------------------------
 # 5) 최종 피부 Lab 추출 (최소 가공)
 # -------------------------------------------------------
-def process_skin(image_path):
-    img_path = Path(image_path)
-    img = cv2.imread(str(img_path))
-    if img is None:
-        raise FileNotFoundError(f"이미지를 찾을 수 없음: {image_path}")
+def process_skin(image, fast=True):
+    """
+    image: 경로 또는 BGR ndarray (이미 디코딩된 이미지는 그대로 사용)
+    fast : True면 LUT 변환 + 히스토그램 median (허용 오차 SKIN_LAB_TOLERANCE),
+           False면 기존 skimage float64 + np.median 경로
+    """
+    img = load_bgr(image)
 
     # 1) 최소 WB만 적용
     corrected = minimal_white_balance(img)
@@ -97,11 +162,15 @@ def process_skin(image_path):
     if len(skin_pixels) < 400:   # threshold 완화
         raise SkinNotFoundError("피부 픽셀이 충분하지 않습니다.")
 
-    # 5) Lab 변환 — 보정 없음
+    # 5) Lab 변환 — 보정 없음 (BGR → RGB는 복사 없는 view)
     rgb = skin_pixels[..., ::-1]
-    lab = color.rgb2lab(rgb).reshape(-1, 3)
 
     # 6) 최종 피부색 = median
-    skin_lab = np.median(lab, axis=0)
+    if fast:
+        skin_lab = skin_lab_median(rgb)
+    else:
+        from skimage import color  # 비교/검증용 경로에서만 사용
+        lab = color.rgb2lab(rgb).reshape(-1, 3)
+        skin_lab = np.median(lab, axis=0)
 
     return skin_lab, corrected, mask
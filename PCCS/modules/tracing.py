@@ -0,0 +1,222 @@
+# modules/tracing.py
+# -------------------------------------------------------
+# 분석 단계별 추적(span)
+#   analyze() 한 번 = trace 1개, 단계(FaceMesh / 피부 / 시즌 / 립 ...) = span 1개
+#   span마다 벽시계 시간 / CPU 시간(이 스레드)을 기록, 메모리 측정을 켜면 최대 메모리 증가량(tracemalloc)도 기록
+#
+#   trace = AnalysisTrace(job_id)
+#   with trace.span("skin"):
+#       ...
+#   trace.finish()  →  trace.to_dict()  (AnalysisResult.trace에 그대로 담김)
+#
+# 출력
+#   - TraceLog      : trace 1개 = JSON 한 줄 (TRACE_LOG 환경변수로 경로 지정)
+#   - StageMetrics  : 단계 × 이미지 크기 구간별 Prometheus 텍스트 지표 (/metrics에 같이 노출)
+#
+# 메모리 측정(TRACE_MEMORY=1)은 기본 꺼짐 — 프로파일링할 때만 켤 것.
+#   tracemalloc은 프로세스 전체의 모든 파이썬 할당에 훅을 걸어서, 켜져 있는 동안
+#   순수 파이썬 코드가 몇 배 느려짐 (립 추천 0.28초 → 0.53초).
+#   최고치(reset_peak)도 프로세스에 하나뿐이라 span 메모리는 프로세스 안에서 분석이
+#   하나씩 돌 때만 정확함 (서버는 ANALYSIS_WORKERS=1, 배치 워커는 프로세스당 1건이라 그대로 정확).
+# CPU 시간은 이 스레드 기준 (OpenCV 내부 병렬 스레드 사용분은 포함되지 않음).
+# -------------------------------------------------------
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+from modules.job_queue import Histogram
+
+TRACE_MEMORY = os.getenv("TRACE_MEMORY", "0") == "1"
+
+# 이미지 크기 구간 (원본 메가픽셀 기준) → 라벨
+SIZE_BUCKETS = ((1.0, "le1mp"), (4.0, "le4mp"), (12.0, "le12mp"), (float("inf"), "gt12mp"))
+
+# 단계 시간 히스토그램 구간(초)
+_STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+_TOTAL_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30)
+
+
+def size_bucket(width, height):
+    megapixels = width * height / 1e6
+    for limit, label in SIZE_BUCKETS:
+        if megapixels <= limit:
+            return label
+    return SIZE_BUCKETS[-1][1]
+
+
+def enable_memory_tracing():
+    """tracemalloc 시작 (이미 켜져 있으면 그대로)"""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+# ============================================================
+# 1) trace / span
+# ============================================================
+class AnalysisTrace:
+    def __init__(self, trace_id=None, memory=TRACE_MEMORY):
+        self.trace_id = trace_id
+        self.memory = memory and tracemalloc.is_tracing()
+        self.spans = []
+        self.image = None
+        self.error = None
+        self.total_ms = None
+        self.total_cpu_ms = None
+        self._start = time.perf_counter()
+        self._start_cpu = time.thread_time()
+        self._open = []   # 열린 span의 최고 메모리(절대값) 목록 (중첩 span용)
+
+    def set_image(self, shape):
+        """원본 이미지 크기 기록 (지표의 크기 구간 라벨)"""
+        h, w = shape[:2]
+        self.image = {"width": int(w), "height": int(h), "size": size_bucket(w, h)}
+
+    @contextmanager
+    def span(self, name):
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # 바깥 span이 지금까지 본 최고치를 보관한 뒤 최고치 초기화
+            for entry in self._open:
+                entry[0] = max(entry[0], peak)
+            tracemalloc.reset_peak()
+            entry = [current]
+            self._open.append(entry)
+
+        start = time.perf_counter()
+        start_cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            record = {
+                "name": name,
+                "start_ms": round((start - self._start) * 1000, 3),
+                "wall_ms": round((time.perf_counter() - start) * 1000, 3),
+                "cpu_ms": round((time.thread_time() - start_cpu) * 1000, 3),
+            }
+            if self.memory:
+                _, peak = tracemalloc.get_traced_memory()
+                self._open.pop()
+                peak = max(entry[0], peak)
+                for outer in self._open:
+                    outer[0] = max(outer[0], peak)
+                record["peak_kb"] = round((peak - current) / 1024, 1)
+            self.spans.append(record)
+
+    def finish(self, error=None):
+        self.error = error
+        self.total_ms = round((time.perf_counter() - self._start) * 1000, 3)
+        self.total_cpu_ms = round((time.thread_time() - self._start_cpu) * 1000, 3)
+        return self
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "image": self.image,
+            "total_ms": self.total_ms,
+            "total_cpu_ms": self.total_cpu_ms,
+            "error": self.error,
+            "spans": list(self.spans),
+        }
+
+
+# ============================================================
+# 2) JSON lines 기록
+# ============================================================
+class TraceLog:
+    """trace dict를 JSONL 파일에 한 줄씩 추가 (스레드 안전)"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def write(self, trace):
+        line = json.dumps(trace, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+
+def open_default_trace_log():
+    """TRACE_LOG 환경변수가 있으면 TraceLog, 없으면 None"""
+    path = os.getenv("TRACE_LOG")
+    return TraceLog(path) if path else None
+
+
+# ============================================================
+# 3) Prometheus 지표 (단계 × 이미지 크기 구간)
+# ============================================================
+class StageMetrics:
+    def __init__(self, prefix="pccs_analysis"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._stage_hist = {}    # (stage, size) → Histogram (벽시계 초)
+        self._stage_cpu = {}     # (stage, size) → CPU 초 합계
+        self._stage_peak = {}    # (stage, size) → 최대 메모리 증가량 최고치(bytes)
+        self._total_hist = {}    # size → Histogram (analyze 전체)
+        self._errors = {}        # size → 실패 수
+
+    def observe(self, trace):
+        """trace dict (AnalysisTrace.to_dict()) 하나 반영"""
+        size = (trace.get("image") or {}).get("size", "unknown")
+        with self._lock:
+            for span in trace.get("spans", []):
+                key = (span["name"], size)
+                if key not in self._stage_hist:
+                    self._stage_hist[key] = Histogram(_STAGE_BUCKETS)
+                    self._stage_cpu[key] = 0.0
+                self._stage_hist[key].observe(span["wall_ms"] / 1000)
+                self._stage_cpu[key] += span["cpu_ms"] / 1000
+                if "peak_kb" in span:
+                    self._stage_peak[key] = max(self._stage_peak.get(key, 0.0), span["peak_kb"] * 1024)
+
+            if trace.get("total_ms") is not None:
+                if size not in self._total_hist:
+                    self._total_hist[size] = Histogram(_TOTAL_BUCKETS)
+                self._total_hist[size].observe(trace["total_ms"] / 1000)
+            if trace.get("error"):
+                self._errors[size] = self._errors.get(size, 0) + 1
+
+    def metrics_text(self):
+        p = self.prefix
+        with self._lock:
+            lines = [
+                f"# HELP {p}_stage_seconds 분석 단계별 소요 시간",
+                f"# TYPE {p}_stage_seconds histogram",
+            ]
+            for (stage, size), hist in sorted(self._stage_hist.items()):
+                lines += hist.lines(f"{p}_stage_seconds", f'stage="{stage}",size="{size}"')
+
+            lines += [
+                f"# HELP {p}_stage_cpu_seconds_total 분석 단계별 CPU 시간 합계 (분석 스레드)",
+                f"# TYPE {p}_stage_cpu_seconds_total counter",
+            ]
+            for (stage, size), value in sorted(self._stage_cpu.items()):
+                lines.append(f'{p}_stage_cpu_seconds_total{{stage="{stage}",size="{size}"}} {value:.6f}')
+
+            if self._stage_peak:
+                lines += [
+                    f"# HELP {p}_stage_peak_bytes 분석 단계별 최대 메모리 증가량 (지금까지 최고치)",
+                    f"# TYPE {p}_stage_peak_bytes gauge",
+                ]
+                for (stage, size), value in sorted(self._stage_peak.items()):
+                    lines.append(f'{p}_stage_peak_bytes{{stage="{stage}",size="{size}"}} {value:.0f}')
+
+            lines += [
+                f"# HELP {p}_seconds 분석 1건 전체 소요 시간",
+                f"# TYPE {p}_seconds histogram",
+            ]
+            for size, hist in sorted(self._total_hist.items()):
+                lines += hist.lines(f"{p}_seconds", f'size="{size}"')
+
+            lines += [
+                f"# HELP {p}_errors_total 결과에 오류가 담긴 분석 수",
+                f"# TYPE {p}_errors_total counter",
+            ]
+            for size, value in sorted(self._errors.items()):
+                lines.append(f'{p}_errors_total{{size="{size}"}} {value}')
+        return "\n".join(lines) + "\n"
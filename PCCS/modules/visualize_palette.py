@@ -2,6 +2,8 @@ import cv2
 import numpy as np
 from math import ceil
 
+from modules.image_io import load_bgr
+
 def draw_palette(df, block_size=120):
     """
     DataFrame의 R, G, B 컬럼을 받아 팔레트 이미지 생성
@@ -19,16 +21,11 @@ def draw_palette(df, block_size=120):
 
     return palette_img
 
-def append_palette_to_face(face_image_path, palette_df, save_path="face_with_palette.jpg",
-                            block_size=80, max_rows=2):
+def compose_palette_image(img, palette_df, block_size=80, max_rows=2):
     """
-    얼굴 사진 아래 팔레트를 합성
+    BGR 얼굴 이미지 아래 팔레트를 붙인 합성 이미지 반환 (저장 없음)
     - 팔레트 폭이 사진보다 좁으면 한 줄, 넓으면 max_rows 줄로 나눔
     """
-    img = cv2.imread(str(face_image_path))
-    if img is None:
-        raise FileNotFoundError(f"이미지를 찾을 수 없음: {face_image_path}")
-
     img_h, img_w = img.shape[:2]
     num_colors = len(palette_df)
     max_blocks_per_row = img_w // block_size
@@ -67,7 +64,16 @@ def append_palette_to_face(face_image_path, palette_df, save_path="face_with_pal
         raise ValueError("팔레트 생성 실패: 유효한 색 데이터가 없습니다.")
 
     palette_final = np.vstack(palette_rows)
-    combined = np.vstack([img, palette_final])
-    cv2.imwrite(save_path, combined)
+    return np.vstack([img, palette_final])
+
+def append_palette_to_face(face_image, palette_df, save_path="face_with_palette.jpg",
+                            block_size=80, max_rows=2):
+    """
+    얼굴 사진 아래 팔레트를 합성해서 저장
+    face_image: 경로 또는 BGR ndarray
+    """
+    img = load_bgr(face_image)
+    combined = compose_palette_image(img, palette_df, block_size=block_size, max_rows=max_rows)
+    cv2.imwrite(str(save_path), combined)
     print(f"퍼스널컬러 비교 이미지 저장 완료 → {save_path}")
     return save_path
@@ -0,0 +1,105 @@
+# modules/workspace.py
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+
+
+class Workspace:
+    """분석 요청 1건의 전용 작업 폴더 (job_id로 구분)"""
+
+    def __init__(self, job_id, path, created_at):
+        self.job_id = job_id
+        self.path = Path(path)
+        self.created_at = created_at
+
+    def file(self, *parts):
+        """작업 폴더 안의 파일 경로 (존재하면 str, 없으면 None) — Gradio 출력용"""
+        p = self.path.joinpath(*parts)
+        return str(p) if p.exists() else None
+
+
+class WorkspaceManager:
+    """
+    요청마다 독립된 작업 폴더를 만들어 주고,
+    오래된 폴더는 나이(max_age_sec) / 전체 용량(max_total_bytes) / 개수(max_jobs) 기준으로 정리.
+    동시에 여러 분석이 돌아도 서로의 입력/결과 파일을 덮어쓰지 않는다.
+    """
+
+    def __init__(self, root, max_age_sec=30 * 60, max_total_bytes=512 * 1024 * 1024, max_jobs=100):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_age_sec = max_age_sec
+        self.max_total_bytes = max_total_bytes
+        self.max_jobs = max_jobs
+        self._lock = threading.Lock()
+
+    # ------------------------------
+    # 생성 / 조회 / 삭제
+    # ------------------------------
+    def create(self):
+        """새 작업 폴더 생성 (만들기 전에 오래된 폴더 정리)"""
+        self.evict()
+
+        job_id = uuid.uuid4().hex
+        path = self.root / job_id
+        path.mkdir(parents=True)
+        return Workspace(job_id, path, time.time())
+
+    def get(self, job_id):
+        # job_id는 uuid hex만 허용 (경로 조작 방지)
+        if not job_id or not all(c in "0123456789abcdef" for c in job_id):
+            return None
+        path = self.root / job_id
+        if not path.is_dir():
+            return None
+        return Workspace(job_id, path, path.stat().st_mtime)
+
+    def remove(self, job_id):
+        ws = self.get(job_id)
+        if ws is not None:
+            shutil.rmtree(ws.path, ignore_errors=True)
+
+    # ------------------------------
+    # 정리 (나이 → 용량/개수 순)
+    # ------------------------------
+    def _list(self):
+        jobs = []
+        for p in self.root.iterdir():
+            if not p.is_dir():
+                continue
+            try:
+                mtime = p.stat().st_mtime
+                size = sum(f.stat().st_size for f in p.rglob("*") if f.is_file())
+            except FileNotFoundError:
+                continue  # 다른 스레드가 방금 지운 폴더
+            jobs.append((mtime, size, p))
+        jobs.sort()  # 오래된 순
+        return jobs
+
+    def evict(self, now=None):
+        """정리 규칙에 걸리는 작업 폴더 삭제. 삭제한 job_id 리스트 반환"""
+        now = time.time() if now is None else now
+        removed = []
+
+        with self._lock:
+            jobs = self._list()
+
+            kept = []
+            for mtime, size, p in jobs:
+                if now - mtime > self.max_age_sec:
+                    shutil.rmtree(p, ignore_errors=True)
+                    removed.append(p.name)
+                else:
+                    kept.append((mtime, size, p))
+
+            total = sum(size for _, size, _ in kept)
+            # 새 폴더 하나가 들어올 자리까지 확보
+            while kept and (total > self.max_total_bytes or len(kept) >= self.max_jobs):
+                _, size, p = kept.pop(0)
+                shutil.rmtree(p, ignore_errors=True)
+                removed.append(p.name)
+                total -= size
+
+        return removed
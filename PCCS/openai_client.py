@@ -1,29 +1,129 @@
 # openai_client.py
+import asyncio
 import os
-from openai import OpenAI
+import sys
+import threading
+import weakref
+
 from dotenv import load_dotenv
 
 # .env에서 환경변수 로드
 load_dotenv()
 
+# 키가 없어도 import는 되도록 하고, 실제로 호출할 때 확인 (require_api_key)
 API_KEY = os.getenv("OPENAI_API_KEY")
-if not API_KEY:
-    raise ValueError("OPENAI_API_KEY 가 설정되어 있지 않습니다. .env 파일을 확인하세요.")
 
-# test_openai.py에서 썼던 방식과 동일하게 클라이언트 생성
-client = OpenAI(
-    api_key=API_KEY,
-    timeout=15,   # 테스트에서 잘 돌아갔던 값
-)
+# 접속 설정 (.env로 변경 가능)
+#   OPENAI_BASE_URL: 로컬 스텁 서버 등으로 바꿀 때 (예: http://127.0.0.1:8765/v1)
+BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")   # mini 모델 사용
+TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "15"))  # 테스트에서 잘 돌아갔던 값
+MAX_TOKENS = 512                                    # 이때는 넉넉하게 512로 사용했음
+
+
+def require_api_key():
+    if not API_KEY:
+        raise ValueError("OPENAI_API_KEY 가 설정되어 있지 않습니다. .env 파일을 확인하세요.")
+    return API_KEY
+
+
+# -------------------------------------------------------
+# 동기 클라이언트 (처음 쓸 때 생성)
+#   openai SDK import 자체가 느려서 모듈 import 시점에는 만들지 않음
+# -------------------------------------------------------
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """test_openai.py에서 썼던 방식과 동일한 설정의 OpenAI 클라이언트 (프로세스당 1개)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from openai import OpenAI
+                _client = OpenAI(
+                    api_key=require_api_key(),
+                    base_url=BASE_URL,
+                    timeout=TIMEOUT,
+                )
+    return _client
+
+
+def warmup():
+    """서버 시작 시 호출: SDK import + 클라이언트 생성을 미리 해 둠 (네트워크 요청 없음)"""
+    if not API_KEY:
+        return False
+    get_client()
+    import openai  # noqa: F401  (AsyncOpenAI도 같은 패키지)
+    return True
+
+
+# -------------------------------------------------------
+# 비동기 클라이언트
+#   AsyncOpenAI 하나가 내부 HTTP 커넥션 풀을 들고 있으므로 요청마다 만들지 않고 재사용.
+#   커넥션은 만들어진 이벤트 루프에 묶이기 때문에 루프별로 하나씩 보관.
+#   (Gradio는 한 루프에서 모든 async 콜백을 돌리므로 실제로는 1개)
+# -------------------------------------------------------
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    loop = asyncio.get_running_loop()
+    async_client = _async_clients.get(loop)
+    if async_client is None:
+        from openai import AsyncOpenAI
+        async_client = AsyncOpenAI(
+            api_key=require_api_key(),
+            base_url=BASE_URL,
+            timeout=TIMEOUT,
+        )
+        _async_clients[loop] = async_client
+    return async_client
+
+
+async def stream_openai(messages, model=None, max_tokens=MAX_TOKENS):
+    """
+    messages: [{"role": "system" | "user" | "assistant", "content": "..."}] 리스트
+    응답 텍스트를 토큰 조각 단위로 yield (async generator)
+
+    소비자가 중간에 멈추면(취소 / aclose) 응답을 닫아서 커넥션을 풀에 돌려주고
+    서버 쪽 생성도 끊는다. 중간에 멈출 수 있는 호출부는 contextlib.aclosing으로 감쌀 것
+    (async for를 break로 빠져나오기만 하면 generator가 GC될 때까지 닫히지 않음).
+    """
+    stream = await get_async_client().chat.completions.create(
+        model=model or MODEL,
+        messages=messages,
+        max_tokens=max_tokens,
+        stream=True,
+    )
+    async with stream:
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            content = getattr(delta, "content", None)
+            if content:
+                yield content
+
+
+async def ask_openai_async(messages, model=None, max_tokens=MAX_TOKENS):
+    """스트리밍 응답을 끝까지 받아서 한 문자열로 반환"""
+    parts = []
+    async for piece in stream_openai(messages, model=model, max_tokens=max_tokens):
+        parts.append(piece)
+    return "".join(parts)
+
 
 def ask_openai(messages):
     """
     messages: [{"role": "system" | "user" | "assistant", "content": "..."}] 리스트
+    (동기 버전 — 응답이 끝날 때까지 기다림)
     """
-    resp = client.chat.completions.create(
-        model="gpt-4o-mini",   # mini 모델 사용
+    resp = get_client().chat.completions.create(
+        model=MODEL,
         messages=messages,
-        max_tokens=512,        # 이때는 넉넉하게 512로 사용했음
+        max_tokens=MAX_TOKENS,
     )
 
     choice = resp.choices[0]
@@ -34,3 +134,18 @@ def ask_openai(messages):
         content = choice.message.get("content", "")
 
     return content
+
+
+# -------------------------------------------------------
+# 간단 확인용: python openai_client.py "질문"
+#   (OPENAI_BASE_URL을 스텁 서버로 두면 오프라인으로 스트리밍 확인 가능)
+# -------------------------------------------------------
+async def _main(question):
+    messages = [{"role": "user", "content": question}]
+    async for piece in stream_openai(messages):
+        print(piece, end="", flush=True)
+    print()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main(" ".join(sys.argv[1:]) or "테스트"))
@@ -0,0 +1,224 @@
+# prompt_builder.py
+# -------------------------------------------------------
+# 챗봇 프롬프트 조립 (토큰 예산 기반)
+#   - 분석 결과(AnalysisResult.to_dict())를 몇 줄짜리 요약으로 변환
+#   - 메시지별 토큰 수를 대략 계산해서 전체 예산(PROMPT_TOKEN_BUDGET) 안에 맞춤
+#   - 최근 대화는 원문 그대로, 예산을 넘는 오래된 대화는 버리지 않고
+#     "질문 / 답변 첫 문장" 형태로 줄여서 시스템 프롬프트 뒤에 붙임
+#     (요약용 API 호출을 추가로 하지 않음 → 지연 시간 그대로)
+#
+# 토큰 수: tiktoken이 설치되어 있으면 그것으로 정확히 세고,
+#          없으면 한글/한자 1자 ≈ 1토큰, 그 외 4자 ≈ 1토큰으로 근사.
+# -------------------------------------------------------
+import os
+import re
+
+from modules.seasons import SEASONS
+
+PROMPT_TOKEN_BUDGET = int(os.getenv("CHAT_PROMPT_BUDGET", "1500"))   # 답변 제외 입력 전체
+SUMMARY_TOKEN_BUDGET = int(os.getenv("CHAT_SUMMARY_BUDGET", "200"))  # 오래된 대화 요약
+MESSAGE_OVERHEAD_TOKENS = 4   # 메시지 하나당 role 등 부가 토큰
+
+_SUMMARY_QUESTION_CHARS = 60
+_SUMMARY_ANSWER_CHARS = 80
+_WIDE_CHAR = re.compile(r"[ᄀ-ᇿ㄰-㆏가-힣぀-ヿ一-鿿]")
+_SENTENCE_END = re.compile(r"(?<=[.!?。])\s|\n")
+
+_ENCODER = None
+
+
+def _get_encoder():
+    """tiktoken 인코더 (없으면 False → 근사 계산)"""
+    global _ENCODER
+    if _ENCODER is None:
+        try:
+            import tiktoken
+            _ENCODER = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _ENCODER = False
+    return _ENCODER
+
+
+def estimate_tokens(text):
+    if not text:
+        return 0
+    encoder = _get_encoder()
+    if encoder:
+        return len(encoder.encode(text))
+    wide = len(_WIDE_CHAR.findall(text))
+    rest = len(text) - wide - text.count(" ")
+    return wide + (max(rest, 0) + 3) // 4
+
+
+def message_tokens(message):
+    return MESSAGE_OVERHEAD_TOKENS + estimate_tokens(message.get("content", ""))
+
+
+def content_text(content):
+    """Gradio Chatbot content(문자열 / [{"type": "text", "text": ...}] 등) → 문자열"""
+    if content is None:
+        return ""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, dict):
+        return str(content.get("text") or content.get("content") or "")
+    if isinstance(content, (list, tuple)):
+        return "\n".join(t for t in (content_text(c) for c in content) if t)
+    return str(content)
+
+
+def clean_history(history):
+    """OpenAI에 보낼 수 있는 {"role", "content"}만 남김 (빈 메시지 제외)"""
+    messages = []
+    for m in history or []:
+        if not isinstance(m, dict) or m.get("role") not in ("user", "assistant"):
+            continue
+        text = content_text(m.get("content")).strip()
+        if text:
+            messages.append({"role": m["role"], "content": text})
+    return messages
+
+
+# ============================================================
+# 1) 분석 결과 요약
+# ============================================================
+def summarize_analysis(result, max_recommendations=5):
+    """분석 결과 dict → 프롬프트용 짧은 요약 (결과가 없으면 빈 문자열)"""
+    result = result or {}
+    if result.get("error"):
+        return f"이미지 분석 실패: {result['error']}"
+    if not result.get("season"):
+        return ""
+
+    lines = [f"판정 시즌: {result['season']}"]
+
+    votes = result.get("votes") or {}
+    if votes:
+        ranked = sorted(SEASONS, key=lambda s: -float(votes.get(s, 0.0)))
+        lines.append("KNN 득표율: " + ", ".join(f"{s} {float(votes.get(s, 0.0)):.0f}%" for s in ranked))
+
+    detail = result.get("season_detail") or {}
+    if detail:
+        parts = []
+        for s in SEASONS:
+            d = detail.get(s)
+            if d:
+                parts.append(f"{s} {d['avg']:.1f}/{d['min']:.1f}")
+        if parts:
+            lines.append("시즌별 ΔE(평균/최소): " + ", ".join(parts))
+
+    skin = result.get("skin_lab")
+    if skin:
+        lines.append("피부 Lab: (" + ", ".join(f"{float(v):.1f}" for v in skin) + ")")
+
+    recs = (result.get("recommendations") or [])[:max_recommendations]
+    if recs:
+        lines.append(f"추천 립 TOP {len(recs)}:")
+        for i, r in enumerate(recs, 1):
+            name = " ".join(str(v) for v in (r.get("brand"), r.get("option")) if v)
+            delta = r.get("delta_e")
+            suffix = f" (ΔE {float(delta):.1f})" if delta is not None else ""
+            lines.append(f"{i}. {name} {r.get('hex', '')}{suffix}")
+    return "\n".join(lines)
+
+
+# ============================================================
+# 2) 오래된 대화 요약
+# ============================================================
+def _clip(text, limit):
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def _first_sentence(text):
+    return _SENTENCE_END.split(text.strip(), maxsplit=1)[0]
+
+
+def summarize_turns(messages, budget=SUMMARY_TOKEN_BUDGET):
+    """
+    오래된 메시지들 → "- Q: ... / A: ..." 줄 목록 (최근 것 우선으로 예산만큼)
+    예산을 넘어 빠진 턴 수는 마지막에 표시.
+    """
+    turns = []
+    question = None
+    for m in messages:
+        if m["role"] == "user":
+            if question is not None:
+                turns.append((question, None))
+            question = m["content"]
+        else:
+            turns.append((question, m["content"]))
+            question = None
+    if question is not None:
+        turns.append((question, None))
+
+    lines = []
+    used = 0
+    for q, a in reversed(turns):
+        parts = []
+        if q:
+            parts.append("Q: " + _clip(q, _SUMMARY_QUESTION_CHARS))
+        if a:
+            parts.append("A: " + _clip(_first_sentence(a), _SUMMARY_ANSWER_CHARS))
+        line = "- " + " / ".join(parts)
+        cost = estimate_tokens(line)
+        if used + cost > budget:
+            break
+        lines.append(line)
+        used += cost
+
+    lines.reverse()
+    omitted = len(turns) - len(lines)
+    if omitted:
+        lines.insert(0, f"(더 이전 대화 {omitted}턴 생략)")
+    return "\n".join(lines)
+
+
+# ============================================================
+# 3) 메시지 조립
+# ============================================================
+def build_messages(system_text, result, history, message,
+                   budget=PROMPT_TOKEN_BUDGET, summary_budget=SUMMARY_TOKEN_BUDGET):
+    """
+    system_text: 고정 시스템 프롬프트 (분석 요약은 여기서 붙임)
+    result: 최근 분석 결과 dict (없으면 None)
+    history: 이전 대화 (Gradio messages 형식)
+    반환: (OpenAI messages 리스트, 추정 토큰 수)
+    """
+    analysis = summarize_analysis(result)
+    if analysis:
+        system = f"{system_text}\n\n【최근 이미지 분석 결과】\n{analysis}"
+    else:
+        system = (
+            f"{system_text}\n\n아직 이미지 분석 결과가 공유되지 않았습니다. "
+            "일반적인 퍼스널컬러 이론과 사용자 질문만을 바탕으로 답변하세요."
+        )
+
+    user_msg = {"role": "user", "content": message}
+    fixed = MESSAGE_OVERHEAD_TOKENS + estimate_tokens(system) + message_tokens(user_msg)
+
+    # 최근 대화부터 원문 그대로 채우고, 남는 것은 요약 대상
+    past = clean_history(history)
+    room = budget - fixed - summary_budget
+    keep_from = len(past)
+    used = 0
+    while keep_from > 0:
+        cost = message_tokens(past[keep_from - 1])
+        if used + cost > room:
+            break
+        used += cost
+        keep_from -= 1
+
+    # 대화가 assistant 답변으로 시작하지 않도록 맞춤
+    while keep_from < len(past) and past[keep_from]["role"] != "user":
+        keep_from += 1
+    recent = past[keep_from:]
+    older = past[:keep_from]
+
+    if older:
+        summary = summarize_turns(older, summary_budget)
+        if summary:
+            system += f"\n\n【이전 대화 요약】\n{summary}"
+
+    messages = [{"role": "system", "content": system}] + recent + [user_msg]
+    return messages, sum(message_tokens(m) for m in messages)
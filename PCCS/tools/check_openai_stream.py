@@ -0,0 +1,134 @@
+# tools/check_openai_stream.py
+# -------------------------------------------------------
+# 챗봇 스트리밍 자동 확인 (OpenAI 키 / 네트워크 없이)
+#   로컬 스텁 서버(tools/stub_openai_server.py)를 빈 포트로 띄우고
+#   openai_client.stream_openai를 실제 SDK 그대로 호출해서 확인:
+#     1) 끝까지 받은 조각이 서버가 보낸 조각과 같은지
+#     2) 여러 번 호출해도 커넥션 하나를 재사용하는지
+#     3) 중간에 aclose() 하면 서버 쪽 생성이 끊기는지
+#     4) 소비하는 태스크를 취소해도 서버 쪽 생성이 끊기는지 (Gradio 중단 버튼과 같은 경로)
+#     5) 끊긴 뒤 다음 요청이 정상인지
+#
+#   cd PCCS && python tools/check_openai_stream.py     # 실패가 있으면 exit 1
+# -------------------------------------------------------
+import argparse
+import asyncio
+import sys
+import time
+from contextlib import aclosing
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / "tools"))
+
+import openai_client  # noqa: E402
+from openai_client import stream_openai  # noqa: E402
+from stub_openai_server import StubHandler, serve, make_reply, split_tokens  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": "여름쿨 립 추천해줘"}]
+EXPECTED = split_tokens(make_reply({"messages": MESSAGES}))
+
+
+def wait_for(predicate, timeout=3.0):
+    """서버 스레드 쪽 기록이 반영될 때까지 잠깐 대기"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def reset_stub():
+    StubHandler.connections.clear()
+    with StubHandler.stats_lock:
+        StubHandler.stats.update(finished=0, aborted=0)
+
+
+async def collect(n=None):
+    """스트림 조각 수집 (n개 받으면 aclose로 중단)"""
+    pieces = []
+    async with aclosing(stream_openai(MESSAGES)) as stream:
+        async for piece in stream:
+            pieces.append(piece)
+            if n is not None and len(pieces) >= n:
+                break
+    return pieces
+
+
+async def run_checks():
+    checks = []
+
+    def check(name, ok, detail=""):
+        checks.append(ok)
+        print(f"  [{'OK' if ok else 'FAIL'}] {name}" + (f" — {detail}" if detail else ""))
+
+    # 1) 전체 스트림
+    reset_stub()
+    pieces = await collect()
+    check("조각 전체 수신", pieces == EXPECTED, f"{len(pieces)}/{len(EXPECTED)}조각")
+    check("서버 스트림 정상 종료", wait_for(lambda: StubHandler.stats["finished"] == 1),
+          str(StubHandler.stats))
+
+    # 2) 커넥션 재사용 (같은 루프에서 연속 호출)
+    reset_stub()
+    for _ in range(3):
+        await collect()
+    check("커넥션 재사용", len(StubHandler.connections) == 1,
+          f"요청 3번, 커넥션 {len(StubHandler.connections)}개")
+
+    # 3) 중간 중단 (aclose)
+    reset_stub()
+    pieces = await collect(n=3)
+    check("중단 전 조각", pieces == EXPECTED[:3])
+    check("aclose 후 서버 생성 중단", wait_for(lambda: StubHandler.stats["aborted"] == 1),
+          str(StubHandler.stats))
+
+    # 4) 소비 태스크 취소
+    reset_stub()
+    first_piece = asyncio.Event()
+
+    async def consume():
+        async with aclosing(stream_openai(MESSAGES)) as stream:
+            async for _ in stream:
+                first_piece.set()
+
+    task = asyncio.create_task(consume())
+    await asyncio.wait_for(first_piece.wait(), timeout=openai_client.TIMEOUT)
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    check("태스크 취소 후 서버 생성 중단", wait_for(lambda: StubHandler.stats["aborted"] == 1),
+          str(StubHandler.stats))
+
+    # 5) 끊긴 뒤 다음 요청
+    reset_stub()
+    pieces = await collect()
+    check("중단 뒤 다음 요청 정상", pieces == EXPECTED, f"{len(pieces)}/{len(EXPECTED)}조각")
+
+    return all(checks)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="stream_openai 스트리밍 / 취소 / 커넥션 재사용 확인")
+    parser.add_argument("--delay", type=float, default=0.02, help="스텁 서버 조각 사이 지연(초)")
+    args = parser.parse_args(argv)
+
+    server, _ = serve(port=0, delay=args.delay)
+    openai_client.BASE_URL = f"http://127.0.0.1:{server.server_port}/v1"
+    openai_client.API_KEY = "stub"
+    print(f"스텁 서버 → {openai_client.BASE_URL}")
+    try:
+        ok = asyncio.run(run_checks())
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("통과" if ok else "실패")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,160 @@
+# tools/stub_openai_server.py
+# -------------------------------------------------------
+# 로컬 OpenAI 호환 스텁 서버 (챗봇 스트리밍 오프라인 확인용)
+#   POST /v1/chat/completions 만 지원
+#   - stream=true  → SSE(data: {...chunk...}) 조각 전송 후 data: [DONE]
+#   - stream=false → 일반 chat.completion JSON
+#   HTTP/1.1 keep-alive + chunked 전송이라 커넥션 재사용도 확인 가능.
+#   클라이언트가 스트림 중간에 끊으면 생성을 멈추고 StubHandler.stats["aborted"]를 올림.
+#   (자동 확인: python tools/check_openai_stream.py)
+#
+#   python tools/stub_openai_server.py --port 8765 --delay 0.02
+#   (.env)  OPENAI_BASE_URL=http://127.0.0.1:8765/v1
+#           OPENAI_API_KEY=stub
+#   python openai_client.py "여름쿨 립 추천"
+# -------------------------------------------------------
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = (
+    "스텁 서버 응답입니다. 퍼스널컬러 분석 결과를 참고해서 "
+    "차분한 로즈 계열 립을 추천드려요."
+)
+
+
+def make_reply(body):
+    """마지막 user 메시지를 붙여서 응답 텍스트 생성"""
+    messages = body.get("messages") or []
+    last_user = next(
+        (m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), ""
+    )
+    return f"{DEFAULT_REPLY} (질문: {last_user})" if last_user else DEFAULT_REPLY
+
+
+def split_tokens(text, size=2):
+    """토큰 흉내: 몇 글자씩 잘라서 전송"""
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive
+    delay = 0.02                    # 조각 사이 지연(초)
+    connections = set()             # 접속한 클라이언트 포트 (커넥션 재사용 확인용)
+    stats = {"finished": 0, "aborted": 0}   # 끝까지 보낸 / 중간에 끊긴 스트림 수
+    stats_lock = threading.Lock()
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _write_chunk(self, text):
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        StubHandler.connections.add(self.client_address)
+
+        if self.path.rstrip("/") not in ("/v1/chat/completions", "/chat/completions"):
+            self._send_json(404, {"error": {"message": f"not found: {self.path}"}})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+
+        reply = make_reply(body)
+        model = body.get("model", "stub-model")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+
+        if not body.get("stream"):
+            self._send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": reply},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def event(delta, finish_reason=None):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            self._write_chunk(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n")
+
+        try:
+            event({"role": "assistant", "content": ""})
+            for piece in split_tokens(reply):
+                time.sleep(self.delay)
+                event({"content": piece})
+            event({}, finish_reason="stop")
+            self._write_chunk("data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")  # chunked 종료
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # 클라이언트가 스트림을 닫음 → 남은 조각은 만들지 않음
+            self.close_connection = True
+            self._count("aborted")
+            return
+        self._count("finished")
+
+    @classmethod
+    def _count(cls, key):
+        with cls.stats_lock:
+            cls.stats[key] += 1
+
+
+def serve(host="127.0.0.1", port=8765, delay=0.02):
+    """백그라운드 스레드로 서버 시작 → (server, thread)"""
+    StubHandler.delay = delay
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, thread
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OpenAI chat-completions 스트리밍 스텁 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.02, help="조각 사이 지연(초)")
+    args = parser.parse_args(argv)
+
+    server, thread = serve(args.host, args.port, args.delay)
+    print(f"스텁 서버 실행 중 → http://{args.host}:{server.server_port}/v1  (Ctrl+C 종료)")
+    try:
+        thread.join()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())